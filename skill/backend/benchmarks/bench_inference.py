@@ -0,0 +1,90 @@
+"""
+Parity check and latency benchmark for predict_level.
+
+Compares the array-compiled forest (services.ai_service.load_engine) with the
+original sklearn + one-row DataFrame path on random feature vectors.
+
+Run from skill/backend:
+    python -m benchmarks.bench_inference [--samples 5000] [--repeat 2000]
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from core.forest_engine import FEATURE_NAMES
+from services.ai_service import load_engine, load_sklearn_models, predict_level, predict_level_sklearn
+
+
+# -------- Random Feature Vectors --------
+def random_features(rng, n):
+    X = np.column_stack([
+        rng.uniform(0, 100, n),     # accuracy
+        rng.uniform(0, 100, n),     # conceptual_score
+        rng.uniform(0, 100, n),     # logical_score
+        rng.uniform(0, 100, n),     # speed_score
+        rng.uniform(1, 300, n),     # avg_time
+    ]).round(2)
+
+    # Values sitting exactly on split thresholds exercise the <= edge
+    threshold = load_engine().threshold
+    used = threshold[np.isfinite(threshold)]
+    edge_rows = rng.integers(0, n, size=n // 10)
+    edge_cols = rng.integers(0, X.shape[1], size=n // 10)
+    X[edge_rows, edge_cols] = rng.choice(used, size=n // 10)
+
+    return X
+
+
+# -------- Parity --------
+def check_parity(samples, seed=0):
+    rng = np.random.default_rng(seed)
+    X = random_features(rng, samples)
+
+    import pandas as pd
+
+    model, encoder = load_sklearn_models()
+    engine = load_engine()
+    expected = encoder.inverse_transform(model.predict(pd.DataFrame(X, columns=FEATURE_NAMES)))
+    batch = engine.predict(X)
+    single = np.array([engine.predict_one(row) for row in X])
+
+    mismatches = int((batch != expected).sum() + (single != expected).sum())
+    print(f"parity: {samples} vectors, {mismatches} mismatches")
+    return mismatches == 0
+
+
+# -------- Latency --------
+def time_call(fn, arg, repeat):
+    fn(arg)  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(arg)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def benchmark(repeat):
+    features = dict(zip(FEATURE_NAMES, [72.5, 64.0, 55.0, 80.0, 45.0]))
+
+    compiled_us = time_call(predict_level, features, repeat)
+    sklearn_us = time_call(predict_level_sklearn, features, max(1, repeat // 20))
+
+    print(f"compiled forest : {compiled_us:10.1f} us/prediction")
+    print(f"sklearn+pandas  : {sklearn_us:10.1f} us/prediction")
+    print(f"speedup         : {sklearn_us / compiled_us:10.1f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--samples", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    ok = check_parity(args.samples)
+    benchmark(args.repeat)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
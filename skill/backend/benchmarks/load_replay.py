@@ -0,0 +1,200 @@
+"""
+End-to-end load replay against the FastAPI app, in-process.
+
+Each session is one candidate: POST /generate-test, one POST
+/submit-answer per question (with think-time between answers), then
+POST /finish-test. Requests go through httpx's ASGI transport, so no
+server or network is involved. Per-endpoint throughput and p50/p95/p99
+latency are printed and optionally written as JSON.
+
+Sessions can be recorded to JSONL and replayed later exactly.
+
+Run from skill/backend:
+    python -m benchmarks.load_replay --sessions 500 --concurrency 100
+    python -m benchmarks.load_replay --sessions 200 --record sessions.jsonl
+    python -m benchmarks.load_replay --replay sessions.jsonl --think-scale 0
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+
+import httpx
+
+from benchmarks.synthetic import answer_for
+from utils.loader import get_catalog
+
+
+# -------- Session Scripts --------
+async def live_session(client, rng, session_id, think, correct_rate):
+    """Run a fresh session and return its steps for recording."""
+    user_id = f"load-{session_id}"
+    steps = []
+
+    body = {"difficulty_mode": "Mixed", "time_limit": 1500}
+    test = await client.request_timed("POST", "/generate-test", json=body)
+    steps.append({"method": "POST", "path": "/generate-test", "json": body, "think": 0})
+
+    catalog = get_catalog()
+    for q in test.get("questions", []):
+        delay = rng.uniform(0, 2 * think) if think else 0
+        await asyncio.sleep(delay)
+
+        # Answer keys come from the in-process catalog, not the sanitized test
+        question = catalog.by_id.get(q["id"], q)
+        payload = {
+            "user_id": user_id,
+            "attempt_id": f"{user_id}-A1",
+            "question_id": q["id"],
+            "answer": answer_for(rng, question, correct_rate),
+            "time": rng.randint(10, 200),
+        }
+        await client.request_timed("POST", "/submit-answer", json=payload)
+        steps.append({"method": "POST", "path": "/submit-answer", "json": payload, "think": delay})
+
+    await client.request_timed("POST", "/finish-test", params={"user_id": user_id})
+    steps.append({"method": "POST", "path": "/finish-test", "params": {"user_id": user_id}, "think": 0})
+
+    return {"session_id": session_id, "steps": steps}
+
+
+async def replay_session(client, session, think_scale):
+    for step in session["steps"]:
+        if step.get("think") and think_scale:
+            await asyncio.sleep(step["think"] * think_scale)
+        await client.request_timed(
+            step["method"], step["path"], json=step.get("json"), params=step.get("params")
+        )
+    return session
+
+
+# -------- Timed Client --------
+class TimedClient:
+
+    def __init__(self, client):
+        self.client = client
+        self.latencies = {}
+        self.errors = {}
+
+    async def request_timed(self, method, path, **kwargs):
+        start = time.perf_counter()
+        response = await self.client.request(method, path, **kwargs)
+        elapsed = time.perf_counter() - start
+
+        self.latencies.setdefault(path, []).append(elapsed)
+        if response.status_code >= 400:
+            self.errors[path] = self.errors.get(path, 0) + 1
+            return {}
+
+        if response.headers.get("content-type", "").startswith("application/json"):
+            return response.json()
+        return {}
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    k = max(0, math.ceil(p / 100 * len(sorted_values)) - 1)
+    return sorted_values[k]
+
+
+def summarize(timed, wall):
+    report = {"wall_sec": round(wall, 3), "endpoints": {}}
+
+    for path, values in sorted(timed.latencies.items()):
+        values.sort()
+        report["endpoints"][path] = {
+            "requests": len(values),
+            "errors": timed.errors.get(path, 0),
+            "throughput_rps": round(len(values) / wall, 1) if wall else 0.0,
+            "p50_ms": round(percentile(values, 50) * 1e3, 3),
+            "p95_ms": round(percentile(values, 95) * 1e3, 3),
+            "p99_ms": round(percentile(values, 99) * 1e3, 3),
+            "max_ms": round(values[-1] * 1e3, 3),
+        }
+
+    return report
+
+
+# -------- Driver --------
+async def run(sessions=100, concurrency=50, think=0.0, correct_rate=0.6,
+              replay=None, think_scale=1.0, seed=0):
+    from main import app
+
+    rng = random.Random(seed)
+    gate = asyncio.Semaphore(concurrency)
+    recorded = []
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+            timed = TimedClient(client)
+
+            async def one(i, script=None):
+                async with gate:
+                    if script is not None:
+                        return await replay_session(timed, script, think_scale)
+                    return await live_session(timed, rng, i, think, correct_rate)
+
+            start = time.perf_counter()
+            if replay is not None:
+                recorded = await asyncio.gather(*(one(i, s) for i, s in enumerate(replay)))
+            else:
+                recorded = await asyncio.gather(*(one(i) for i in range(sessions)))
+            wall = time.perf_counter() - start
+
+    return summarize(timed, wall), recorded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay exam sessions against the app in-process.")
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--think", type=float, default=0.0, help="mean seconds between answers")
+    parser.add_argument("--correct-rate", type=float, default=0.6)
+    parser.add_argument("--record", help="write the sessions that ran to this JSONL file")
+    parser.add_argument("--replay", help="replay sessions from this JSONL file")
+    parser.add_argument("--think-scale", type=float, default=1.0, help="multiplier for recorded think-time")
+    parser.add_argument("--output", help="write the latency report as JSON")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    replay = None
+    if args.replay:
+        with open(args.replay) as f:
+            replay = [json.loads(line) for line in f if line.strip()]
+
+    report, sessions = asyncio.run(run(
+        sessions=args.sessions,
+        concurrency=args.concurrency,
+        think=args.think,
+        correct_rate=args.correct_rate,
+        replay=replay,
+        think_scale=args.think_scale,
+        seed=args.seed,
+    ))
+
+    print(f"wall time: {report['wall_sec']}s")
+    print(f"{'endpoint':20s} {'reqs':>7s} {'err':>5s} {'rps':>9s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s}")
+    for path, r in report["endpoints"].items():
+        print(f"{path:20s} {r['requests']:7d} {r['errors']:5d} {r['throughput_rps']:9.1f} "
+              f"{r['p50_ms']:9.2f} {r['p95_ms']:9.2f} {r['p99_ms']:9.2f}")
+
+    if args.record:
+        with open(args.record, "w") as f:
+            for session in sessions:
+                f.write(json.dumps(session) + "\n")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
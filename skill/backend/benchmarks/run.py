@@ -0,0 +1,208 @@
+"""
+Micro-benchmark suite for selection, grading, features and inference.
+
+Each benchmark runs against synthetic banks of the requested sizes and
+reports per-call latency. Results are written as JSON and, when a
+baseline file exists, compared against it: a benchmark whose median is
+more than --tolerance slower than the baseline is a regression and the
+run exits non-zero. With --check a missing baseline is an error too, so
+a CI gate cannot pass by comparing against nothing.
+
+benchmarks/baseline.json is committed; it was recorded on the machine
+named in its "meta", so regenerate it with --save-baseline on the
+machine that runs the check.
+
+Run from skill/backend:
+    python -m benchmarks.run                          # 1k, 10k, 100k
+    python -m benchmarks.run --sizes 1000 --save-baseline
+    python -m benchmarks.run --check --baseline benchmarks/baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+from benchmarks.synthetic import make_attempts, make_bank
+from core.catalog import QuestionCatalog
+from core.evaluation_service import (
+    clean_attempts,
+    compute_student_features,
+    evaluate_attempt,
+    evaluate_attempts,
+)
+from core.selector import select_questions
+from services.ai_service import predict_level
+from services.report_service import generate_paragraph
+from services.test_service import DEFAULT_BLUEPRINT, generate_test, generate_test_json
+from utils.loader import pin_catalog
+
+
+HERE = os.path.dirname(__file__)
+DEFAULT_BASELINE = os.path.join(HERE, "baseline.json")
+DEFAULT_OUTPUT = os.path.join(HERE, "results.json")
+
+
+# -------- Timing --------
+def measure(fn, min_time=0.2, max_calls=20000, rounds=5):
+    """Median / p95 / min microseconds per call over `rounds` timed rounds."""
+    fn()  # warm up
+
+    # Calibrate calls per round so each round takes ~min_time / rounds
+    calls = 1
+    while calls < max_calls:
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        if time.perf_counter() - start >= min_time / rounds:
+            break
+        calls *= 2
+
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        samples.append((time.perf_counter() - start) / calls * 1e6)
+
+    samples.sort()
+    return {
+        "median_us": round(statistics.median(samples), 3),
+        "p95_us": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "min_us": round(samples[0], 3),
+        "calls_per_round": calls,
+    }
+
+
+# -------- Benchmarks --------
+def bank_benchmarks(size, users=200):
+    bank = make_bank(size)
+
+    start = time.perf_counter()
+    catalog = pin_catalog(QuestionCatalog(bank))
+    build_ms = (time.perf_counter() - start) * 1e3
+
+    histories = make_attempts(bank, users)
+    histories = list(histories.values())
+    latest = [clean_attempts(h) for h in histories]
+    results = [evaluate_attempts(h, deduplicated=True) for h in latest]
+    features = [compute_student_features(r) for r in results]
+    reports = [
+        {"user_id": h[0]["user_id"], "answers": [
+            {"question_id": a["question_id"], "user_answer": a["answer"]} for a in h
+        ]}
+        for h in latest
+    ]
+
+    benches = {
+        "select_questions": lambda: select_questions(catalog, DEFAULT_BLUEPRINT, 1500),
+        "generate_test": lambda: generate_test(),
+        "generate_test_json": lambda: generate_test_json(),
+        "evaluate_attempt": _cycler(evaluate_attempt, reports),
+        "evaluate_attempts": _cycler(evaluate_attempts, histories),
+        "compute_student_features": _cycler(compute_student_features, results),
+        "predict_level": _cycler(predict_level, features),
+        "generate_paragraph": _cycler(lambda f: generate_paragraph(f, "medium"), features),
+    }
+
+    out = {f"catalog_build[{_label(size)}]": {"median_us": round(build_ms * 1e3, 3)}}
+    for name, fn in benches.items():
+        out[f"{name}[{_label(size)}]"] = measure(fn)
+
+    pin_catalog(None)
+    return out
+
+
+def _cycler(fn, inputs):
+    """Call fn on each input in turn so no single input stays cache-hot."""
+    state = {"i": 0}
+
+    def call():
+        i = state["i"]
+        state["i"] = (i + 1) % len(inputs)
+        return fn(inputs[i])
+
+    return call
+
+
+def _label(size):
+    return f"{size // 1000}k" if size >= 1000 and size % 1000 == 0 else str(size)
+
+
+# -------- Baseline --------
+def compare(results, baseline, tolerance):
+    regressions = []
+
+    for name, current in results.items():
+        previous = baseline.get(name)
+        # One-shot timings (catalog_build) are too noisy to gate on
+        if not previous or "calls_per_round" not in current:
+            continue
+        ratio = current["median_us"] / previous["median_us"] if previous["median_us"] else 1.0
+        if ratio > 1 + tolerance:
+            regressions.append((name, previous["median_us"], current["median_us"], ratio))
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the backend micro-benchmarks.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed median slowdown (0.25 = 25%%)")
+    parser.add_argument("--check", action="store_true", help="fail when there is no baseline to compare against")
+    args = parser.parse_args(argv)
+
+    if args.check and args.save_baseline:
+        parser.error("--check and --save-baseline are mutually exclusive")
+    if args.check and not os.path.exists(args.baseline):
+        # Fail before spending minutes on a run that cannot be checked
+        print(f"[bench] no baseline at {args.baseline}; record one with --save-baseline", file=sys.stderr)
+        return 2
+
+    results = {}
+    for size in args.sizes:
+        print(f"[bench] bank size {size}", file=sys.stderr)
+        results.update(bank_benchmarks(size))
+
+    for name, r in results.items():
+        print(f"{name:40s} {r['median_us']:>14,.1f} us")
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"[bench] baseline saved to {args.baseline}", file=sys.stderr)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("[bench] no baseline to compare against", file=sys.stderr)
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+
+    regressions = compare(results, baseline, args.tolerance)
+    for name, before, after, ratio in regressions:
+        print(f"REGRESSION {name}: {before:,.1f} -> {after:,.1f} us ({ratio:.2f}x)")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
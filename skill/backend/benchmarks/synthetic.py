@@ -0,0 +1,134 @@
+"""
+Synthetic question banks and attempt histories following the
+data/dsa_*.json schema, for benchmarks and load tests.
+"""
+import random
+
+
+TYPE_SHARE = {
+    "MCQ": 0.33,
+    "MSQ": 0.14,
+    "CODE_TRACE": 0.23,
+    "SHORT_ANSWER": 0.17,
+    "REASONING": 0.13,
+}
+
+TYPE_PREFIX = {
+    "MCQ": "MCQ",
+    "MSQ": "MSQ",
+    "CODE_TRACE": "CT",
+    "SHORT_ANSWER": "SA",
+    "REASONING": "R",
+}
+
+DIFFICULTY_SHARE = {"Easy": 0.3, "Medium": 0.5, "Hard": 0.2}
+
+TOPICS = [
+    "Arrays", "Recursion", "Stack", "Queue", "Trees", "Graphs", "Complexity",
+    "Sorting", "Searching", "Hashing", "Heap", "Linked List", "Strings",
+]
+
+MAX_TIME_SEC = [60, 90, 120, 150, 180]
+
+WORDS = [
+    "array", "index", "pointer", "node", "edge", "stack", "queue", "heap",
+    "recursion", "base case", "contiguous", "constant", "logarithmic", "hash",
+    "collision", "traversal", "balanced", "pivot", "partition", "memory",
+]
+
+
+def _weighted(rng, shares):
+    return rng.choices(list(shares), weights=list(shares.values()))[0]
+
+
+def make_question(rng, qtype, number):
+    difficulty = _weighted(rng, DIFFICULTY_SHARE)
+    topic = rng.choice(TOPICS)
+    keywords = rng.sample(WORDS, rng.randint(2, 4))
+
+    question = {
+        "id": f"SYN-{TYPE_PREFIX[qtype]}-{number:06d}",
+        "track": "DSA",
+        "topic": topic,
+        "subtopic": "Synthetic",
+        "difficulty": difficulty,
+        "question_type": qtype,
+        "question": f"Synthetic {qtype.lower()} question {number} about {topic}?",
+        "ideal_answer": " ".join(keywords) + " explain the approach.",
+        "expected_keywords": keywords,
+        "user_explanation_required": rng.random() < 0.5,
+        "evaluation": {
+            "skill_dimension": ["Conceptual Clarity"],
+            "weight": rng.choice([1, 1, 2]),
+            "max_time_sec": rng.choice(MAX_TIME_SEC),
+        },
+    }
+
+    if qtype in ("MCQ", "MSQ"):
+        options = [f"Option {number}-{i}" for i in range(4)]
+        question["options"] = options
+        k = 1 if qtype == "MCQ" else rng.randint(2, 3)
+        question["correct_answer"] = rng.sample(options, k)
+    elif qtype == "CODE_TRACE":
+        question["code"] = f"x = {number}\nprint(x % 7)"
+        question["correct_answer"] = [str(number % 7)]
+
+    return question
+
+
+def make_bank(size, seed=0):
+    """`size` questions with roughly the real bank's type/difficulty mix."""
+    rng = random.Random(seed)
+    return [make_question(rng, _weighted(rng, TYPE_SHARE), i) for i in range(size)]
+
+
+def answer_for(rng, question, correct_rate):
+    """A plausible answer to `question`, correct with `correct_rate`."""
+    qtype = question.get("question_type")
+    good = rng.random() < correct_rate
+    correct = question.get("correct_answer") or []
+
+    if qtype in ("MCQ", "MSQ"):
+        if good and correct:
+            return list(correct)
+        return rng.sample(question.get("options") or ["?"], 1)
+    if qtype == "CODE_TRACE":
+        return correct[0] if good and correct else "wrong"
+
+    keywords = question.get("expected_keywords") or question.get("keywords") or []
+    words = keywords if good and keywords else rng.sample(WORDS, 2)
+    return "I think " + " and ".join(words) + " matter here. " * rng.randint(1, 5)
+
+
+def make_attempts(bank, users, answers_per_user=9, repeat_rate=0.1,
+                  correct_rate=0.6, seed=1):
+    """
+    {user_id: [submit-answer payloads]}; about `repeat_rate` of answers
+    re-answer an earlier question, as the frontend does on edits.
+    """
+    rng = random.Random(seed)
+    histories = {}
+
+    for u in range(users):
+        user_id = f"user-{u:06d}"
+        questions = rng.sample(bank, answers_per_user)
+        payloads = []
+
+        for q in questions:
+            payloads.append(_payload(rng, user_id, q, correct_rate))
+            if rng.random() < repeat_rate:
+                payloads.append(_payload(rng, user_id, q, correct_rate))
+
+        histories[user_id] = payloads
+
+    return histories
+
+
+def _payload(rng, user_id, question, correct_rate):
+    return {
+        "user_id": user_id,
+        "attempt_id": f"{user_id}-A1",
+        "question_id": question["id"],
+        "answer": answer_for(rng, question, correct_rate),
+        "time": rng.randint(10, 200),
+    }
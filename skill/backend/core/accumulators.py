@@ -0,0 +1,80 @@
+CONCEPTUAL_TYPES = ("REASONING", "SHORT_ANSWER")
+LOGICAL_TYPES = ("CODE_TRACE",)
+
+
+# -------- Running Feature Totals --------
+class ScoreAccumulator:
+    """
+    Running totals behind compute_student_features.
+
+    Results are keyed by question id so that answering a question again
+    first subtracts the previous result, keeping the totals equal to
+    grading only the latest answer per question.
+    """
+
+    __slots__ = (
+        "total", "correct",
+        "conceptual", "conceptual_total",
+        "logical", "logical_total",
+        "time_sum", "results",
+    )
+
+    def __init__(self):
+        self.total = 0
+        self.correct = 0
+        self.conceptual = 0
+        self.conceptual_total = 0
+        self.logical = 0
+        self.logical_total = 0
+        self.time_sum = 0
+        self.results = {}
+
+    def _apply(self, r, sign):
+        self.total += sign
+        self.correct += sign * bool(r["is_correct"])
+        self.time_sum += sign * r["time"]
+
+        if r["type"] in CONCEPTUAL_TYPES:
+            self.conceptual += sign * r["score"]
+            self.conceptual_total += sign
+        elif r["type"] in LOGICAL_TYPES:
+            self.logical += sign * r["score"]
+            self.logical_total += sign
+
+    def add(self, result, question_id=None):
+        """
+        Fold in one graded result. With a question_id, a previous result
+        for the same question is replaced rather than counted twice.
+        """
+        if question_id is not None:
+            previous = self.results.get(question_id)
+            if previous is not None:
+                self._apply(previous, -1)
+            self.results[question_id] = result
+
+        self._apply(result, 1)
+
+    def features(self):
+        if not self.total:
+            return {}
+
+        avg_time = self.time_sum / self.total
+        accuracy = round((self.correct / self.total) * 100, 2)
+
+        conceptual_score = (
+            (self.conceptual / self.conceptual_total) * 100 if self.conceptual_total else 0
+        )
+
+        logical_score = (
+            (self.logical / self.logical_total) * 100 if self.logical_total else 0
+        )
+
+        speed_score = max(0, min(100, (60 / avg_time) * 100))
+
+        return {
+            "accuracy": accuracy,
+            "conceptual_score": round(conceptual_score, 2),
+            "logical_score": round(logical_score, 2),
+            "speed_score": round(speed_score, 2),
+            "avg_time": round(avg_time, 2)
+        }
@@ -0,0 +1,90 @@
+from core.keyword_matcher import KeywordMatcher
+
+
+# Bit set for any selected option that is not part of the question
+UNKNOWN_OPTION_BIT = 1 << 63
+
+
+def normalize_output(value):
+    """Whitespace-insensitive form of a CODE_TRACE output."""
+    if isinstance(value, dict):
+        value = value.get("output", "")
+    if value is None:
+        return None
+    return " ".join(str(value).split())
+
+
+def as_choice_list(user_answer):
+    if user_answer is None:
+        return []
+    if isinstance(user_answer, (list, tuple, set)):
+        return list(user_answer)
+    return [user_answer]
+
+
+def question_keywords(question):
+    return question.get("expected_keywords") or question.get("keywords") or []
+
+
+# -------- Precompiled Answer Keys --------
+class ChoiceKey:
+    """MCQ/MSQ key: options indexed as bits, correct answers as one mask."""
+
+    __slots__ = ("bit_of", "correct_mask", "n_correct")
+
+    def __init__(self, question):
+        bit_of = {}
+        # Correct answers missing from `options` still get their own bit
+        for choice in list(question.get("options") or []) + list(question.get("correct_answer") or []):
+            if choice not in bit_of and len(bit_of) < 63:
+                bit_of[choice] = 1 << len(bit_of)
+
+        correct = set(question.get("correct_answer") or [])
+        self.bit_of = bit_of
+        self.correct_mask = self.mask(correct)
+        self.n_correct = len(correct)
+
+    def mask(self, user_answer):
+        mask = 0
+        for choice in as_choice_list(user_answer):
+            try:
+                mask |= self.bit_of.get(choice, UNKNOWN_OPTION_BIT)
+            except TypeError:
+                mask |= UNKNOWN_OPTION_BIT
+        return mask
+
+
+class KeywordKey:
+    """SHORT_ANSWER/REASONING key: compiled keywords plus ideal-answer fallback."""
+
+    __slots__ = ("matcher", "fallback")
+
+    def __init__(self, question):
+        self.matcher = KeywordMatcher(question_keywords(question))
+        self.fallback = str(question.get("ideal_answer") or "").lower()[:10]
+
+
+class OutputKey:
+    """CODE_TRACE key: expected output normalized once."""
+
+    __slots__ = ("expected",)
+
+    def __init__(self, question):
+        expected = question.get("correct_answer")
+        if isinstance(expected, list):
+            expected = expected[0] if expected else ""
+        self.expected = normalize_output(expected)
+
+
+KEY_TYPES = {
+    "MCQ": ChoiceKey,
+    "MSQ": ChoiceKey,
+    "SHORT_ANSWER": KeywordKey,
+    "REASONING": KeywordKey,
+    "CODE_TRACE": OutputKey,
+}
+
+
+def compile_answer_key(question):
+    key_type = KEY_TYPES.get(question.get("question_type"))
+    return key_type(question) if key_type else None
@@ -0,0 +1,128 @@
+from bisect import bisect_left
+
+from core.answer_keys import compile_answer_key
+from core.records import ColdStore, PublicStore, QuestionRecord, as_record
+
+
+# -------- Question Field Helpers --------
+def question_time(question):
+    if type(question) is QuestionRecord:
+        return question.max_time_sec
+    return question.get("evaluation", {}).get("max_time_sec", 60)
+
+
+def question_weight(question):
+    if type(question) is QuestionRecord:
+        return question.weight
+    return question.get("evaluation", {}).get("weight", 1)
+
+
+# -------- Indexed Question Catalog --------
+class QuestionCatalog:
+    """
+    Read-only index over the question bank.
+
+    Buckets are built once so selection only touches the questions it
+    actually needs instead of rescanning the full bank:
+      - by_id                      : id -> question
+      - by_type                    : type -> questions
+      - by_type_difficulty         : (type, difficulty) -> questions
+      - by_type_difficulty_topic   : (type, difficulty, topic) -> questions sorted by max_time_sec
+      - by_topic                   : topic -> questions
+      - by_type_time               : type -> questions sorted by max_time_sec
+      - by_type_difficulty_time    : (type, difficulty) -> questions sorted by max_time_sec
+
+    Questions are stored as compact `QuestionRecord`s; each record's
+    answer key (option bitmasks, compiled keywords, normalized expected
+    output) is compiled at load time (see `answer_key`).
+    """
+
+    def __init__(self, questions):
+        self.cold_store = ColdStore()
+        self.public_store = PublicStore()
+        self.questions = tuple(as_record(q, self.cold_store, self.public_store) for q in questions)
+
+        by_id = {}
+        by_type = {}
+        by_type_difficulty = {}
+        by_type_difficulty_topic = {}
+        by_topic = {}
+
+        for q in self.questions:
+            qtype = q.question_type
+            difficulty = q.difficulty
+            topic = q.topic
+
+            by_id[q.id] = q
+            by_type.setdefault(qtype, []).append(q)
+            by_type_difficulty.setdefault((qtype, difficulty), []).append(q)
+            by_type_difficulty_topic.setdefault(
+                (qtype, difficulty, topic), []
+            ).append(q)
+            by_topic.setdefault(topic, []).append(q)
+
+        self.by_id = by_id
+        self.by_type = _freeze(by_type)
+        self.by_type_difficulty = _freeze(by_type_difficulty)
+        self.by_type_difficulty_topic = {
+            key: tuple(sorted(pool, key=question_time))
+            for key, pool in by_type_difficulty_topic.items()
+        }
+        self.by_topic = _freeze(by_topic)
+
+        # Stable sort keeps bank order among equal times
+        self.by_type_time = {
+            qtype: tuple(sorted(pool, key=question_time))
+            for qtype, pool in self.by_type.items()
+        }
+        self.by_type_difficulty_time = {
+            key: tuple(sorted(pool, key=question_time))
+            for key, pool in self.by_type_difficulty.items()
+        }
+        self._type_times = {
+            qtype: [question_time(q) for q in pool]
+            for qtype, pool in self.by_type_time.items()
+        }
+
+    def __len__(self):
+        return len(self.questions)
+
+    def __iter__(self):
+        return iter(self.questions)
+
+    def get(self, question_id, default=None):
+        return self.by_id.get(question_id, default)
+
+    def pool(self, qtype, difficulty=None, topic=None):
+        if difficulty is None and topic is None:
+            return self.by_type.get(qtype, ())
+        if topic is None:
+            return self.by_type_difficulty.get((qtype, difficulty), ())
+        return self.by_type_difficulty_topic.get((qtype, difficulty, topic), ())
+
+    def answer_key(self, question):
+        """
+        Precompiled answer key for `question`. Raw question dicts (not
+        loaded through a catalog) are compiled on the fly.
+        """
+        if type(question) is QuestionRecord:
+            return question.key
+        return compile_answer_key(question)
+
+    def fastest(self, qtype, below, exclude=()):
+        """
+        Fastest question of `qtype` with max_time_sec < `below`
+        whose id is not in `exclude`, or None.
+        """
+        pool = self.by_type_time.get(qtype, ())
+        end = bisect_left(self._type_times.get(qtype, []), below)
+
+        for i in range(end):
+            if pool[i].id not in exclude:
+                return pool[i]
+
+        return None
+
+
+def _freeze(buckets):
+    return {key: tuple(items) for key, items in buckets.items()}
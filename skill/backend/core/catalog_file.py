@@ -0,0 +1,341 @@
+"""
+Precompiled binary question catalog.
+
+Layout (little-endian):
+    8 bytes   magic b"SGCAT01\\n"
+    4 bytes   uint32 length of the JSON header
+    N bytes   JSON header: count, source hash/signature, bucket tables and
+              the (offset, length, dtype) of every section below
+    sections  8-byte aligned:
+                strings_offsets  uint32[n_strings + 1]  string table index
+                strings          utf-8 bytes
+                id, question_type, topic, difficulty
+                                 uint32[count] string-table indexes
+                                 (MISSING for absent fields)
+                weight, max_time_sec
+                                 int64 or float64[count]
+                id_order         uint32[count] rows sorted by id
+                bucket_rows      uint32[...] rows of every index bucket
+                cold_offsets     uint64[count + 1]
+                cold             utf-8 JSON of each question's cold fields
+                public_offsets   uint64[count + 1]
+                public           candidate-facing JSON of each question
+
+The file is opened with mmap, so worker processes share its pages through
+the OS page cache and opening it does not depend on bank size. Records
+(and their answer keys) are only built for questions that are touched.
+"""
+import json
+import mmap
+import os
+import struct
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+
+from core.catalog import QuestionCatalog, question_time, question_weight
+from core.records import HOT_FIELDS, QuestionRecord
+
+
+MAGIC = b"SGCAT01\n"
+FORMAT_VERSION = 3
+MISSING = 0xFFFFFFFF
+
+_HEADER_LEN = struct.Struct("<I")
+_ALIGN = 8
+
+
+# -------- Writer --------
+def _number_column(values):
+    if all(isinstance(v, int) and not isinstance(v, bool) for v in values):
+        return np.asarray(values, dtype="<i8")
+    return np.asarray(values, dtype="<f8")
+
+
+def write_catalog_file(path, questions, source_hash=None, source_signature=None):
+    """
+    Compile `questions` (dicts or records) into a catalog file at `path`.
+    The file is written next to `path` and renamed over it, so readers
+    never see a partial file.
+    """
+    catalog = QuestionCatalog(questions)
+    records = catalog.questions
+    row_of = {id(q): row for row, q in enumerate(records)}
+
+    strings = {}
+
+    def intern(value):
+        if value is None:
+            return MISSING
+        return strings.setdefault(str(value), len(strings))
+
+    columns = {
+        field: np.asarray([intern(getattr(q, field)) for q in records], dtype="<u4")
+        for field in HOT_FIELDS
+    }
+    columns["weight"] = _number_column([question_weight(q) for q in records])
+    columns["max_time_sec"] = _number_column([question_time(q) for q in records])
+    columns["id_order"] = np.asarray(
+        sorted(range(len(records)), key=lambda row: records[row].id), dtype="<u4"
+    )
+
+    # Every index bucket as a [start, end) slice of one row array
+    bucket_rows = []
+    buckets = {}
+    for name in ("by_type", "by_type_difficulty", "by_type_difficulty_topic",
+                 "by_topic", "by_type_time", "by_type_difficulty_time"):
+        table = []
+        for key, pool in getattr(catalog, name).items():
+            start = len(bucket_rows)
+            bucket_rows.extend(row_of[id(q)] for q in pool)
+            table.append([list(key) if isinstance(key, tuple) else key, start, len(bucket_rows)])
+        buckets[name] = table
+    columns["bucket_rows"] = np.asarray(bucket_rows, dtype="<u4")
+
+    cold = [q._store.get(q._index) for q in records]
+    cold_blobs = [json.dumps(c, separators=(",", ":"), ensure_ascii=False).encode("utf-8") for c in cold]
+    columns["cold_offsets"] = np.cumsum([0] + [len(b) for b in cold_blobs], dtype="<u8")
+    columns["cold"] = b"".join(cold_blobs)
+    columns["public_offsets"] = np.cumsum([0] + [len(q.public) for q in records], dtype="<u8")
+    columns["public"] = b"".join(q.public for q in records)
+
+    encoded = [s.encode("utf-8") for s in strings]
+    columns["strings_offsets"] = np.cumsum([0] + [len(s) for s in encoded], dtype="<u4")
+    columns["strings"] = b"".join(encoded)
+
+    sections = {}
+    payload = []
+    offset = 0
+    for name, data in columns.items():
+        raw = data if isinstance(data, bytes) else data.tobytes()
+        sections[name] = [offset, len(raw), None if isinstance(data, bytes) else data.dtype.str]
+        payload.append(raw)
+        offset += len(raw)
+        pad = -offset % _ALIGN
+        payload.append(b"\0" * pad)
+        offset += pad
+
+    header = {
+        "version": FORMAT_VERSION,
+        "count": len(records),
+        "source_hash": source_hash,
+        "source_signature": source_signature,
+        "buckets": buckets,
+        "sections": sections,
+    }
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    header_bytes += b" " * (-(len(MAGIC) + _HEADER_LEN.size + len(header_bytes)) % _ALIGN)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(_HEADER_LEN.pack(len(header_bytes)))
+        f.write(header_bytes)
+        for raw in payload:
+            f.write(raw)
+    os.replace(tmp_path, path)
+
+    return header
+
+
+# -------- Reader --------
+def read_header(path):
+    """(header dict, byte offset of the first section) without mapping the file."""
+    with open(path, "rb") as f:
+        magic = f.read(len(MAGIC))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a catalog file")
+        (length,) = _HEADER_LEN.unpack(f.read(_HEADER_LEN.size))
+        header = json.loads(f.read(length))
+
+    if header.get("version") != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported catalog format {header.get('version')}")
+    return header, len(MAGIC) + _HEADER_LEN.size + length
+
+
+class _MappedCold:
+    """Cold-field store backed by the file's `cold` section."""
+
+    __slots__ = ("_buffer", "_offsets")
+
+    def __init__(self, buffer, offsets):
+        self._buffer = buffer
+        self._offsets = offsets
+
+    def get(self, index):
+        start, end = int(self._offsets[index]), int(self._offsets[index + 1])
+        return json.loads(bytes(self._buffer[start:end]))
+
+
+class _MappedPublic:
+    """Public JSON store backed by the file's `public` section."""
+
+    __slots__ = ("_buffer", "_offsets")
+
+    def __init__(self, buffer, offsets):
+        self._buffer = buffer
+        self._offsets = offsets
+
+    def get(self, index):
+        start, end = int(self._offsets[index]), int(self._offsets[index + 1])
+        return bytes(self._buffer[start:end])
+
+
+class _Rows(Sequence):
+    """Read-only sequence of records for a slice of row numbers."""
+
+    __slots__ = ("_catalog", "_rows")
+
+    def __init__(self, catalog, rows):
+        self._catalog = catalog
+        self._rows = rows
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._catalog._record(row) for row in self._rows[i].tolist()]
+        return self._catalog._record(int(self._rows[i]))
+
+    def __iter__(self):
+        record = self._catalog._record
+        for row in self._rows.tolist():
+            yield record(row)
+
+
+class _IdIndex(Mapping):
+    """id -> record, by binary search over the file's sorted id order."""
+
+    __slots__ = ("_catalog",)
+
+    def __init__(self, catalog):
+        self._catalog = catalog
+
+    def __getitem__(self, question_id):
+        row = self._catalog._row_of(question_id)
+        if row is None:
+            raise KeyError(question_id)
+        return self._catalog._record(row)
+
+    def __contains__(self, question_id):
+        return self._catalog._row_of(question_id) is not None
+
+    def __len__(self):
+        return self._catalog.count
+
+    def __iter__(self):
+        for row in range(self._catalog.count):
+            yield self._catalog._string(int(self._catalog._columns["id"][row]))
+
+
+class MappedCatalog(QuestionCatalog):
+    """
+    QuestionCatalog served from a memory-mapped catalog file.
+
+    Buckets, ids and times come straight from the mapped arrays; a
+    QuestionRecord is built (and cached) the first time a question is
+    handed out, so startup cost does not grow with the bank.
+    """
+
+    def __init__(self, path):
+        header, base = read_header(path)
+
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.path = path
+        self.header = header
+        self.count = header["count"]
+        self.source_hash = header.get("source_hash")
+
+        buffer = memoryview(self._mmap)
+        columns = {}
+        for name, (offset, length, dtype) in header["sections"].items():
+            start = base + offset
+            if dtype is None:
+                columns[name] = buffer[start:start + length]
+            else:
+                columns[name] = np.frombuffer(self._mmap, dtype=np.dtype(dtype),
+                                              count=length // np.dtype(dtype).itemsize, offset=start)
+        self._columns = columns
+        self._cold = _MappedCold(columns["cold"], columns["cold_offsets"])
+        self._public = _MappedPublic(columns["public"], columns["public_offsets"])
+        self._records = {}
+        self._row_cache = {}
+
+        rows = columns["bucket_rows"]
+        for name, table in header["buckets"].items():
+            setattr(self, name, {
+                tuple(key) if isinstance(key, list) else key: _Rows(self, rows[start:end])
+                for key, start, end in table
+            })
+
+        times = columns["max_time_sec"]
+        self._type_times = {
+            qtype: times[pool._rows] for qtype, pool in self.by_type_time.items()
+        }
+
+        self.questions = _Rows(self, np.arange(self.count, dtype=np.uint32))
+        self.by_id = _IdIndex(self)
+        self.cold_store = self._cold
+        self.public_store = self._public
+
+    # -------- Row Access --------
+    def _string(self, index):
+        if index == MISSING:
+            return None
+        offsets = self._columns["strings_offsets"]
+        start, end = int(offsets[index]), int(offsets[index + 1])
+        return bytes(self._columns["strings"][start:end]).decode("utf-8")
+
+    def _row_of(self, question_id):
+        row = self._row_cache.get(question_id)
+        if row is not None:
+            return row
+
+        order = self._columns["id_order"]
+        ids = self._columns["id"]
+        lo, hi = 0, len(order)
+
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._string(int(ids[order[mid]])) < question_id:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        if lo < len(order) and self._string(int(ids[order[lo]])) == question_id:
+            row = int(order[lo])
+            self._row_cache[question_id] = row
+            return row
+        return None
+
+    def _record(self, row):
+        record = self._records.get(row)
+        if record is not None:
+            return record
+
+        columns = self._columns
+        question = {field: self._string(int(columns[field][row])) for field in HOT_FIELDS}
+        question = {k: v for k, v in question.items() if v is not None}
+        question.update(self._cold.get(row))
+
+        record = QuestionRecord(
+            question, store=self._cold, index=row, publics=self._public, public_index=row
+        )
+        # Two threads may build the same row; either copy is equivalent
+        return self._records.setdefault(row, record)
+
+    def fastest(self, qtype, below, exclude=()):
+        pool = self.by_type_time.get(qtype, ())
+        times = self._type_times.get(qtype)
+        end = int(np.searchsorted(times, below, side="left")) if times is not None else 0
+
+        for i in range(end):
+            q = pool[i]
+            if q.id not in exclude:
+                return q
+
+        return None
+
@@ -1,10 +1,8 @@
-from core.evaluator import evaluate_answer
-from utils.loader import load_full_dataset
-
-
-# 🔥 Load dataset once (fast & scalable)
-DATASET = load_full_dataset()
-QUESTION_MAP = {q["id"]: q for q in DATASET}
+from core.accumulators import ScoreAccumulator
+from core.catalog import question_weight
+from core.grading import grade_many, grade_one
+from utils.loader import get_catalog
+from utils.metrics import stage
 
 
 # -------- Readiness Classification --------
@@ -46,23 +44,25 @@ def generate_summary(percent, readiness, strong, weak):
 # -------- Detailed Attempt Evaluation --------
 def evaluate_attempt(attempt_data):
 
-    question_lookup = QUESTION_MAP
+    catalog = get_catalog()
 
     total_score = 0
     max_score = 0
     topic_scores = {}
     detailed_results = []
 
+    graded = []
     for answer in attempt_data.get("answers", []):
+        question = catalog.by_id.get(answer["question_id"])
+        if question:
+            graded.append((question, answer.get("user_answer")))
 
-        question = question_lookup.get(answer["question_id"])
-        if not question:
-            continue
+    with stage("grading"):
+        grades = grade_many(graded, catalog)
 
-        result = evaluate_answer(question, answer.get("user_answer"))
+    for (question, _), (score, _, feedback) in zip(graded, grades):
 
-        score = result["score"]
-        weight = question.get("evaluation", {}).get("weight", 1)
+        weight = question_weight(question)
         weighted_score = score * weight
 
         total_score += weighted_score
@@ -81,7 +81,7 @@ def evaluate_attempt(attempt_data):
             "topic": topic,
             "score": round(weighted_score, 2),
             "max_score": weight,
-            "feedback": result["feedback"]
+            "feedback": feedback
         })
 
     # -------- Final Calculations --------
@@ -125,131 +125,54 @@ def clean_attempts(attempts):
 
     return list(latest.values())
 # -------- Lightweight Fast Evaluation (for Phase 1 test) --------
-def evaluate_attempts(attempts):
-    attempts=clean_attempts(attempts)
-    results = []
+def _result_row(q, a, score, is_correct):
+    return {
+        "type": q["question_type"],
+        "topic": q.get("topic"),
+        "difficulty": q.get("difficulty"),
+        "is_correct": is_correct,
+        "time": a.get("time", 60),
+        "score": score
+    }
 
-    for a in attempts:
-        score=0
-        q = QUESTION_MAP.get(a["question_id"])
-        if not q:
-            continue
-
-        user_answer = a.get("answer")
-        time_taken = a.get("time", 60)
-        is_correct = False
-
-        # -------- MCQ --------
-        if q["question_type"] == "MCQ":
-            is_correct = user_answer == q.get("correct_answer")
-            score=1 if is_correct else 0
-
-        # -------- MSQ --------
-        elif q["question_type"] == "MSQ":
-            correct = set(q.get("correct_answer", []))
-            user = set(user_answer if isinstance(user_answer, list) else [])
-
-            if not correct:
-                is_correct = False
-                score = 0
-            else:
-                match = len(correct & user)
-                score = match / len(correct)
-                is_correct = score >= 0.6
-
-        # -------- SHORT / REASONING --------
-        elif q["question_type"] in ["SHORT_ANSWER", "REASONING"]:
-
-            keywords = q.get("keywords", [])
-            correct_text = str(q.get("correct_answer", "")).lower()
-
-            if not user_answer:
-                score = 0
-                is_correct = False
-
-            else:
-                user = str(user_answer).lower()
-
-                # 🔥 Use keywords if available
-                if keywords:
-                    match = sum(1 for k in keywords if k.lower() in user)
-                    score = match / len(keywords)
-
-                # 🔥 fallback if no keywords
-                else:
-                    score = 0.5 if correct_text[:10] in user else 0.2
-
-                is_correct = score >= 0.4
-
-        # -------- CODE TRACE --------
-        elif q["question_type"] == "CODE_TRACE":
-
-            expected = q.get("correct_answer")
-
-            if isinstance(expected, list):
-                expected = expected[0]
-
-            if user_answer is not None:
-                is_correct = str(user_answer).strip() == str(expected).strip()
-                score = 1 if is_correct else 0
-            else:
-                score = 0
-
-        results.append({
-            "type": q["question_type"],
-            "topic": q.get("topic"),
-            "difficulty": q.get("difficulty"),
-            "is_correct": is_correct,
-            "time": time_taken,
-            "score": score 
-        })
 
-    return results
+def grade_answer(q, a, catalog=None):
 
-    print(results)
-# -------- Student Skill Features --------
-# -------- Student Skill Features --------
-def compute_student_features(results):
+    score, is_correct, _ = grade_one(q, a.get("answer"), catalog or get_catalog())
+    return _result_row(q, a, score, is_correct)
 
-    if not results:
-        return {}
-
-    total = len(results)
-    correct = sum(r["is_correct"] for r in results)
 
-    conceptual = sum(
-        r["score"] for r in results if r["type"] in ["REASONING", "SHORT_ANSWER"]
-    )
+def evaluate_attempts(attempts, deduplicated=False):
+    # Attempt stores already return the latest answer per question
+    if not deduplicated:
+        attempts=clean_attempts(attempts)
+    catalog = get_catalog()
+    known = []
 
-    logical = sum(
-        r["score"] for r in results if r["type"] == "CODE_TRACE"
-    )
+    for a in attempts:
+        q = catalog.by_id.get(a["question_id"])
+        if q:
+            known.append((q, a))
 
-    conceptual_total = sum(
-        1 for r in results if r["type"] in ["REASONING", "SHORT_ANSWER"]
-    )
+    with stage("grading"):
+        grades = grade_many([(q, a.get("answer")) for q, a in known], catalog)
 
-    logical_total = sum(
-        1 for r in results if r["type"] == "CODE_TRACE"
-    )
+    return [
+        _result_row(q, a, score, is_correct)
+        for (q, a), (score, is_correct, _) in zip(known, grades)
+    ]
 
-    avg_time = sum(r["time"] for r in results) / total
-    accuracy = round((correct / total) * 100, 2)
 
-    conceptual_score = (
-        (conceptual / conceptual_total) * 100 if conceptual_total else 0
-    )
+# -------- Student Skill Features --------
+def compute_student_features(results):
 
-    logical_score = (
-        (logical / logical_total) * 100 if logical_total else 0
-    )
+    if not results:
+        return {}
 
-    speed_score = max(0, min(100, (60 / avg_time) * 100))
+    # Single pass over results, same totals as the live per-user accumulator
+    with stage("features"):
+        acc = ScoreAccumulator()
+        for r in results:
+            acc.add(r)
 
-    return {
-        "accuracy": accuracy,
-        "conceptual_score": round(conceptual_score, 2),
-        "logical_score": round(logical_score, 2),
-        "speed_score": round(speed_score, 2),
-        "avg_time": round(avg_time, 2)
-    }
+        return acc.features()
@@ -0,0 +1,193 @@
+import json
+import zipfile
+
+import numpy as np
+
+
+# Bumped whenever the saved array layout changes
+SAVE_VERSION = 1
+
+FEATURE_NAMES = [
+    "accuracy",
+    "conceptual_score",
+    "logical_score",
+    "speed_score",
+    "avg_time",
+]
+
+
+# -------- Array-Compiled Random Forest --------
+class CompiledForest:
+    """
+    A fitted sklearn RandomForestClassifier flattened into NumPy arrays.
+
+    All trees share one node table (feature index, threshold, children,
+    per-leaf class probabilities). `children` is interleaved as
+    [right, left] per node so the next node is one gather at
+    `2 * node + (x <= threshold)`. Leaves point to themselves, so every
+    tree is walked in lock-step for `max_depth` steps with a few
+    vectorised gathers instead of a per-tree Python loop or a DataFrame.
+
+    Comparisons follow sklearn exactly: inputs are cast to float32 and
+    compared `<=` against the float64 thresholds, per-tree probabilities
+    are normalised per leaf, summed in tree order and averaged.
+    """
+
+    def __init__(self, feature, threshold, children, leaf_proba, roots,
+                 max_depth, classes, feature_names, labels=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.leaf_proba = leaf_proba
+        self.roots = roots
+        self.max_depth = max_depth
+        self.classes = classes
+        self.feature_names = list(feature_names)
+        self.labels = labels if labels is not None else classes
+        self.n_trees = len(roots)
+
+    @classmethod
+    def from_sklearn(cls, model, labels=None):
+        """
+        `labels` maps model classes to output values, e.g. a LabelEncoder's
+        `classes_` when the model was trained on encoded targets.
+        """
+        features, thresholds, children, probas, roots = [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            is_leaf = tree.children_left == -1
+            node_ids = np.arange(offset, offset + n)
+
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            left = np.where(is_leaf, node_ids, tree.children_left + offset)
+            right = np.where(is_leaf, node_ids, tree.children_right + offset)
+            children.append(np.column_stack([right, left]).ravel())
+
+            value = tree.value[:, 0, :model.n_classes_].astype(np.float64)
+            normalizer = value.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            probas.append(value / normalizer)
+
+            roots.append(offset)
+            max_depth = max(max_depth, tree.max_depth)
+            offset += n
+
+        classes = np.asarray(model.classes_)
+        if labels is not None:
+            labels = np.asarray(labels)[classes.astype(np.intp)]
+
+        return cls(
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            children=np.concatenate(children).astype(np.intp),
+            leaf_proba=np.concatenate(probas),
+            roots=np.asarray(roots, dtype=np.intp),
+            max_depth=max_depth,
+            classes=classes,
+            feature_names=getattr(model, "feature_names_in_", FEATURE_NAMES),
+            labels=labels,
+        )
+
+    # -------- Saved Arrays --------
+    def save(self, path, source_hash=None):
+        """
+        Write the compiled arrays as an .npz so later processes can load
+        the forest without unpickling the sklearn model (and importing
+        scikit-learn, SciPy and pandas along with it).
+        """
+        labels = np.asarray(self.labels)
+        if labels.dtype == object:
+            labels = labels.astype(str)
+
+        meta = {"version": SAVE_VERSION, "max_depth": int(self.max_depth), "source_hash": source_hash}
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                meta=np.array(json.dumps(meta)),
+                feature=self.feature,
+                threshold=self.threshold,
+                children=self.children,
+                leaf_proba=self.leaf_proba,
+                roots=self.roots,
+                classes=self.classes,
+                feature_names=np.array(self.feature_names),
+                labels=labels,
+            )
+
+    @classmethod
+    def load(cls, path, source_hash=None):
+        """
+        A forest saved by `save`, or None if the file is missing, from an
+        older layout, or (given source_hash) compiled from another model.
+        """
+        try:
+            data = np.load(path, allow_pickle=False)
+        except (OSError, ValueError, zipfile.BadZipFile):
+            return None
+
+        with data:
+            if "meta" not in data:
+                return None
+            meta = json.loads(str(data["meta"]))
+            if meta.get("version") != SAVE_VERSION:
+                return None
+            if source_hash is not None and meta.get("source_hash") != source_hash:
+                return None
+
+            return cls(
+                feature=data["feature"],
+                threshold=data["threshold"],
+                children=data["children"],
+                leaf_proba=data["leaf_proba"],
+                roots=data["roots"],
+                max_depth=meta["max_depth"],
+                classes=data["classes"],
+                feature_names=data["feature_names"].tolist(),
+                labels=data["labels"],
+            )
+
+    # -------- Input Conversion --------
+    def vector(self, features):
+        if isinstance(features, dict):
+            features = [features[name] for name in self.feature_names]
+        return np.asarray(features, dtype=np.float32)
+
+    def matrix(self, rows):
+        rows = list(rows)
+        if rows and isinstance(rows[0], dict):
+            names = self.feature_names
+            rows = [[r[name] for name in names] for r in rows]
+        return np.asarray(rows, dtype=np.float32).reshape(len(rows), len(self.feature_names))
+
+    # -------- Single Prediction --------
+    def predict_proba_one(self, features):
+        x = self.vector(features)
+        feature, threshold, children = self.feature, self.threshold, self.children
+        node = self.roots
+
+        for _ in range(self.max_depth):
+            node = children[2 * node + (x[feature[node]] <= threshold[node])]
+
+        return np.add.reduce(self.leaf_proba[node], axis=0) / self.n_trees
+
+    def predict_one(self, features):
+        return self.labels[np.argmax(self.predict_proba_one(features))]
+
+    # -------- Batch Prediction --------
+    def predict_proba(self, X):
+        X = self.matrix(X) if not isinstance(X, np.ndarray) else X.astype(np.float32, copy=False)
+        node = np.broadcast_to(self.roots, (X.shape[0], self.n_trees))
+
+        for _ in range(self.max_depth):
+            values = np.take_along_axis(X, self.feature[node], axis=1)
+            node = self.children[2 * node + (values <= self.threshold[node])]
+
+        return np.add.reduce(self.leaf_proba[node], axis=1) / self.n_trees
+
+    def predict(self, X):
+        return self.labels[np.argmax(self.predict_proba(X), axis=1)]
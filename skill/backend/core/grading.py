@@ -0,0 +1,173 @@
+import numpy as np
+
+from core.answer_keys import compile_answer_key, normalize_output
+
+
+# -------- Popcount --------
+if hasattr(np, "bitwise_count"):
+    def _popcount(masks):
+        return np.bitwise_count(masks).astype(np.int64)
+else:
+    def _popcount(masks):
+        as_bytes = masks.astype(np.uint64).view(np.uint8).reshape(len(masks), 8)
+        return np.unpackbits(as_bytes, axis=1).sum(axis=1).astype(np.int64)
+
+
+# -------- Per-Type Graders --------
+# Each grader has a scalar path (one answer, no NumPy overhead) and a
+# batch path (many answers to the same question). Both return
+# (score, is_correct, feedback); the batch path returns arrays/lists.
+
+class MCQGrader:
+
+    @staticmethod
+    def one(key, user_answer):
+        is_correct = key.mask(user_answer) == key.correct_mask
+        return (1.0 if is_correct else 0.0), is_correct, "Correct" if is_correct else "Incorrect"
+
+    @staticmethod
+    def batch(key, user_answers):
+        masks = np.fromiter((key.mask(a) for a in user_answers), dtype=np.uint64, count=len(user_answers))
+        is_correct = masks == np.uint64(key.correct_mask)
+        feedback = ["Correct" if c else "Incorrect" for c in is_correct]
+        return is_correct.astype(np.float64), is_correct, feedback
+
+
+class MSQGrader:
+
+    @staticmethod
+    def one(key, user_answer):
+        if not key.n_correct:
+            return 0.0, False, "Invalid question"
+        matched = bin(key.mask(user_answer) & key.correct_mask).count("1")
+        score = matched / key.n_correct
+        return score, score >= 0.6, f"{matched}/{key.n_correct} options correct"
+
+    @staticmethod
+    def batch(key, user_answers):
+        n = len(user_answers)
+        if not key.n_correct:
+            return np.zeros(n), np.zeros(n, dtype=bool), ["Invalid question"] * n
+
+        masks = np.fromiter((key.mask(a) for a in user_answers), dtype=np.uint64, count=n)
+        matched = _popcount(masks & np.uint64(key.correct_mask))
+        scores = matched / key.n_correct
+        feedback = [f"{m}/{key.n_correct} options correct" for m in matched]
+        return scores, scores >= 0.6, feedback
+
+
+class KeywordGrader:
+    """SHORT_ANSWER and REASONING: share of keywords covered."""
+
+    def __init__(self, feedback):
+        self.feedback = feedback
+
+    def _score(self, key, user_answer, matched):
+        if not user_answer:
+            return 0.0
+        if len(key.matcher):
+            return matched / len(key.matcher)
+        # No keywords: partial credit if the ideal answer's opening appears
+        return 0.5 if key.fallback in str(user_answer).lower() else 0.2
+
+    def _feedback(self, matched):
+        return self.feedback.format(matched=matched)
+
+    def one(self, key, user_answer):
+        matched = key.matcher.count(user_answer) if user_answer else 0
+        score = self._score(key, user_answer, matched)
+        return score, score >= 0.4, self._feedback(matched)
+
+    def batch(self, key, user_answers):
+        matched = key.matcher.count_many(a if a else "" for a in user_answers)
+        scores = np.array([
+            self._score(key, a, m) for a, m in zip(user_answers, matched)
+        ], dtype=np.float64)
+        return scores, scores >= 0.4, [self._feedback(m) for m in matched]
+
+
+class CodeTraceGrader:
+
+    @staticmethod
+    def one(key, user_answer):
+        is_correct = normalize_output(user_answer) == key.expected
+        return (1.0 if is_correct else 0.0), is_correct, "Correct output" if is_correct else "Incorrect output"
+
+    @staticmethod
+    def batch(key, user_answers):
+        is_correct = np.array([normalize_output(a) == key.expected for a in user_answers], dtype=bool)
+        feedback = ["Correct output" if c else "Incorrect output" for c in is_correct]
+        return is_correct.astype(np.float64), is_correct, feedback
+
+
+GRADERS = {
+    "MCQ": MCQGrader,
+    "MSQ": MSQGrader,
+    "SHORT_ANSWER": KeywordGrader("Covered {matched} key concepts"),
+    "REASONING": KeywordGrader("Reasoning evaluated"),
+    "CODE_TRACE": CodeTraceGrader,
+}
+
+UNKNOWN_TYPE_FEEDBACK = "Unknown question type"
+
+
+def _key_for(question, catalog):
+    if catalog is not None:
+        return catalog.answer_key(question)
+    return compile_answer_key(question)
+
+
+# -------- Public Interface --------
+def grade_one(question, user_answer, catalog=None):
+    """(score, is_correct, feedback) for one answer; score is in [0, 1]."""
+    grader = GRADERS.get(question.get("question_type"))
+    if grader is None:
+        return 0.0, False, UNKNOWN_TYPE_FEEDBACK
+
+    score, is_correct, feedback = grader.one(_key_for(question, catalog), user_answer)
+    return float(score), bool(is_correct), feedback
+
+
+def grade_batch(question, user_answers, catalog=None):
+    """
+    Grade many answers to the same question.
+    Returns (scores: float array, is_correct: bool array, feedback: list).
+    """
+    user_answers = list(user_answers)
+    grader = GRADERS.get(question.get("question_type"))
+    n = len(user_answers)
+
+    if grader is None:
+        return np.zeros(n), np.zeros(n, dtype=bool), [UNKNOWN_TYPE_FEEDBACK] * n
+    if not n:
+        return np.zeros(0), np.zeros(0, dtype=bool), []
+
+    return grader.batch(_key_for(question, catalog), user_answers)
+
+
+def grade_many(items, catalog=None):
+    """
+    Grade (question, user_answer) pairs of mixed questions, grouping
+    answers by question so each group goes through the batch grader.
+    Returns a list of (score, is_correct, feedback) in input order.
+    """
+    items = list(items)
+    groups = {}
+
+    for i, (question, user_answer) in enumerate(items):
+        group = groups.setdefault(id(question), (question, [], []))
+        group[1].append(i)
+        group[2].append(user_answer)
+
+    out = [None] * len(items)
+
+    for question, indexes, answers in groups.values():
+        if len(answers) == 1:
+            out[indexes[0]] = grade_one(question, answers[0], catalog)
+            continue
+
+        scores, correct, feedback = grade_batch(question, answers, catalog)
+        for i, s, c, f in zip(indexes, scores.tolist(), correct.tolist(), feedback):
+            out[i] = (s, c, f)
+
+    return out
@@ -0,0 +1,185 @@
+import math
+import random
+
+import numpy as np
+
+
+# Prior item difficulty (IRT b, logits) by the bank's difficulty label
+DIFFICULTY_PRIOR = {"Easy": -1.0, "Medium": 0.0, "Hard": 1.0}
+DEFAULT_DISCRIMINATION = 1.0
+
+# Pseudo-responses the difficulty prior is worth during calibration
+PRIOR_WEIGHT = 20
+# Discrimination: ridge strength pulling a towards the default, the range it
+# is clamped to, and the other answers a candidate needs for an ability proxy
+DISCRIMINATION_PRIOR_WEIGHT = 10.0
+DISCRIMINATION_RANGE = (0.2, 3.0)
+MIN_REST_ANSWERS = 3
+NEWTON_STEPS = 12
+
+# Ability grid for EAP estimation: N(0, 1) prior on [-4, 4]
+THETA_GRID = np.linspace(-4.0, 4.0, 81)
+LOG_PRIOR = -0.5 * THETA_GRID ** 2
+
+# Items around the current ability (by b) scored for information
+SELECTION_WINDOW = 24
+# Pick at random among this many most informative items (exposure control)
+RANDOMESQUE = 3
+
+
+def _logistic(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _logit(p):
+    return np.log(p / (1.0 - p))
+
+
+# -------- Calibration --------
+def calibrate(questions, candidates=()):
+    """
+    2PL parameters {question_id: (a, b)} for every question.
+
+    `candidates` yields one list of (question_id, is_correct) per
+    candidate. b starts at the difficulty prior and is shrunk towards the
+    observed difficulty -logit(p) as responses accumulate. a is fitted
+    per item by penalized Newton steps on the 2PL likelihood with b held
+    fixed, against each candidate's standardized rest score (their correct
+    rate on their other answers) as the ability; the ridge towards
+    DEFAULT_DISCRIMINATION keeps thinly answered items near it.
+    """
+    index = {q.id: i for i, q in enumerate(questions)}
+    items, users, correct = [], [], []
+    for user, responses in enumerate(candidates):
+        for question_id, is_correct in responses:
+            i = index.get(question_id)
+            if i is not None:
+                items.append(i)
+                users.append(user)
+                correct.append(bool(is_correct))
+
+    n_items = len(questions)
+    items = np.array(items, dtype=np.int64)
+    users = np.array(users, dtype=np.int64)
+    y = np.array(correct, dtype=np.float64)
+
+    prior_b = np.array([DIFFICULTY_PRIOR.get(q.difficulty, 0.0) for q in questions])
+    n = np.bincount(items, minlength=n_items).astype(np.float64)
+    k = np.bincount(items, weights=y, minlength=n_items)
+
+    # Add-half smoothing keeps all-correct / all-wrong items finite
+    observed_b = -_logit((k + 0.5) / (n + 1.0)) / DEFAULT_DISCRIMINATION
+    b = (n * observed_b + PRIOR_WEIGHT * prior_b) / (n + PRIOR_WEIGHT)
+    a = _fit_discrimination(items, users, y, b, n_items)
+
+    return {q.id: (float(a[i]), float(b[i])) for i, q in enumerate(questions)}
+
+
+def _fit_discrimination(items, users, y, b, n_items):
+    a = np.full(n_items, DEFAULT_DISCRIMINATION)
+    if not len(items):
+        return a
+
+    # Rest score per response: the candidate's other answers only
+    answered = np.bincount(users).astype(np.float64)[users] - 1.0
+    rest_correct = np.bincount(users, weights=y)[users] - y
+    usable = answered >= MIN_REST_ANSWERS
+    if usable.sum() < 2:
+        return a
+
+    theta = _logit((rest_correct[usable] + 0.5) / (answered[usable] + 1.0))
+    spread = theta.std()
+    if spread <= 1e-9:
+        return a
+    theta = (theta - theta.mean()) / spread
+
+    items, y = items[usable], y[usable]
+    d = theta - b[items]
+    low, high = DISCRIMINATION_RANGE
+    for _ in range(NEWTON_STEPS):
+        p = _logistic(a[items] * d)
+        grad = np.bincount(items, weights=(y - p) * d, minlength=n_items)
+        grad -= DISCRIMINATION_PRIOR_WEIGHT * (a - DEFAULT_DISCRIMINATION)
+        curvature = np.bincount(items, weights=p * (1.0 - p) * d * d, minlength=n_items)
+        a = np.clip(a + grad / (curvature + DISCRIMINATION_PRIOR_WEIGHT), low, high)
+    return a
+
+
+# -------- Item Bank --------
+class ItemBank:
+    """
+    Catalog questions ordered by IRT difficulty, for max-information
+    selection: around ability theta the most informative 2PL items have b
+    near theta, so only a window of the sorted array is scored.
+    """
+
+    def __init__(self, questions, params):
+        order = sorted(questions, key=lambda q: params[q.id][1])
+        self.questions = order
+        self.a = np.array([params[q.id][0] for q in order])
+        self.b = np.array([params[q.id][1] for q in order])
+        self.index_of = {q.id: i for i, q in enumerate(order)}
+
+    def __len__(self):
+        return len(self.questions)
+
+    def question(self, question_id):
+        i = self.index_of.get(question_id)
+        return self.questions[i] if i is not None else None
+
+    def params(self, question_id):
+        i = self.index_of.get(question_id)
+        if i is None:
+            return None
+        return self.a[i], self.b[i]
+
+    def next_item(self, theta, exclude):
+        """The most informative question at theta not in exclude, or None."""
+        n = len(self.questions)
+        if not n:
+            return None
+
+        center = int(np.searchsorted(self.b, theta))
+        window = SELECTION_WINDOW + len(exclude)
+        lo, hi = max(0, center - window), min(n, center + window)
+
+        candidates = [i for i in range(lo, hi) if self.questions[i].id not in exclude]
+        if not candidates:
+            candidates = [i for i in range(n) if self.questions[i].id not in exclude]
+            if not candidates:
+                return None
+
+        idx = np.array(candidates)
+        p = _logistic(self.a[idx] * (theta - self.b[idx]))
+        info = self.a[idx] ** 2 * p * (1.0 - p)
+
+        top = idx[np.argsort(-info)[:RANDOMESQUE]]
+        return self.questions[int(random.choice(top))]
+
+
+# -------- Ability Estimate --------
+class AbilityEstimate:
+    """
+    EAP ability estimate on a fixed grid. Each response adds its
+    log-likelihood to the grid, so an update costs the same however many
+    items have been answered.
+    """
+
+    __slots__ = ("log_post", "theta", "se", "answered")
+
+    def __init__(self):
+        self.log_post = LOG_PRIOR.copy()
+        self.answered = 0
+        self._summarize()
+
+    def update(self, a, b, is_correct):
+        p = _logistic(a * (THETA_GRID - b))
+        self.log_post += np.log(p if is_correct else 1.0 - p)
+        self.answered += 1
+        self._summarize()
+
+    def _summarize(self):
+        w = np.exp(self.log_post - self.log_post.max())
+        w /= w.sum()
+        self.theta = float(w @ THETA_GRID)
+        self.se = float(math.sqrt(max(w @ (THETA_GRID - self.theta) ** 2, 0.0)))
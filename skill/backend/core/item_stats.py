@@ -0,0 +1,229 @@
+import math
+
+
+# Score histogram: equal-width bins over [0, 1]
+SCORE_BINS = 5
+
+# Suggestions need this many answers behind them
+MIN_SAMPLES = 30
+# Suggested time limit: mean + TIME_SPREAD standard deviations, in TIME_STEP steps
+TIME_SPREAD = 2.0
+TIME_STEP = 15
+MIN_TIME = 30
+# Correct rate above EASY_RATE suggests weight 1, below HARD_RATE weight 3
+EASY_RATE = 0.75
+HARD_RATE = 0.4
+
+
+# -------- Welford Moments --------
+class RunningMoments:
+    """Count, mean and variance in one pass (Welford); values can be removed again."""
+
+    __slots__ = ("n", "mean", "m2")
+
+    def __init__(self, n=0, mean=0.0, m2=0.0):
+        self.n = n
+        self.mean = mean
+        self.m2 = m2
+
+    def add(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def remove(self, x):
+        if self.n <= 1:
+            self.n, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        delta = x - self.mean
+        self.n -= 1
+        self.mean -= delta / self.n
+        self.m2 = max(0.0, self.m2 - delta * (x - self.mean))
+
+    def merge(self, other):
+        """Fold in another RunningMoments (Chan et al. pairwise update)."""
+        if not other.n:
+            return
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.mean += delta * other.n / n
+        self.n = n
+
+    @property
+    def variance(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+class RunningCovariance:
+    """Pearson correlation of (x, y) pairs, updated one pair at a time."""
+
+    __slots__ = ("n", "mean_x", "mean_y", "m2_x", "m2_y", "c_xy")
+
+    def __init__(self, n=0, mean_x=0.0, mean_y=0.0, m2_x=0.0, m2_y=0.0, c_xy=0.0):
+        self.n = n
+        self.mean_x = mean_x
+        self.mean_y = mean_y
+        self.m2_x = m2_x
+        self.m2_y = m2_y
+        self.c_xy = c_xy
+
+    def add(self, x, y):
+        self.n += 1
+        dx = x - self.mean_x
+        dy = y - self.mean_y
+        self.mean_x += dx / self.n
+        self.mean_y += dy / self.n
+        self.m2_x += dx * (x - self.mean_x)
+        self.m2_y += dy * (y - self.mean_y)
+        self.c_xy += dx * (y - self.mean_y)
+
+    def remove(self, x, y):
+        if self.n <= 1:
+            self.n, self.mean_x, self.mean_y = 0, 0.0, 0.0
+            self.m2_x = self.m2_y = self.c_xy = 0.0
+            return
+        dx = x - self.mean_x
+        dy = y - self.mean_y
+        self.n -= 1
+        self.mean_x -= dx / self.n
+        self.mean_y -= dy / self.n
+        self.m2_x = max(0.0, self.m2_x - dx * (x - self.mean_x))
+        self.m2_y = max(0.0, self.m2_y - dy * (y - self.mean_y))
+        self.c_xy -= dx * (y - self.mean_y)
+
+    def merge(self, other):
+        if not other.n:
+            return
+        n = self.n + other.n
+        dx = other.mean_x - self.mean_x
+        dy = other.mean_y - self.mean_y
+        scale = self.n * other.n / n
+        self.m2_x += other.m2_x + dx * dx * scale
+        self.m2_y += other.m2_y + dy * dy * scale
+        self.c_xy += other.c_xy + dx * dy * scale
+        self.mean_x += dx * other.n / n
+        self.mean_y += dy * other.n / n
+        self.n = n
+
+    def correlation(self):
+        denominator = math.sqrt(self.m2_x * self.m2_y)
+        if self.n < 2 or denominator <= 1e-12:
+            return None
+        return self.c_xy / denominator
+
+
+# -------- Per-Item Statistics --------
+class ItemStats:
+    """
+    Running statistics for one question (or one topic): correct rate,
+    score mean/variance and histogram, time mean/variance, and
+    discrimination as the correlation between the score here and the
+    candidate's correct rate on their other answers. Memory is constant
+    however many answers are folded in.
+    """
+
+    __slots__ = ("correct", "score", "time", "score_hist", "discrimination")
+
+    def __init__(self):
+        self.correct = 0
+        self.score = RunningMoments()
+        self.time = RunningMoments()
+        self.score_hist = [0] * SCORE_BINS
+        self.discrimination = RunningCovariance()
+
+    @property
+    def n(self):
+        return self.score.n
+
+    def add(self, score, is_correct, time, rest=None):
+        self.correct += bool(is_correct)
+        self.score.add(score)
+        self.time.add(time)
+        self.score_hist[_score_bin(score)] += 1
+        if rest is not None:
+            self.discrimination.add(score, rest)
+
+    def remove(self, score, is_correct, time, rest=None):
+        self.correct = max(0, self.correct - bool(is_correct))
+        self.score.remove(score)
+        self.time.remove(time)
+        bin_ = _score_bin(score)
+        self.score_hist[bin_] = max(0, self.score_hist[bin_] - 1)
+        if rest is not None:
+            self.discrimination.remove(score, rest)
+
+    def merge(self, other):
+        self.correct += other.correct
+        self.score.merge(other.score)
+        self.time.merge(other.time)
+        self.score_hist = [a + b for a, b in zip(self.score_hist, other.score_hist)]
+        self.discrimination.merge(other.discrimination)
+
+    def summary(self):
+        n = self.n
+        discrimination = self.discrimination.correlation()
+        return {
+            "answers": n,
+            "correct_rate": round(self.correct / n, 4) if n else None,
+            "score_mean": round(self.score.mean, 4),
+            "score_std": round(self.score.std, 4),
+            "score_histogram": list(self.score_hist),
+            "time_mean": round(self.time.mean, 2),
+            "time_std": round(self.time.std, 2),
+            "discrimination": round(discrimination, 4) if discrimination is not None else None,
+        }
+
+    # -------- Snapshot State --------
+    def state(self):
+        d = self.discrimination
+        return [
+            self.correct,
+            [self.score.n, self.score.mean, self.score.m2],
+            [self.time.n, self.time.mean, self.time.m2],
+            list(self.score_hist),
+            [d.n, d.mean_x, d.mean_y, d.m2_x, d.m2_y, d.c_xy],
+        ]
+
+    @classmethod
+    def from_state(cls, state):
+        correct, score, time, hist, discrimination = state
+        stats = cls()
+        stats.correct = correct
+        stats.score = RunningMoments(*score)
+        stats.time = RunningMoments(*time)
+        stats.score_hist = list(hist)
+        stats.discrimination = RunningCovariance(*discrimination)
+        return stats
+
+
+def _score_bin(score):
+    return min(SCORE_BINS - 1, max(0, int(score * SCORE_BINS)))
+
+
+# -------- Calibration Suggestions --------
+def suggest(stats, min_samples=MIN_SAMPLES):
+    """
+    Suggested {"max_time_sec", "weight"} for a question from its observed
+    statistics, or None below min_samples answers.
+    """
+    if stats.n < min_samples:
+        return None
+
+    time_limit = stats.time.mean + TIME_SPREAD * stats.time.std
+    time_limit = max(MIN_TIME, int(math.ceil(time_limit / TIME_STEP)) * TIME_STEP)
+
+    rate = stats.correct / stats.n
+    if rate >= EASY_RATE:
+        weight = 1
+    elif rate < HARD_RATE:
+        weight = 3
+    else:
+        weight = 2
+
+    return {"max_time_sec": time_limit, "weight": weight}
@@ -0,0 +1,121 @@
+import sys
+from collections import deque
+
+
+# Below this many distinct keywords, CPython's C substring search beats a
+# Python-level automaton walk even on multi-KB answers (measured crossover
+# is around 50 keywords), so small sets use the precompiled scan.
+AUTOMATON_MIN_KEYWORDS = 64
+
+
+# -------- Keyword Matcher --------
+class KeywordMatcher:
+    """
+    Case-insensitive multi-keyword matcher built once per keyword list.
+
+    Keywords are lowercased and deduplicated at build time; the answer is
+    lowercased once per call. Large keyword sets are compiled into an
+    Aho-Corasick automaton with a full transition table so one pass over
+    the answer finds every keyword, overlapping ones included. Each
+    keyword owns one bit, so counts always match
+    `sum(k.lower() in text.lower() for k in keywords)`.
+    """
+
+    __slots__ = ("keywords", "_words", "_always", "_delta", "_out")
+
+    def __init__(self, keywords):
+        self.keywords = tuple(
+            sys.intern(k) if isinstance(k, str) else k for k in keywords
+        )
+
+        bits_by_word = {}
+        always = 0
+
+        for i, keyword in enumerate(self.keywords):
+            # Interned: banks reuse the same keywords across many questions
+            word = sys.intern(str(keyword).lower())
+            if word:
+                bits_by_word[word] = bits_by_word.get(word, 0) | 1 << i
+            else:
+                # "" is a substring of every answer
+                always |= 1 << i
+
+        self._words = tuple(bits_by_word.items())
+        self._always = always
+        self._delta = None
+        self._out = None
+
+        if len(self._words) >= AUTOMATON_MIN_KEYWORDS:
+            self._build_automaton()
+
+    def _build_automaton(self):
+        goto = [{}]
+        out = [0]
+
+        for word, bits in self._words:
+            state = 0
+            for ch in word:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append(0)
+                state = nxt
+            out[state] |= bits
+
+        # Breadth-first failure links, folded into a complete transition table
+        fail = [0] * len(goto)
+        delta = [dict(goto[0])]
+        delta.extend({} for _ in range(len(goto) - 1))
+        queue = deque(goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            out[state] |= out[fail[state]]
+
+            transitions = dict(delta[fail[state]])
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[fail[state]].get(ch, 0)
+                transitions[ch] = nxt
+                queue.append(nxt)
+            delta[state] = transitions
+
+        self._delta = delta
+        self._out = out
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def match_mask(self, text):
+        """Bitmask of keywords found in `text` (bit i -> keywords[i])."""
+        text = str(text).lower()
+        found = self._always
+
+        if self._delta is None:
+            for word, bits in self._words:
+                if word in text:
+                    found |= bits
+            return found
+
+        delta = self._delta
+        out = self._out
+        state = 0
+
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            if out[state]:
+                found |= out[state]
+
+        return found
+
+    def matched(self, text):
+        mask = self.match_mask(text)
+        return [k for i, k in enumerate(self.keywords) if mask >> i & 1]
+
+    def count(self, text):
+        return bin(self.match_mask(text)).count("1")
+
+    def count_many(self, texts):
+        """Keyword hit counts for many answers to the same question."""
+        return [self.count(text) for text in texts]
@@ -0,0 +1,241 @@
+import json
+import sys
+import threading
+import zlib
+from array import array
+from collections import OrderedDict
+
+from core.answer_keys import compile_answer_key
+from utils.serializer import dumps
+
+
+# Top-level question fields kept as attributes; everything else is cold
+HOT_FIELDS = ("id", "question_type", "topic", "difficulty")
+
+# Cold fields of this many consecutive questions share one zlib block:
+# about 7x smaller than plain JSON, ~0.1 ms to decode a block
+COLD_BLOCK_SIZE = 16
+
+# Decoded blocks kept per store, so popular questions skip the inflate
+COLD_CACHE_BLOCKS = 64
+
+# Public JSON of this many consecutive questions is joined into one bytes
+# buffer; one small object per question would cost several times its size
+PUBLIC_BLOCK_SIZE = 256
+
+_encode = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+_decode = json.JSONDecoder().decode
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+# -------- Cold Field Store --------
+class ColdStore:
+    """
+    Append-only store for the cold part of many questions, compressed
+    in blocks of COLD_BLOCK_SIZE. The last COLD_CACHE_BLOCKS decoded
+    blocks are cached.
+    """
+
+    __slots__ = ("_blocks", "_pending", "_cache", "_lock")
+
+    def __init__(self):
+        self._blocks = []
+        self._pending = []
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def append(self, fields):
+        with self._lock:
+            index = len(self._blocks) * COLD_BLOCK_SIZE + len(self._pending)
+            self._pending.append(_encode(fields))
+            if len(self._pending) == COLD_BLOCK_SIZE:
+                self._flush()
+        return index
+
+    def _flush(self):
+        raw = ("[" + ",".join(self._pending) + "]").encode("utf-8")
+        self._blocks.append(zlib.compress(raw))
+        self._pending = []
+
+    def get(self, index):
+        block, offset = divmod(index, COLD_BLOCK_SIZE)
+
+        with self._lock:
+            if block == len(self._blocks):
+                # Still in the unflushed tail (kept encoded, not yet compressed)
+                return _decode(self._pending[offset])
+
+            entries = self._cache.get(block)
+            if entries is not None:
+                self._cache.move_to_end(block)
+
+        if entries is None:
+            entries = _decode(zlib.decompress(self._blocks[block]).decode("utf-8"))
+            with self._lock:
+                self._cache[block] = entries
+                if len(self._cache) > COLD_CACHE_BLOCKS:
+                    self._cache.popitem(last=False)
+
+        # Shallow copy so callers can't rebind fields in the cached block
+        return dict(entries[offset])
+
+    def nbytes(self):
+        return sum(len(b) for b in self._blocks)
+
+
+# -------- Public JSON Store --------
+class PublicStore:
+    """
+    Append-only store for the pre-serialized public JSON of many
+    questions, joined into one buffer per PUBLIC_BLOCK_SIZE questions
+    with an offset table. `get` returns an exact-size copy.
+    """
+
+    __slots__ = ("_blocks", "_offsets", "_pending", "_lock")
+
+    def __init__(self):
+        self._blocks = []
+        self._offsets = []
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def append(self, data):
+        with self._lock:
+            index = len(self._blocks) * PUBLIC_BLOCK_SIZE + len(self._pending)
+            self._pending.append(bytes(data))
+            if len(self._pending) == PUBLIC_BLOCK_SIZE:
+                self._flush()
+        return index
+
+    def _flush(self):
+        offsets = array("Q", [0])
+        for data in self._pending:
+            offsets.append(offsets[-1] + len(data))
+        self._blocks.append(b"".join(self._pending))
+        self._offsets.append(offsets)
+        self._pending = []
+
+    def get(self, index):
+        block, offset = divmod(index, PUBLIC_BLOCK_SIZE)
+        with self._lock:
+            if block == len(self._blocks):
+                return self._pending[offset]
+            data, offsets = self._blocks[block], self._offsets[block]
+        return data[offsets[offset]:offsets[offset + 1]]
+
+    def nbytes(self):
+        return sum(len(b) for b in self._blocks) + sum(len(b) for b in self._pending)
+
+
+# -------- Public (Candidate-Facing) View --------
+def public_view(question):
+    """Question fields safe to send to candidates: no answers or keywords."""
+    safe_data = {
+        "id": question["id"],
+        "track": question.get("track"),
+        "topic": question.get("topic"),
+        "subtopic": question.get("subtopic"),
+        "difficulty": question.get("difficulty"),
+        "question_type": question.get("question_type"),
+        "question": question.get("question"),
+        "options": question.get("options", []),
+        "user_explanation_required": question.get("user_explanation_required", False),
+    }
+
+    # ✅ Include code for CODE_TRACE
+    if question.get("question_type") == "CODE_TRACE":
+        safe_data["code"] = question.get("code")
+
+    return safe_data
+
+
+# -------- Compact Question Record --------
+class QuestionRecord:
+    """
+    Compact, read-only form of one bank question.
+
+    Grading and selection only need the hot fields, which live in slots
+    (type/topic/difficulty strings interned, answer key precompiled).
+    `public` is the candidate-facing JSON, serialized once into a shared
+    `PublicStore` so tests can be assembled from bytes.
+    Display text, options, code and the rest of the original JSON go to
+    a shared `ColdStore` and are only decoded when asked for, e.g. by
+    `sanitize_question` or `to_dict`.
+
+    Supports `record["field"]` and `record.get("field")` like the
+    original dict, so code written against raw questions keeps working.
+    """
+
+    __slots__ = (
+        "id", "question_type", "topic", "difficulty",
+        "weight", "max_time_sec", "key", "_store", "_index", "_publics", "_public_index",
+    )
+
+    def __init__(self, question, store=None, index=None, publics=None, public_index=None):
+        evaluation = question.get("evaluation") or {}
+
+        self.id = _intern(question["id"])
+        self.question_type = _intern(question.get("question_type"))
+        self.topic = _intern(question.get("topic"))
+        self.difficulty = _intern(question.get("difficulty"))
+        self.weight = evaluation.get("weight", 1)
+        self.max_time_sec = evaluation.get("max_time_sec", 60)
+        self.key = compile_answer_key(question)
+
+        self._publics = PublicStore() if publics is None else publics
+        if public_index is None:
+            public_index = self._publics.append(dumps(public_view(question)))
+        self._public_index = public_index
+
+        self._store = ColdStore() if store is None else store
+        if index is None:
+            index = self._store.append(
+                {k: v for k, v in question.items() if k not in HOT_FIELDS}
+            )
+        # Stores built elsewhere (e.g. a mapped catalog file) pass their index
+        self._index = index
+
+    @property
+    def public(self):
+        """Candidate-facing JSON bytes."""
+        return self._publics.get(self._public_index)
+
+    def cold(self):
+        """Decoded cold fields (a fresh dict on every call)."""
+        return self._store.get(self._index)
+
+    def to_dict(self):
+        question = {field: getattr(self, field) for field in HOT_FIELDS}
+        question.update(self.cold())
+        return question
+
+    def __getitem__(self, field):
+        if field in HOT_FIELDS:
+            return getattr(self, field)
+        return self.cold()[field]
+
+    def get(self, field, default=None):
+        if field in HOT_FIELDS:
+            value = getattr(self, field)
+            return default if value is None else value
+        return self.cold().get(field, default)
+
+    def __contains__(self, field):
+        return field in HOT_FIELDS or field in self.cold()
+
+    def __repr__(self):
+        return f"QuestionRecord({self.id!r})"
+
+
+def as_record(question, store=None, publics=None):
+    if isinstance(question, QuestionRecord):
+        return question
+    return QuestionRecord(question, store, publics=publics)
+
+
+def as_dict(question):
+    """Full question dict for a record or a raw question."""
+    return question.to_dict() if isinstance(question, QuestionRecord) else question
@@ -1,5 +1,9 @@
 import random
 import math
+import weakref
+
+from core.catalog import QuestionCatalog, question_time
+from utils.metrics import Counter, stage
 
 DIFFICULTY_RATIO = {
     "Easy": 0.4,
@@ -15,96 +19,367 @@ CORE_TOPICS = [
     ["Complexity"]
 ]
 
+# Random draws per slot before falling back to the fastest feasible question
+RANDOM_TRIES = 4
+
+INF = float("inf")
+
+COVERAGE_RELAXED = Counter(
+    "skillgate_selection_coverage_relaxed_total",
+    "Tests selected without a CORE_TOPICS group the blueprint buckets cannot supply.",
+    ["difficulty_mode"],
+)
+
+
+class BlueprintInfeasible(ValueError):
+    """The blueprint cannot be met from the bank within the time limit."""
+
+    def __init__(self, reasons):
+        self.reasons = reasons
+        super().__init__("; ".join(reasons))
+
+
+class InvalidTestRequest(ValueError):
+    """difficulty_mode or time_limit is not one the selector accepts."""
+
+    def __init__(self, reasons):
+        self.reasons = reasons
+        super().__init__("; ".join(reasons))
+
+
+def validate_request(difficulty_mode, time_limit):
+    """Raise InvalidTestRequest unless both values are usable for selection."""
+    reasons = []
+    modes = ["Mixed", *DIFFICULTY_RATIO]
+    if not isinstance(difficulty_mode, str) or difficulty_mode not in modes:
+        reasons.append(f"difficulty_mode must be one of {', '.join(modes)}, got {difficulty_mode!r}")
+    if (
+        isinstance(time_limit, bool)
+        or not isinstance(time_limit, (int, float))
+        or not math.isfinite(time_limit)
+        or time_limit <= 0
+    ):
+        reasons.append(f"time_limit must be a positive number of seconds, got {time_limit!r}")
+    if reasons:
+        raise InvalidTestRequest(reasons)
+
+
+# -------- Blueprint -> Buckets --------
+def _difficulty_counts(total_count, difficulty_mode):
+    """Questions wanted per difficulty for one type, in preference order."""
+    if difficulty_mode != "Mixed":
+        return {difficulty_mode: total_count}
+
+    counts = {}
+    taken = 0
+    for level, ratio in DIFFICULTY_RATIO.items():
+        if taken >= total_count:
+            break
+        take = min(max(1, math.floor(total_count * ratio)), total_count - taken)
+        counts[level] = take
+        taken += take
+
+    if taken < total_count:
+        first = next(iter(DIFFICULTY_RATIO))
+        counts[first] = counts.get(first, 0) + total_count - taken
+    return counts
 
-def select_questions(dataset, blueprint, time_limit, difficulty_mode="Mixed"):
-    selected = []
 
-    # -------- STEP 1: Difficulty-based selection --------
+def _plan_buckets(catalog, blueprint, difficulty_mode, reasons):
+    """
+    (qtype, difficulty, count) per bucket. A difficulty with too few
+    questions hands its shortfall to the type's other difficulties.
+    """
+    buckets = []
+
     for qtype, total_count in blueprint.items():
+        if total_count <= 0:
+            continue
+
+        wanted = _difficulty_counts(total_count, difficulty_mode)
+        fallback = list(wanted) + [d for d in DIFFICULTY_RATIO if d not in wanted]
+        fallback += sorted(
+            {d for (t, d) in catalog.by_type_difficulty if t == qtype and d not in fallback},
+            key=str,
+        )
+
+        counts = {}
+        short = 0
+        for difficulty in fallback:
+            available = len(catalog.pool(qtype, difficulty))
+            need = wanted.get(difficulty, 0) + short
+            counts[difficulty] = min(need, available)
+            short = need - counts[difficulty]
+
+        if short:
+            reasons.append(
+                f"{qtype}: blueprint needs {total_count} questions, bank has "
+                f"{total_count - short}"
+            )
+
+        buckets.extend((qtype, d, c) for d, c in counts.items() if c)
+
+    return buckets
+
+
+class _Bucket:
+    """One (type, difficulty) group of slots and its time-sorted questions."""
+
+    def __init__(self, catalog, qtype, difficulty, count):
+        self.count = count
+        self.sorted = catalog.by_type_difficulty_time.get((qtype, difficulty), ())
+        # Per-topic pools are time-sorted too, so a group's fastest question is a head
+        self.group_pools = [
+            [catalog.pool(qtype, difficulty, topic) for topic in group] for group in CORE_TOPICS
+        ]
+
+    def has_group(self, g):
+        return any(self.group_pools[g])
+
+    def fill(self, roles, chosen_ids):
+        """
+        Fastest questions for `roles` (a CORE_TOPICS index, or None for any
+        topic) that are not in chosen_ids, as (total time, questions in
+        role order); (INF, None) when the bucket cannot fill them.
+
+        Covering a group with its fastest question is always optimal
+        because a question's topic belongs to at most one group.
+        """
+        picked = [None] * len(roles)
+        taken = set(chosen_ids)
+        total = 0
+
+        for i, g in enumerate(roles):
+            if g is None:
+                continue
+            heads = (next((q for q in pool if q.id not in taken), None) for pool in self.group_pools[g])
+            q = min((q for q in heads if q is not None), key=question_time, default=None)
+            if q is None:
+                return INF, None
+            picked[i] = q
+            taken.add(q.id)
+            total += question_time(q)
 
-        pool = [q for q in dataset if q["question_type"] == qtype]
-        type_selected = []
+        free = [i for i, g in enumerate(roles) if g is None]
+        for q in self.sorted:
+            if not free:
+                break
+            if q.id not in taken:
+                picked[free.pop()] = q
+                taken.add(q.id)
+                total += question_time(q)
 
-        if difficulty_mode == "Mixed":
-            for level, ratio in DIFFICULTY_RATIO.items():
-                take = max(1, math.floor(total_count * ratio))
-                level_pool = [q for q in pool if q["difficulty"] == level]
-                random.shuffle(level_pool)
-                type_selected.extend(level_pool[:take])
+        if free:
+            return INF, None
+        return total, picked
+
+    def draw(self, role, chosen_ids):
+        """A random question for `role`, or None if the draw hit a chosen one."""
+        if role is None:
+            if not self.sorted:
+                return None
+            q = self.sorted[random.randrange(len(self.sorted))]
         else:
-            level_pool = [q for q in pool if q["difficulty"] == difficulty_mode]
-            random.shuffle(level_pool)
-            type_selected.extend(level_pool[:total_count])
+            pools = self.group_pools[role]
+            total = sum(len(p) for p in pools)
+            if not total:
+                return None
+            index = random.randrange(total)
+            for pool in pools:
+                if index < len(pool):
+                    q = pool[index]
+                    break
+                index -= len(pool)
+
+        return None if q.id in chosen_ids else q
+
+
+# -------- Minimum-Time DP --------
+def _subsets(mask):
+    sub = mask
+    while True:
+        yield sub
+        if not sub:
+            return
+        sub = (sub - 1) & mask
 
-        # Ensure exact count
-        if len(type_selected) < total_count:
-            remaining = [q for q in pool if q not in type_selected]
-            random.shuffle(remaining)
-            type_selected.extend(remaining[: total_count - len(type_selected)])
 
-        selected.extend(type_selected[:total_count])
+def _roles(mask, count):
+    groups = [g for g in range(len(CORE_TOPICS)) if mask >> g & 1]
+    return groups + [None] * (count - len(groups))
 
-    # -------- STEP 2: Topic Coverage Enforcement --------
-    present_topics = {q["topic"] for q in selected}
 
-    for topic_group in CORE_TOPICS:
-        if not any(t in present_topics for t in topic_group):
+def _solve(buckets, required):
+    """
+    cost[i][S]: fastest fill of bucket i that covers topic groups S.
+    best[i][M]: fastest fill of buckets i.. that covers topic groups M.
+    """
+    n = len(buckets)
+    cost = []
+    for b in buckets:
+        row = {}
+        for S in _subsets(required):
+            if bin(S).count("1") <= b.count:
+                row[S] = b.fill(_roles(S, b.count), ())[0]
+        cost.append(row)
 
-            candidate = next(
-                (q for q in dataset if q["topic"] in topic_group),
-                None
+    best = [dict() for _ in range(n + 1)]
+    for M in _subsets(required):
+        best[n][M] = 0 if M == 0 else INF
+
+    for i in range(n - 1, -1, -1):
+        for M in _subsets(required):
+            best[i][M] = min(
+                (cost[i][S] + best[i + 1][M & ~S] for S in _subsets(M) if S in cost[i]),
+                default=INF,
             )
 
-            if candidate:
-                lowest = min(
-                    selected,
-                    key=lambda q: q.get("evaluation", {}).get("weight", 1)
-                )
-                selected.remove(lowest)
-                selected.append(candidate)
-                present_topics.add(candidate["topic"])
-
-    # -------- STEP 3: Time Enforcement --------
-    def total_time(qs):
-        return sum(q.get("evaluation", {}).get("max_time_sec", 60) for q in qs)
-
-    current_time = total_time(selected)
-    max_attempts = 50
-    attempts = 0
-
-    while current_time > time_limit and attempts < max_attempts:
-        attempts += 1
-
-        worst = max(
-            selected,
-            key=lambda q: q.get("evaluation", {}).get("max_time_sec", 60)
-        )
+    return cost, best
 
-        worst_time = worst.get("evaluation", {}).get("max_time_sec", 60)
 
-        candidates = [
-            q for q in dataset
-            if q["question_type"] == worst["question_type"]
-            and q not in selected
-            and q.get("evaluation", {}).get("max_time_sec", 60) < worst_time
-        ]
+# -------- Randomized Fill Within Budget --------
+def _fill_bucket(bucket, S, slack, chosen_ids):
+    """
+    Random questions for the bucket covering groups S in at most `slack`
+    seconds. A draw is kept only if the bucket's remaining slots can still
+    be filled in time; otherwise the fastest completion supplies the slot.
+    """
+    roles = _roles(S, bucket.count)
+    random.shuffle(roles)
+    picked = []
+    used = 0
 
-        if not candidates:
-            break
+    for i, role in enumerate(roles):
+        rest = roles[i + 1:]
+        choice = None
 
-        replacement = min(
-            candidates,
-            key=lambda q: q.get("evaluation", {}).get("max_time_sec", 60)
-        )
+        for _ in range(RANDOM_TRIES):
+            q = bucket.draw(role, chosen_ids)
+            if q is None:
+                continue
+            rest_time, _ = bucket.fill(rest, chosen_ids | {q.id})
+            if used + question_time(q) + rest_time <= slack:
+                choice = q
+                break
+
+        if choice is None:
+            _, fastest = bucket.fill([role] + rest, chosen_ids)
+            choice = fastest[0]
+
+        picked.append(choice)
+        chosen_ids.add(choice.id)
+        used += question_time(choice)
+
+    return picked, used
+
+
+_plans = weakref.WeakKeyDictionary()
+MAX_PLANS_PER_CATALOG = 64
+
+
+def _plan(catalog, blueprint, difficulty_mode):
+    """
+    Buckets, required topic groups and DP tables for one blueprint. They
+    do not depend on the time limit, so they are cached per catalog.
+    """
+    key = (tuple(blueprint.items()), difficulty_mode)
+    plans = _plans.setdefault(catalog, {})
+    plan = plans.get(key)
+    if plan is not None:
+        return plan
+
+    reasons = []
+    buckets = [
+        _Bucket(catalog, t, d, c)
+        for t, d, c in _plan_buckets(catalog, blueprint, difficulty_mode, reasons)
+    ]
+
+    # Groups no bucket can supply are left out of the DP and reported
+    required = 0
+    uncovered = []
+    for g in range(len(CORE_TOPICS)):
+        if any(b.has_group(g) for b in buckets):
+            required |= 1 << g
+        else:
+            uncovered.append(CORE_TOPICS[g])
+
+    cost, best = _solve(buckets, required) if not reasons else ([], [])
+    plan = (buckets, required, cost, best, tuple(reasons), uncovered)
+
+    if len(plans) >= MAX_PLANS_PER_CATALOG:
+        plans.clear()
+    plans[key] = plan
+    return plan
+
+
+def select_questions(dataset, blueprint, time_limit, difficulty_mode="Mixed"):
+    """
+    Pick questions that meet the blueprint's per-type counts, the
+    difficulty split, CORE_TOPICS coverage and the time limit together.
+
+    A DP over (type, difficulty) buckets and covered topic groups gives the
+    fastest valid completion from every point; questions are then drawn at
+    random, keeping only draws that leave a completion within the limit.
+    Which bucket covers which topic group is also chosen at random among
+    the choices that stay within the limit.
+    Raises InvalidTestRequest for an unknown difficulty_mode or a
+    non-numeric time_limit, and BlueprintInfeasible when the constraints
+    cannot all be met.
+    CORE_TOPICS groups the bank has no question for in the blueprint's
+    buckets are relaxed rather than failing every test: they are listed
+    in "uncovered_topics" and counted in COVERAGE_RELAXED.
+    """
+    validate_request(difficulty_mode, time_limit)
+
+    # Accept a raw question list for callers that have not built an index
+    catalog = dataset if isinstance(dataset, QuestionCatalog) else QuestionCatalog(dataset)
+
+    # -------- STEP 1: Difficulty buckets + coverage DP (cached per catalog) --------
+    with stage("selection_step1"):
+        buckets, required, cost, best, reasons, uncovered = _plan(catalog, blueprint, difficulty_mode)
+
+    # -------- STEP 2: Feasibility --------
+    with stage("selection_step2"):
+        fastest = best[0][required] if best else INF
+        reasons = list(reasons)
+
+        if not reasons:
+            if fastest == INF:
+                reasons.append("topic coverage cannot be met with the blueprint counts")
+            elif fastest > time_limit:
+                reasons.append(f"fastest valid test takes {fastest}s, time limit is {time_limit}s")
+        if reasons:
+            raise BlueprintInfeasible(reasons)
+
+    # -------- STEP 3: Random Draw Within Budget --------
+    with stage("selection_step3"):
+        selected = []
+        chosen_ids = set()
+        current_time = 0
+        needed = required
+
+        for i, bucket in enumerate(buckets):
+            options = [
+                S for S, c in cost[i].items()
+                if (S & ~needed) == 0 and current_time + c + best[i + 1][needed & ~S] <= time_limit
+            ]
+            S = random.choice(options)
+            slack = time_limit - current_time - best[i + 1][needed & ~S]
+
+            picked, used = _fill_bucket(bucket, S, slack, chosen_ids)
+            selected.extend(picked)
+            current_time += used
+            needed &= ~S
 
-        selected.remove(worst)
-        selected.append(replacement)
-        current_time = total_time(selected)
+    if uncovered:
+        COVERAGE_RELAXED.labels(difficulty_mode).inc()
 
     return {
-        "question_ids": [q["id"] for q in selected],
+        "question_ids": [q.id for q in selected],
         "total_questions": len(selected),
         "total_time_sec": current_time,
         "difficulty_mode": difficulty_mode,
-        "topics_covered": list({q["topic"] for q in selected})
-    }
\ No newline at end of file
+        "topics_covered": list({q.topic for q in selected}),
+        "coverage_relaxed": bool(uncovered),
+        "uncovered_topics": [list(group) for group in uncovered],
+    }
@@ -1,14 +1,92 @@
-from fastapi import FastAPI
+import asyncio
+import signal
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 
-from services.test_service import generate_test
+from core.selector import BlueprintInfeasible, InvalidTestRequest, validate_request
+from services.test_service import generate_test_json
 from services.report_service import generate_paragraph
 from services.test_service import router as test_router
-from core.evaluation_service import evaluate_attempts, compute_student_features
-from services.ai_service import predict_level
-from utils.attempt_store import attempts_db
-app = FastAPI(title="SkillGate Backend")
+from services.batch_service import router as batch_router
+from services.adaptive_service import adaptive_engine
+from services.adaptive_service import router as adaptive_router
+from services.item_stats_service import item_stats
+from services.item_stats_service import router as item_stats_router
+from services.ai_service import load_engine, predict_level
+from services.model_registry import model_registry
+from services.model_registry import router as model_router
+from services.score_service import score_board
+from services.test_pool import test_pool
+from utils.admission import AdmissionMiddleware
+from utils.executor import run_in, shutdown_executors
+from utils.metrics import MetricsMiddleware, dump_slowest, render_metrics, slowest_requests
+from utils.loader import get_catalog
+from utils.serializer import FastJSONResponse
+from utils.startup import STARTUP_BLOCKING, Startup
+
+
+def _start_background():
+    item_stats.start()
+    test_pool.start()
+
+
+def _watch_model_signal(loop):
+    # SIGHUP re-reads the live model version (and its files) without a restart
+    try:
+        loop.add_signal_handler(
+            signal.SIGHUP, lambda: loop.run_in_executor(None, model_registry.reload, True)
+        )
+    except (AttributeError, NotImplementedError, RuntimeError, ValueError):
+        # No SIGHUP on this platform, or not running in the main thread
+        pass
+
+
+# Nothing heavy happens at import; the catalog and models load here (or
+# lazily on first use if a request beats the warmup)
+startup = None
+
+
+@asynccontextmanager
+async def lifespan(app):
+    global startup
+
+    startup = Startup(
+        phases=[
+            ("catalog", get_catalog),
+            ("models", load_engine),
+            ("item_stats", item_stats.restore),
+        ],
+        after=[
+            ("adaptive_bank", adaptive_engine.recalibrate),
+            ("background", _start_background),
+        ],
+    )
+    loop = asyncio.get_running_loop()
+    _watch_model_signal(loop)
+
+    if STARTUP_BLOCKING:
+        await loop.run_in_executor(None, startup.run)
+    else:
+        startup.start()
+
+    yield
+    test_pool.stop()
+    item_stats.stop()
+    shutdown_executors()
+    dump_slowest()
+
+
+app = FastAPI(title="SkillGate Backend", lifespan=lifespan, default_response_class=FastJSONResponse)
 app.include_router(test_router)
+app.include_router(batch_router)
+app.include_router(adaptive_router)
+app.include_router(item_stats_router)
+app.include_router(model_router)
+# Inside CORS so shed 503s still carry CORS headers; outside metrics so they are counted
+app.add_middleware(AdmissionMiddleware)
 # -------- Enable CORS (for React TSX frontend) --------
 app.add_middleware(
     CORSMiddleware,
@@ -17,6 +95,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 
 # -------- Health Check --------
@@ -25,9 +104,28 @@ def health_check():
     return {"status": "Backend running successfully"}
 
 
+@app.get("/ready")
+def readiness_check():
+    # Liveness is /health; this turns 200 once catalog and models are loaded
+    report = startup.report() if startup is not None else {"ready": False}
+    return FastJSONResponse(report, status_code=200 if report["ready"] else 503)
+
+
+# -------- Metrics --------
+@app.get("/metrics")
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/metrics/slowest")
+def metrics_slowest():
+    # Filled only when PROFILE_SAMPLE_RATE > 0
+    return slowest_requests()
+
+
 # -------- Generate Test --------
 @app.post("/generate-test")
-def create_test(request: dict):
+async def create_test(request: dict):
     """
     Request body example:
     {
@@ -38,29 +136,40 @@ def create_test(request: dict):
 
     difficulty_mode = request.get("difficulty_mode", "Mixed")
     time_limit = request.get("time_limit", 1500)
-
-    test_data = generate_test(
-        difficulty_mode=difficulty_mode,
-        time_limit=time_limit
-    )
-
-    return test_data
+    try:
+        validate_request(difficulty_mode, time_limit)
+    except InvalidTestRequest as exc:
+        raise HTTPException(status_code=422, detail={"error": "invalid_request", "reasons": exc.reasons})
+
+    # Pre-generated test if one is ready, else build it now; either way the
+    # body is already-encoded JSON
+    body = test_pool.take(difficulty_mode, time_limit)
+    if body is None:
+        try:
+            body = await run_in(
+                "cpu",
+                generate_test_json,
+                difficulty_mode=difficulty_mode,
+                time_limit=time_limit
+            )
+        except BlueprintInfeasible as exc:
+            raise HTTPException(status_code=422, detail={"error": "infeasible_blueprint", "reasons": exc.reasons})
+
+    return Response(content=body, media_type="application/json")
 
 
 # -------- Submit Attempt --------
 @app.post("/submit-attempt")
-def submit_attempt(attempt_data: dict):
+async def submit_attempt(attempt_data: dict):
 
     user_id = attempt_data["user_id"]
 
-    # ✅ get stored answers
-    answers = attempts_db.get(user_id, [])
-
-    results = evaluate_attempts(answers)
-
-    features = compute_student_features(results)
+    # ✅ features kept up to date by submit-answer
+    features = await run_in("cpu", score_board.features, user_id)
+    if not features:
+        raise HTTPException(status_code=404, detail="No answers recorded for this user")
 
-    level = predict_level(features)
+    level = await run_in("inference", predict_level, features)
 
     paragraph = generate_paragraph(features, level)
 
@@ -0,0 +1,266 @@
+import os
+import threading
+import time
+import weakref
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import Response
+
+from core.grading import grade_one
+from core.irt import AbilityEstimate, ItemBank, calibrate
+from utils.attempt_store import attempt_store
+from utils.executor import run_in
+from utils.loader import get_catalog
+from utils.metrics import Counter, register_gauge, stage
+from utils.serializer import dumps
+
+
+router = APIRouter()
+
+# Stop once the ability standard error is below this (logits)...
+ADAPTIVE_SE_TARGET = float(os.environ.get("ADAPTIVE_SE_TARGET", "0.5"))
+# ...but never before MIN_ITEMS, and always by MAX_ITEMS
+ADAPTIVE_MIN_ITEMS = int(os.environ.get("ADAPTIVE_MIN_ITEMS", "5"))
+ADAPTIVE_MAX_ITEMS = int(os.environ.get("ADAPTIVE_MAX_ITEMS", "20"))
+# Calibrate item difficulty from stored attempts (otherwise priors only)
+ADAPTIVE_CALIBRATE = os.environ.get("ADAPTIVE_CALIBRATE", "1") != "0"
+# Recalibrate in the background once the bank is this old (0: only when
+# the catalog changes)
+ADAPTIVE_RECALIBRATE_SEC = float(os.environ.get("ADAPTIVE_RECALIBRATE_SEC", "3600"))
+
+CALIBRATIONS = Counter(
+    "skillgate_irt_calibrations_total", "Item bank calibrations from the attempt store.", ["outcome"]
+)
+
+
+class AdaptiveSession:
+    __slots__ = ("user_id", "bank", "estimate", "administered", "pending", "done")
+
+    def __init__(self, user_id, bank):
+        self.user_id = user_id
+        self.bank = bank
+        self.estimate = AbilityEstimate()
+        self.administered = set()
+        self.pending = None
+        self.done = False
+
+
+# -------- Adaptive Test Engine --------
+class AdaptiveEngine:
+    """
+    Computerized adaptive tests over the catalog.
+
+    Items carry 2PL parameters calibrated from the attempt store
+    (difficulty-label priors otherwise). Calibration grades every stored
+    answer, so it runs at startup and on a background thread, never in a
+    request: a new catalog snapshot is served at once with the previous
+    calibration's parameters (priors for new items) while it is
+    recalibrated, and a bank older than `recalibrate_every` is refreshed
+    the same way. Each graded
+    answer to the pending item updates the candidate's ability estimate
+    in constant time; the next item is the most informative one at the
+    new estimate, until the standard error drops below the target.
+    """
+
+    def __init__(self, store=attempt_store, se_target=ADAPTIVE_SE_TARGET,
+                 min_items=ADAPTIVE_MIN_ITEMS, max_items=ADAPTIVE_MAX_ITEMS,
+                 calibrate_from_store=ADAPTIVE_CALIBRATE, recalibrate_every=ADAPTIVE_RECALIBRATE_SEC):
+        self.store = store
+        self.se_target = se_target
+        self.min_items = min_items
+        self.max_items = max_items
+        self.calibrate_from_store = calibrate_from_store
+        self.recalibrate_every = recalibrate_every
+
+        self._banks = weakref.WeakKeyDictionary()
+        # Parameters of the latest calibration and when it finished
+        self._params = {}
+        self._calibrated_at = 0.0
+        self._refreshing = False
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._bank_lock = threading.Lock()
+
+        store.on_evict(self._evicted)
+
+    # -------- Item Bank --------
+    def bank(self, catalog=None):
+        """The item bank for `catalog`, without scanning the attempt store."""
+        catalog = catalog or get_catalog()
+        bank = self._banks.get(catalog)
+        if bank is None:
+            with self._bank_lock:
+                bank = self._banks.get(catalog)
+                if bank is None:
+                    params = calibrate(catalog.questions)
+                    params.update((qid, p) for qid, p in self._params.items() if qid in params)
+                    bank = self._banks[catalog] = ItemBank(catalog.questions, params)
+                    self._calibrated_at = 0.0
+        if self.calibrate_from_store and (
+            not self._calibrated_at
+            or (self.recalibrate_every and time.monotonic() - self._calibrated_at > self.recalibrate_every)
+        ):
+            self._refresh(catalog)
+        return bank
+
+    def recalibrate(self, catalog=None):
+        """Calibrate from the attempt store and swap the new bank in."""
+        catalog = catalog or get_catalog()
+        with stage("irt_calibration"):
+            candidates = self._responses(catalog) if self.calibrate_from_store else ()
+            params = calibrate(catalog.questions, candidates)
+            bank = ItemBank(catalog.questions, params)
+        with self._bank_lock:
+            self._banks[catalog] = bank
+            self._params = params
+            self._calibrated_at = time.monotonic()
+        CALIBRATIONS.labels("ok").inc()
+        return bank
+
+    def _refresh(self, catalog):
+        with self._bank_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh_run, args=(catalog,), name="irt-calibration", daemon=True).start()
+
+    def _refresh_run(self, catalog):
+        try:
+            self.recalibrate(catalog)
+        except Exception:
+            # Keep serving the current bank and retry after the next interval
+            CALIBRATIONS.labels("failed").inc()
+            with self._bank_lock:
+                self._calibrated_at = time.monotonic()
+        finally:
+            with self._bank_lock:
+                self._refreshing = False
+
+    def _responses(self, catalog):
+        for _, answers in self.store.iter_latest():
+            responses = []
+            for a in answers:
+                q = catalog.by_id.get(a["question_id"])
+                if q:
+                    responses.append((q.id, grade_one(q, a.get("answer"), catalog)[1]))
+            if responses:
+                yield responses
+
+    # -------- Sessions --------
+    def start(self, user_id):
+        self.store.start(user_id)
+        session = AdaptiveSession(user_id, self.bank())
+        self._advance(session)
+
+        with self._lock:
+            self._sessions[user_id] = session
+        return session
+
+    def get(self, user_id):
+        with self._lock:
+            return self._sessions.get(user_id)
+
+    def record(self, user_id, question_id, is_correct):
+        """
+        Fold a graded answer into the user's session if it answers the
+        pending item; returns the session, or None for non-adaptive users.
+        """
+        session = self.get(user_id)
+        if session is None:
+            return None
+
+        with self._lock:
+            if session.done or question_id != session.pending:
+                # Re-answers and stray items don't move the estimate twice
+                return session
+
+            params = session.bank.params(question_id)
+            if params is not None:
+                session.estimate.update(params[0], params[1], is_correct)
+            session.administered.add(question_id)
+            session.pending = None
+
+        self._advance(session)
+        return session
+
+    def _advance(self, session):
+        estimate = session.estimate
+        answered = estimate.answered
+
+        if answered >= self.max_items or (
+            answered >= self.min_items and estimate.se < self.se_target
+        ):
+            session.done = True
+            return
+
+        q = session.bank.next_item(estimate.theta, session.administered)
+        if q is None:
+            session.done = True
+        else:
+            session.pending = q.id
+
+    def finish(self, user_id):
+        with self._lock:
+            return self._sessions.pop(user_id, None)
+
+    def _evicted(self, user_id, reason):
+        # Abandoned tests end with their attempt session; a spill over the
+        # memory budget is not the end of the test
+        if reason != "budget":
+            self.finish(user_id)
+
+    def active_sessions(self):
+        return len(self._sessions)
+
+
+def state(session):
+    estimate = session.estimate
+    return {
+        "done": session.done,
+        "answered": estimate.answered,
+        "ability": round(estimate.theta, 3),
+        "standard_error": round(estimate.se, 3),
+    }
+
+
+def state_json(session, extra=None):
+    """Session state as JSON bytes, with the pending question's public JSON."""
+    body = dict(extra or {})
+    body.update(state(session))
+    encoded = dumps(body)
+
+    if session.pending is None:
+        return encoded[:-1] + b',"question":null}'
+
+    # The session's bank holds the question; no catalog lookup (and no
+    # reload check) on the event loop
+    question = session.bank.question(session.pending)
+    public = question.public if question is not None else b"null"
+    return encoded[:-1] + b',"question":' + public + b"}"
+
+
+adaptive_engine = AdaptiveEngine()
+
+register_gauge(
+    "skillgate_adaptive_sessions", "Adaptive test sessions in progress.", adaptive_engine.active_sessions
+)
+
+
+# -------- Routes --------
+@router.post("/adaptive/start")
+async def start_adaptive(request: dict):
+    """
+    Request body: {"user_id": "..."}. Returns the first item; each
+    /submit-answer for the pending item returns the next one.
+    """
+    user_id = request["user_id"]
+    session = await run_in("cpu", adaptive_engine.start, user_id)
+    return Response(state_json(session, {"user_id": user_id}), media_type="application/json")
+
+
+@router.get("/adaptive/state")
+def adaptive_state(user_id: str):
+    session = adaptive_engine.get(user_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="No adaptive session for this user")
+    return Response(state_json(session, {"user_id": user_id}), media_type="application/json")
@@ -1,13 +1,41 @@
-import joblib
-import pandas as pd
-from pathlib import Path
+from services.model_registry import model_registry
+from utils.metrics import stage
 
-MODEL = joblib.load("models/student_ai_model.pkl")
-ENCODER = joblib.load("models/label_encoder.pkl")
+
+# Models come from the registry (services/model_registry.py): the live
+# version can be swapped at runtime, so look it up per call.
+
+def load_engine():
+    """The live version's compiled forest, loading the registry on first use."""
+    return model_registry.live().engine
+
+
+def load_sklearn_models():
+    """(model, encoder) of the live version, unpickled; this imports scikit-learn."""
+    return model_registry.live().sklearn_models()
 
 
 def predict_level(features: dict):
 
+    with stage("inference"):
+        return str(model_registry.predict_one(features))
+
+
+def predict_levels(feature_rows):
+
+    # One forest evaluation for the whole matrix
+    if not feature_rows:
+        return []
+    with stage("inference"):
+        return [str(level) for level in model_registry.predict(feature_rows)]
+
+
+# -------- Reference sklearn path (parity checks / benchmarks) --------
+def predict_level_sklearn(features: dict):
+
+    import pandas as pd
+
+    model, encoder = load_sklearn_models()
     df = pd.DataFrame([features])
-    pred = MODEL.predict(df)
-    return ENCODER.inverse_transform(pred)[0]
\ No newline at end of file
+    pred = model.predict(df)
+    return encoder.inverse_transform(pred)[0]
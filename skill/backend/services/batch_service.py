@@ -0,0 +1,95 @@
+import json
+
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+
+from core.evaluation_service import evaluate_attempts, compute_student_features
+from services.ai_service import predict_levels
+from services.report_service import generate_paragraph
+from utils.attempt_store import attempt_store
+
+
+router = APIRouter()
+
+# Candidates graded and levelled per classifier call
+BATCH_CHUNK_SIZE = 500
+
+
+def _iter_candidates(cohort):
+    """
+    Normalise a cohort into (user_id, answers, deduplicated) triples.
+
+    Accepts any mix of:
+      - "user_id"                                  -> answers from the attempt store
+      - {"user_id": ..., "answers": [...]}         -> answers given inline
+    """
+    for entry in cohort:
+        if isinstance(entry, dict) and entry.get("answers") is not None:
+            yield entry.get("user_id"), entry["answers"], False
+        else:
+            user_id = entry.get("user_id") if isinstance(entry, dict) else entry
+            yield user_id, attempt_store.latest(user_id), True
+
+
+def _score_chunk(chunk):
+    graded = []
+    for user_id, answers, deduplicated in chunk:
+        results = evaluate_attempts(answers, deduplicated=deduplicated)
+        features = compute_student_features(results)
+        graded.append((user_id, features))
+
+    scorable = [features for _, features in graded if features]
+    levels = iter(predict_levels(scorable))
+
+    for user_id, features in graded:
+        if not features:
+            yield {"user_id": user_id, "error": "No gradable answers"}
+            continue
+
+        level = next(levels)
+        yield {
+            "user_id": user_id,
+            "level": level,
+            "features": features,
+            "paragraph": generate_paragraph(features, level)
+        }
+
+
+# -------- Cohort Scoring --------
+def score_cohort(cohort, chunk_size=BATCH_CHUNK_SIZE):
+    """
+    Grade and level many candidates, yielding one result per candidate
+    in input order. Each chunk of candidates is levelled with a single
+    classifier call on its feature matrix.
+    """
+    chunk = []
+
+    for candidate in _iter_candidates(cohort):
+        chunk.append(candidate)
+        if len(chunk) >= chunk_size:
+            yield from _score_chunk(chunk)
+            chunk = []
+
+    if chunk:
+        yield from _score_chunk(chunk)
+
+
+@router.post("/batch-score")
+def batch_score(payload: dict):
+    """
+    Request body example:
+    {
+        "user_ids": ["u1", "u2"],
+        "attempts": [{"user_id": "u3", "answers": [...]}]
+    }
+
+    Streams newline-delimited JSON, one line per candidate.
+    """
+
+    cohort = list(payload.get("user_ids", [])) + list(payload.get("attempts", []))
+
+    def stream():
+        for result in score_cohort(cohort):
+            yield json.dumps(result) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
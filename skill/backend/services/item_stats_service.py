@@ -0,0 +1,242 @@
+import json
+import os
+import threading
+import time
+
+from fastapi import APIRouter, HTTPException
+
+from core.catalog import question_time, question_weight
+from core.item_stats import MIN_SAMPLES, ItemStats, suggest
+from utils.loader import get_catalog
+from utils.metrics import register_gauge
+
+
+router = APIRouter()
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+
+# Where snapshots are written and restored from; empty disables persistence
+ITEM_STATS_PATH = os.environ.get("ITEM_STATS_PATH", os.path.join(BASE_DIR, "item_stats.json"))
+# Seconds between snapshots while the server runs
+ITEM_STATS_SNAPSHOT_SEC = float(os.environ.get("ITEM_STATS_SNAPSHOT_SEC", "300"))
+# Other answers a candidate needs before their answers count towards discrimination
+ITEM_STATS_MIN_REST = int(os.environ.get("ITEM_STATS_MIN_REST", "3"))
+
+SNAPSHOT_VERSION = 1
+
+
+# -------- Streaming Item Statistics --------
+class ItemStatsAggregator:
+    """
+    ItemStats per question id and per topic, fed by the live grading path.
+
+    Each graded answer is folded in as it arrives; a re-answer replaces
+    the candidate's previous result for that question, so the statistics
+    describe the latest answer per candidate and question, like grading.
+    State is periodically written to a JSON snapshot and restored on
+    startup.
+    """
+
+    def __init__(self, path=ITEM_STATS_PATH, interval=ITEM_STATS_SNAPSHOT_SEC,
+                 min_rest=ITEM_STATS_MIN_REST):
+        self.path = path
+        self.interval = interval
+        self.min_rest = min_rest
+
+        self._questions = {}
+        self._topics = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    # -------- Updates --------
+    def observe(self, question_id, result, previous=None):
+        """
+        Fold in a graded result row (see grade_answer). `previous` is the
+        same candidate's earlier row for this question, if any. Rows are
+        tagged with the rest score they were counted with, so only rows
+        counted by this aggregator are ever taken out again.
+        """
+        rest = result.get("rest_score")
+        topic = result.get("topic") or "General"
+
+        with self._lock:
+            item = self._questions.get(question_id)
+            if item is None:
+                item = self._questions[question_id] = ItemStats()
+            group = self._topics.get(topic)
+            if group is None:
+                group = self._topics[topic] = ItemStats()
+
+            if previous is not None and "rest_score" in previous:
+                args = _row_args(previous)
+                item.remove(*args)
+                group_prev = self._topics.get(previous.get("topic") or "General")
+                if group_prev is not None:
+                    group_prev.remove(*args)
+
+            args = _row_args(result)
+            item.add(*args)
+            group.add(*args)
+            self._dirty = True
+
+    def rest_score(self, correct, answered):
+        """A candidate's correct rate on their other answers, or None if too few."""
+        if answered < self.min_rest:
+            return None
+        return correct / answered
+
+    # -------- Queries --------
+    def question(self, question_id):
+        with self._lock:
+            stats = self._questions.get(question_id)
+            return _question_summary(question_id, stats) if stats is not None else None
+
+    def questions(self, topic=None, min_answers=0, limit=100):
+        """Question summaries with the most answers first."""
+        with self._lock:
+            items = [(qid, s) for qid, s in self._questions.items() if s.n >= min_answers]
+
+        catalog = get_catalog()
+        if topic is not None:
+            items = [
+                (qid, s) for qid, s in items
+                if (q := catalog.by_id.get(qid)) is not None and q.topic == topic
+            ]
+
+        items.sort(key=lambda item: -item[1].n)
+        with self._lock:
+            return [_question_summary(qid, s, catalog) for qid, s in items[:limit]]
+
+    def topics(self):
+        with self._lock:
+            return {topic: s.summary() for topic, s in sorted(self._topics.items())}
+
+    def tracked(self):
+        return len(self._questions)
+
+    # -------- Snapshots --------
+    def snapshot(self, path=None):
+        """Write the current state to `path` atomically; returns False if disabled."""
+        path = path or self.path
+        if not path:
+            return False
+
+        with self._lock:
+            state = {
+                "version": SNAPSHOT_VERSION,
+                "written_at": time.time(),
+                "questions": {qid: s.state() for qid, s in self._questions.items()},
+                "topics": {topic: s.state() for topic, s in self._topics.items()},
+            }
+            self._dirty = False
+
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f, separators=(",", ":"))
+        os.replace(tmp, path)
+        return True
+
+    def restore(self, path=None):
+        """
+        Load a snapshot written by `snapshot`, merged with anything observed
+        since startup; a missing or foreign file is ignored.
+        """
+        path = path or self.path
+        if not path:
+            return False
+        try:
+            with open(path) as f:
+                state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return False
+
+        if state.get("version") != SNAPSHOT_VERSION:
+            return False
+
+        with self._lock:
+            for saved, live in ((state["questions"], self._questions), (state["topics"], self._topics)):
+                for key, s in saved.items():
+                    stats = ItemStats.from_state(s)
+                    if key in live:
+                        stats.merge(live[key])
+                    live[key] = stats
+        return True
+
+    def start(self):
+        if not self.path or self.interval <= 0 or self._thread is not None:
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._snapshot_loop, name="item-stats", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        if self._dirty:
+            self.snapshot()
+
+    def _snapshot_loop(self):
+        while not self._stop.wait(self.interval):
+            if self._dirty:
+                try:
+                    self.snapshot()
+                except OSError:
+                    # Keep serving; the next interval tries again
+                    pass
+
+
+def _row_args(row):
+    return row["score"], row["is_correct"], row["time"], row.get("rest_score")
+
+
+def _question_summary(question_id, stats, catalog=None):
+    catalog = catalog or get_catalog()
+    q = catalog.by_id.get(question_id)
+
+    summary = {"question_id": question_id}
+    if q is not None:
+        summary.update({
+            "topic": q.topic,
+            "difficulty": q.difficulty,
+            "max_time_sec": question_time(q),
+            "weight": question_weight(q),
+        })
+    summary.update(stats.summary())
+    summary["suggested"] = suggest(stats)
+    return summary
+
+
+item_stats = ItemStatsAggregator()
+
+register_gauge(
+    "skillgate_item_stats_questions", "Questions with streaming statistics.", item_stats.tracked
+)
+
+
+# -------- Routes --------
+@router.get("/item-stats")
+def get_item_stats(topic: str = None, min_answers: int = 0, limit: int = 100):
+    """
+    Per-topic statistics and the `limit` most answered questions
+    (optionally one topic's), with suggested max_time_sec/weight once a
+    question has MIN_SAMPLES answers.
+    """
+    return {
+        "min_samples": MIN_SAMPLES,
+        "topics": item_stats.topics(),
+        "questions": item_stats.questions(topic=topic, min_answers=min_answers, limit=limit),
+    }
+
+
+@router.get("/item-stats/{question_id}")
+def get_question_stats(question_id: str):
+    summary = item_stats.question(question_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="No answers recorded for this question")
+    return summary
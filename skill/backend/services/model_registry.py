@@ -0,0 +1,523 @@
+import hashlib
+import json
+import os
+import queue
+import random
+import threading
+import time
+
+from fastapi import APIRouter, HTTPException
+
+from core.forest_engine import CompiledForest
+from utils.executor import INFERENCE_EXECUTOR
+from utils.metrics import Counter
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+MODEL_DIR = os.environ.get("MODEL_DIR", os.path.join(BASE_DIR, "models"))
+
+MODEL_FILE = "student_ai_model.pkl"
+ENCODER_FILE = "label_encoder.pkl"
+ENGINE_FILE = "student_ai_model.forest.npz"
+META_FILE = "meta.json"
+# Name of the live version, shared by every worker reading MODEL_DIR
+LIVE_FILE = "LIVE"
+
+# The pickles directly in MODEL_DIR; versions live in MODEL_DIR/<version>/
+DEFAULT_VERSION = "default"
+
+# Pin one version and ignore the LIVE file
+MODEL_VERSION = os.environ.get("MODEL_VERSION")
+# Seconds between LIVE file stat checks in live()
+MODEL_RELOAD_INTERVAL = float(os.environ.get("MODEL_RELOAD_INTERVAL", "2"))
+# Share of live predictions also scored by the shadow model
+MODEL_SHADOW_SAMPLE = float(os.environ.get("MODEL_SHADOW_SAMPLE", "0.05"))
+# Sampled predictions waiting for the shadow thread; more are dropped
+MODEL_SHADOW_QUEUE = int(os.environ.get("MODEL_SHADOW_QUEUE", "1000"))
+
+MODEL_SWAPS = Counter(
+    "skillgate_model_swaps_total", "Live model swaps by target version and outcome.", ["version", "result"]
+)
+
+# A graded row compute_student_features accepts; its output is the schema
+_PROBE_RESULT = {
+    "type": "MCQ", "topic": "Arrays", "difficulty": "Easy",
+    "is_correct": True, "time": 60, "score": 1.0,
+}
+
+
+class ModelSchemaError(ValueError):
+    """A model version does not fit the features the service computes."""
+
+
+class ModelLoadError(ValueError):
+    """A model version's files could not be read or unpickled."""
+
+
+class ModelConfigError(RuntimeError):
+    """The request needs per-process state the inference executor cannot see."""
+
+
+# -------- One Model Version --------
+class ModelVersion:
+    """A loaded model+encoder pair, compiled for serving."""
+
+    def __init__(self, version, directory, engine, source_hash, meta):
+        self.version = version
+        self.directory = directory
+        self.engine = engine
+        self.source_hash = source_hash
+        self.meta = meta
+        self.loaded_at = time.time()
+        self._sklearn = None
+        self._lock = threading.Lock()
+
+    def sklearn_models(self):
+        """(model, encoder) unpickled with joblib; this imports scikit-learn."""
+        with self._lock:
+            if self._sklearn is None:
+                self._sklearn = _unpickle(self.directory)
+            return self._sklearn
+
+    def describe(self):
+        return {
+            "version": self.version,
+            "source_hash": self.source_hash,
+            "features": list(self.engine.feature_names),
+            "classes": [str(c) for c in self.engine.labels],
+            "trees": self.engine.n_trees,
+            "loaded_at": self.loaded_at,
+            "meta": self.meta,
+        }
+
+
+def _unpickle(directory):
+    import joblib
+
+    return (
+        joblib.load(os.path.join(directory, MODEL_FILE)),
+        joblib.load(os.path.join(directory, ENCODER_FILE)),
+    )
+
+
+def _source_hash(directory):
+    digest = hashlib.sha256()
+    for filename in (MODEL_FILE, ENCODER_FILE):
+        with open(os.path.join(directory, filename), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def load_version(version, directory):
+    """
+    Load one version. The compiled forest saved next to the pickles is
+    used when it was compiled from them; otherwise the forest is compiled
+    from the sklearn model and saved for the next process.
+    """
+    source_hash = _source_hash(directory)
+    engine_path = os.path.join(directory, ENGINE_FILE)
+    engine = CompiledForest.load(engine_path, source_hash)
+
+    if engine is None:
+        model, encoder = _unpickle(directory)
+        # Predictions match model.predict exactly
+        engine = CompiledForest.from_sklearn(model, labels=encoder.classes_)
+        try:
+            # Other workers may be loading it; replace atomically
+            tmp = f"{engine_path}.{os.getpid()}.tmp"
+            engine.save(tmp, source_hash)
+            os.replace(tmp, engine_path)
+        except OSError:
+            # Read-only model dir: compile again next start
+            pass
+
+    try:
+        with open(os.path.join(directory, META_FILE)) as f:
+            meta = json.load(f)
+    except FileNotFoundError:
+        meta = {}
+
+    return ModelVersion(version, directory, engine, source_hash, meta)
+
+
+def check_schema(model):
+    """
+    Raise ModelSchemaError unless the model takes exactly the features
+    compute_student_features produces and can score them.
+    """
+    from core.evaluation_service import compute_student_features
+
+    features = compute_student_features([_PROBE_RESULT])
+    expected = set(features)
+    actual = set(model.engine.feature_names)
+
+    if expected != actual:
+        raise ModelSchemaError(
+            f"model {model.version}: features {sorted(actual)} do not match "
+            f"compute_student_features output {sorted(expected)}"
+        )
+
+    try:
+        model.engine.predict_one(features)
+    except Exception as exc:
+        raise ModelSchemaError(f"model {model.version}: probe prediction failed: {exc}") from exc
+
+
+# -------- Shadow Comparison --------
+class ShadowReport:
+    """Agreement and latency of a shadow model against the live one."""
+
+    def __init__(self, live, shadow):
+        self.live = live
+        self.shadow = shadow
+        self.started = time.time()
+        self.predictions = 0
+        self.agreed = 0
+        self.dropped = 0
+        self.disagreements = {}
+        self.live_seconds = 0.0
+        self.shadow_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, live_levels, shadow_levels, live_seconds, shadow_seconds):
+        with self._lock:
+            self.live_seconds += live_seconds
+            self.shadow_seconds += shadow_seconds
+            for a, b in zip(live_levels, shadow_levels):
+                self.predictions += 1
+                if a == b:
+                    self.agreed += 1
+                else:
+                    key = f"{a} -> {b}"
+                    self.disagreements[key] = self.disagreements.get(key, 0) + 1
+
+    def drop(self):
+        with self._lock:
+            self.dropped += 1
+
+    def summary(self):
+        with self._lock:
+            n = self.predictions
+            return {
+                "live": self.live,
+                "shadow": self.shadow,
+                "since": self.started,
+                "predictions": n,
+                "dropped": self.dropped,
+                "agreement": round(self.agreed / n, 4) if n else None,
+                "disagreements": dict(sorted(self.disagreements.items(), key=lambda kv: -kv[1])),
+                "mean_us": {
+                    "live": round(self.live_seconds / n * 1e6, 1) if n else None,
+                    "shadow": round(self.shadow_seconds / n * 1e6, 1) if n else None,
+                },
+            }
+
+
+# -------- Registry --------
+class ModelRegistry:
+    """
+    Versioned model+encoder pairs under MODEL_DIR, one of them live.
+
+    `activate` loads and schema-checks a version off the request path and
+    then swaps the live reference in one assignment, so in-flight
+    predictions finish on the old model and no request sees a mix.
+    Activating with persist=True writes the LIVE file, which every worker
+    notices within MODEL_RELOAD_INTERVAL (or at once on SIGHUP).
+
+    An optional shadow version scores a sample of live requests too, on
+    a background thread fed through a bounded queue; its labels are only
+    compared, never returned.
+
+    With INFERENCE_EXECUTOR=process, predictions run in worker processes
+    that only see the LIVE file, so shadow scoring and activation without
+    persist are refused there (ModelConfigError).
+    """
+
+    def __init__(self, model_dir=MODEL_DIR, pinned=MODEL_VERSION,
+                 reload_interval=MODEL_RELOAD_INTERVAL, shadow_sample=MODEL_SHADOW_SAMPLE,
+                 shadow_queue=MODEL_SHADOW_QUEUE):
+        self.model_dir = model_dir
+        self.pinned = pinned
+        self.reload_interval = reload_interval
+        self.shadow_sample = shadow_sample
+
+        self._live = None
+        self._shadow = None
+        self._report = None
+        self._live_signature = None
+        self._last_check = 0.0
+        self._lock = threading.RLock()
+
+        self._shadow_queue = queue.Queue(maxsize=shadow_queue)
+        self._shadow_thread = None
+
+    # -------- Versions --------
+    def directory(self, version):
+        if version == DEFAULT_VERSION:
+            return self.model_dir
+        if not version or os.sep in version or version.startswith("."):
+            raise KeyError(version)
+        return os.path.join(self.model_dir, version)
+
+    def versions(self):
+        found = []
+        if os.path.exists(os.path.join(self.model_dir, MODEL_FILE)):
+            found.append(DEFAULT_VERSION)
+        for name in sorted(os.listdir(self.model_dir)):
+            if os.path.exists(os.path.join(self.model_dir, name, MODEL_FILE)):
+                found.append(name)
+        return found
+
+    def load(self, version):
+        """Load and schema-check one version without making it live."""
+        if version not in self.versions():
+            raise KeyError(version)
+        try:
+            model = load_version(version, self.directory(version))
+        except Exception as exc:
+            # Truncated npz, corrupt or incompatible pickle, unreadable file...
+            raise ModelLoadError(f"model {version}: {type(exc).__name__}: {exc}") from exc
+        check_schema(model)
+        return model
+
+    # -------- Live Model --------
+    def _live_pointer(self):
+        """(version named by the LIVE file, its stat signature)."""
+        path = os.path.join(self.model_dir, LIVE_FILE)
+        try:
+            st = os.stat(path)
+            with open(path) as f:
+                return f.read().strip() or DEFAULT_VERSION, (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            return DEFAULT_VERSION, None
+
+    def live(self):
+        """The live version, following the LIVE file unless a version is pinned."""
+        model = self._live
+        if model is not None and (
+            self.pinned or time.monotonic() - self._last_check < self.reload_interval
+        ):
+            return model
+
+        if model is None:
+            return self.reload()
+
+        # One thread checks the LIVE file; the rest keep serving meanwhile
+        if not self._lock.acquire(blocking=False):
+            return model
+        try:
+            return self.reload()
+        finally:
+            self._lock.release()
+
+    def reload(self, force=False):
+        """
+        Re-read the LIVE file (or the pinned version) and swap if it names
+        another version; force reloads even the same one. A version that
+        fails to load leaves the current model live.
+        """
+        with self._lock:
+            self._last_check = time.monotonic()
+
+            if self.pinned:
+                version, signature = self.pinned, None
+            else:
+                version, signature = self._live_pointer()
+
+            changed = signature != self._live_signature
+            self._live_signature = signature
+
+            if force or self._live is None or (changed and version != self._live.version):
+                try:
+                    self._swap(self.load(version))
+                except Exception:
+                    # Whatever went wrong, requests keep the model they have
+                    if self._live is None:
+                        raise
+                    MODEL_SWAPS.labels(version, "failed").inc()
+            return self._live
+
+    def activate(self, version, persist=True):
+        """Make `version` live; with persist, every worker follows via the LIVE file."""
+        if not persist and INFERENCE_EXECUTOR == "process":
+            raise ModelConfigError("activation without persist does not reach inference processes")
+        with self._lock:
+            model = self.load(version)
+
+            if persist and not self.pinned:
+                path = os.path.join(self.model_dir, LIVE_FILE)
+                tmp = f"{path}.{os.getpid()}.tmp"
+                with open(tmp, "w") as f:
+                    f.write(version + "\n")
+                os.replace(tmp, path)
+                self._live_signature = self._live_pointer()[1]
+
+            self._swap(model)
+            return model
+
+    def _swap(self, model):
+        self._live = model
+        MODEL_SWAPS.labels(model.version, "ok").inc()
+        if self._shadow is not None:
+            self._report = ShadowReport(model.version, self._shadow.version)
+
+    # -------- Shadow Model --------
+    def set_shadow(self, version):
+        """Score a sample of live requests with `version` too; None stops."""
+        with self._lock:
+            if version is None:
+                self._shadow = self._report = None
+                return None
+            if INFERENCE_EXECUTOR == "process":
+                raise ModelConfigError("shadow scoring needs INFERENCE_EXECUTOR=thread")
+            shadow = self.load(version)
+            self._shadow = shadow
+            self._report = ShadowReport(self.live().version, shadow.version)
+            if self._shadow_thread is None:
+                self._shadow_thread = threading.Thread(
+                    target=self._shadow_loop, name="model-shadow", daemon=True
+                )
+                self._shadow_thread.start()
+            return shadow
+
+    def shadow(self):
+        return self._shadow
+
+    def shadow_report(self):
+        report = self._report
+        return report.summary() if report is not None else None
+
+    # -------- Prediction --------
+    def predict_one(self, features):
+        return self._predict(features, batch=False)
+
+    def predict(self, feature_rows):
+        return self._predict(feature_rows, batch=True)
+
+    def _predict(self, rows, batch):
+        live = self.live()
+        predict = live.engine.predict if batch else live.engine.predict_one
+
+        if self._report is None or random.random() >= self.shadow_sample:
+            return predict(rows)
+
+        start = time.perf_counter()
+        levels = predict(rows)
+        live_seconds = time.perf_counter() - start
+
+        # Scored later on the shadow thread; a full queue drops the sample
+        report = self._report
+        try:
+            self._shadow_queue.put_nowait((report, self._shadow, rows, batch, levels, live_seconds))
+        except queue.Full:
+            report.drop()
+        return levels
+
+    def _shadow_loop(self):
+        while True:
+            report, shadow, rows, batch, levels, live_seconds = self._shadow_queue.get()
+            if shadow is None:
+                continue
+            # Never let a failing candidate model take the thread down
+            try:
+                start = time.perf_counter()
+                if batch:
+                    shadow_levels = [str(x) for x in shadow.engine.predict(rows)]
+                    levels = [str(x) for x in levels]
+                else:
+                    shadow_levels = [str(shadow.engine.predict_one(rows))]
+                    levels = [str(levels)]
+                report.add(levels, shadow_levels, live_seconds, time.perf_counter() - start)
+            except Exception:
+                pass
+
+    # -------- Offline Comparison --------
+    def compare(self, samples, versions=None):
+        """
+        Accuracy and latency of `versions` (default: live and shadow) on
+        labelled samples [{"features": {...}, "level": "..."}].
+        """
+        if versions is None:
+            versions = [self.live().version]
+            if self._shadow is not None:
+                versions.append(self._shadow.version)
+
+        rows = [s["features"] for s in samples]
+        expected = [str(s["level"]) for s in samples]
+        results = {}
+
+        for version in versions:
+            model = self.live() if version == self.live().version else self.load(version)
+            start = time.perf_counter()
+            levels = [str(x) for x in model.engine.predict(rows)] if rows else []
+            elapsed = time.perf_counter() - start
+            correct = sum(a == b for a, b in zip(levels, expected))
+            results[version] = {
+                "accuracy": round(correct / len(rows), 4) if rows else None,
+                "us_per_prediction": round(elapsed / len(rows) * 1e6, 2) if rows else None,
+                "meta_metrics": model.meta.get("metrics"),
+            }
+
+        return {"samples": len(rows), "versions": results}
+
+
+router = APIRouter()
+
+model_registry = ModelRegistry()
+
+
+def _model_errors(fn, *args):
+    try:
+        return fn(*args)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown model version: {args[0]}")
+    except (ModelSchemaError, ModelLoadError) as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    except ModelConfigError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+
+
+# -------- Routes --------
+@router.get("/models")
+def list_models():
+    shadow = model_registry.shadow()
+    return {
+        "live": model_registry.live().describe(),
+        "shadow": shadow.describe() if shadow is not None else None,
+        "versions": model_registry.versions(),
+    }
+
+
+@router.post("/models/activate")
+def activate_model(request: dict):
+    """
+    Request body: {"version": "v2", "persist": true}. Loads and checks the
+    version, then swaps it in; persist (default) moves every worker.
+    """
+    model = _model_errors(model_registry.activate, request["version"], request.get("persist", True))
+    return {"live": model.describe()}
+
+
+@router.post("/models/shadow")
+def shadow_model(request: dict):
+    """Request body: {"version": "v2"} to start shadow scoring, {"version": null} to stop."""
+    version = request.get("version")
+    _model_errors(model_registry.set_shadow, version)
+    return {"shadow": version, "report": model_registry.shadow_report()}
+
+
+@router.get("/models/shadow-report")
+def shadow_report():
+    report = model_registry.shadow_report()
+    if report is None:
+        raise HTTPException(status_code=404, detail="No shadow model")
+    return report
+
+
+@router.post("/models/compare")
+def compare_models(request: dict):
+    """
+    Request body: {"samples": [{"features": {...}, "level": "..."}],
+    "versions": ["default", "v2"]}; versions defaults to live and shadow.
+    """
+    return _model_errors(model_registry.compare, request.get("samples", []), request.get("versions"))
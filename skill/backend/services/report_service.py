@@ -1,8 +1,14 @@
 from core.evaluation_service import evaluate_attempt
 from utils.loader import load_full_dataset
+from utils.metrics import stage
 
 
 def generate_paragraph(features, level):
+    with stage("report"):
+        return _paragraph(features, level)
+
+
+def _paragraph(features, level):
 
     strengths = []
     weaknesses = []
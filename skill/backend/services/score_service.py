@@ -0,0 +1,126 @@
+import threading
+
+from core.accumulators import ScoreAccumulator
+from core.evaluation_service import grade_answer
+from services.item_stats_service import item_stats
+from utils.attempt_store import attempt_store
+from utils.loader import get_catalog
+from utils.metrics import register_gauge, stage
+
+
+# -------- Per-User Live Scores --------
+class ScoreBoard:
+    """
+    One ScoreAccumulator per user, updated as answers arrive so that
+    finish-test only reads the features off instead of regrading.
+
+    Users not seen by this process (e.g. after a restart with the SQLite
+    store) are rebuilt once by replaying the store's answer history. Live
+    answers also feed the per-question statistics; rebuilt ones were
+    already counted when they first arrived, so the replay only recomputes
+    the rest score each was counted with, letting a later re-answer
+    retract it. The memory store keeps only the latest answer per
+    question, so its replay is exact unless a question was re-answered.
+    """
+
+    def __init__(self, store=attempt_store):
+        self.store = store
+        self._accumulators = {}
+        self._lock = threading.Lock()
+
+        # Totals for users whose session left memory are rebuilt on demand
+        store.on_evict(lambda user_id, reason: self.discard(user_id))
+
+    def record(self, payload):
+        """
+        Grade one submitted answer and fold it into the user's totals.
+        Call after the answer has been appended to the store. Returns the
+        graded result row, or None for an unknown question.
+        """
+        catalog = get_catalog()
+        q = catalog.by_id.get(payload["question_id"])
+        if not q:
+            return None
+
+        with stage("grading"):
+            result = grade_answer(q, payload, catalog)
+
+        with self._lock:
+            acc = self._accumulators.get(payload["user_id"])
+
+        if acc is None:
+            # First answer seen here; the store already holds the earlier ones
+            acc = self._rebuild(payload["user_id"], pending=payload)
+
+        question_id = payload["question_id"]
+        with self._lock:
+            previous = _fold(acc, question_id, result)
+
+        item_stats.observe(question_id, result, previous)
+        return result
+
+    def _rebuild(self, user_id, pending=None):
+        """
+        Replay the user's stored answers in arrival order. `pending` is an
+        answer already appended but not yet recorded; it is left out.
+        """
+        catalog = get_catalog()
+        acc = ScoreAccumulator()
+
+        history = self.store.history(user_id)
+        if pending is not None:
+            for i in range(len(history) - 1, -1, -1):
+                if history[i] == pending:
+                    del history[i]
+                    break
+
+        for a in history:
+            q = catalog.by_id.get(a["question_id"])
+            if q:
+                _fold(acc, a["question_id"], grade_answer(q, a, catalog))
+
+        with self._lock:
+            # An answer recorded meanwhile already created the live entry
+            return self._accumulators.setdefault(user_id, acc)
+
+    def features(self, user_id):
+        with self._lock:
+            acc = self._accumulators.get(user_id)
+
+        if acc is None:
+            acc = self._rebuild(user_id)
+
+        with stage("features"), self._lock:
+            return acc.features()
+
+    def active_users(self):
+        return len(self._accumulators)
+
+    def discard(self, user_id):
+        with self._lock:
+            self._accumulators.pop(user_id, None)
+
+
+def _fold(acc, question_id, result):
+    """
+    Tag `result` with the rest score it is counted with, add it to `acc`
+    and return the row it replaces, if any.
+    """
+    previous = acc.results.get(question_id)
+    correct, answered = acc.correct, acc.total
+    if previous is not None:
+        correct -= bool(previous["is_correct"])
+        answered -= 1
+    result["rest_score"] = item_stats.rest_score(correct, answered)
+    acc.add(result, question_id=question_id)
+    return previous
+
+
+score_board = ScoreBoard()
+
+register_gauge(
+    "skillgate_active_users", "Users with live score accumulators.", score_board.active_users
+)
+register_gauge(
+    "skillgate_attempt_store_answers", "Answers held by the attempt store.", attempt_store.answer_count
+)
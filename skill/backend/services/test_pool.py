@@ -0,0 +1,215 @@
+import os
+import threading
+import time
+from collections import deque
+
+from services.test_service import generate_test_json
+from utils.loader import get_catalog, peek_catalog
+from utils.metrics import Counter, register_gauge
+
+
+# Tests kept ready per (difficulty_mode, time_limit); 0 disables the pool
+TEST_POOL_DEPTH = int(os.environ.get("TEST_POOL_DEPTH", "32"))
+# Seconds a pre-generated test may wait before it is thrown away
+TEST_POOL_MAX_AGE = float(os.environ.get("TEST_POOL_MAX_AGE", "600"))
+# Times one pre-generated test may be handed out (1 = every candidate gets a fresh test)
+TEST_POOL_MAX_USES = int(os.environ.get("TEST_POOL_MAX_USES", "1"))
+# Configurations kept warm, "difficulty_mode:time_limit" separated by
+# commas; requests for any other configuration generate inline
+TEST_POOL_CONFIGS = os.environ.get("TEST_POOL_CONFIGS", "Mixed:1500")
+# After a failed generation a configuration is retried after this many
+# seconds, doubling per consecutive failure up to the maximum
+TEST_POOL_RETRY_SEC = float(os.environ.get("TEST_POOL_RETRY_SEC", "1"))
+TEST_POOL_RETRY_MAX_SEC = float(os.environ.get("TEST_POOL_RETRY_MAX_SEC", "300"))
+
+
+def _parse_configs(spec):
+    configs = []
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        difficulty_mode, _, time_limit = entry.partition(":")
+        configs.append((difficulty_mode, int(time_limit)))
+    return configs
+
+
+WARM_CONFIGS = _parse_configs(TEST_POOL_CONFIGS)
+
+POOL_REQUESTS = Counter(
+    "skillgate_test_pool_requests_total", "Test pool lookups by outcome.", ["result"]
+)
+POOL_FAILURES = Counter(
+    "skillgate_test_pool_generate_failures_total", "Failed pre-generations by configuration.",
+    ["difficulty_mode", "time_limit"],
+)
+
+
+class _Entry:
+    __slots__ = ("catalog", "created", "test", "uses")
+
+    def __init__(self, catalog, test):
+        self.catalog = catalog
+        self.created = time.monotonic()
+        self.test = test
+        self.uses = 0
+
+
+# -------- Pre-generated Test Pool --------
+class TestPool:
+    """
+    Bounded buffer of ready-to-serve tests per (difficulty_mode, time_limit),
+    kept as encoded response bodies.
+
+    Only the configurations given to `start` are kept warm, so odd client
+    requests cannot push them out. `take` pops a test in O(1) without any
+    I/O, so it can run on the event loop, and wakes the producer thread,
+    which tops every configuration back up to `depth`. Tests built from an
+    older catalog snapshot or older than `max_age` are discarded on the
+    way out. A miss returns None and the caller generates the test inline.
+    A configuration whose generation fails stays warm and is retried with
+    exponential backoff.
+    """
+
+    # Not a pytest test class despite the name
+    __test__ = False
+
+    def __init__(self, depth=TEST_POOL_DEPTH, max_age=TEST_POOL_MAX_AGE,
+                 max_uses=TEST_POOL_MAX_USES, generate=generate_test_json,
+                 retry=TEST_POOL_RETRY_SEC, retry_max=TEST_POOL_RETRY_MAX_SEC):
+        self.depth = depth
+        self.max_age = max_age
+        self.max_uses = max_uses
+        self.generate = generate
+        self.retry = retry
+        self.retry_max = retry_max
+
+        self._pools = {}
+        # key -> (consecutive failures, monotonic time of the next attempt)
+        self._backoff = {}
+        self._wake = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    # -------- Consumer Side --------
+    def take(self, difficulty_mode="Mixed", time_limit=1500):
+        if self.depth <= 0:
+            return None
+
+        # Callers validate the request first (selector.validate_request)
+        pool = self._pools.get((difficulty_mode, time_limit))
+        if pool is None:
+            POOL_REQUESTS.labels("unpooled").inc()
+            return None
+
+        # The producer thread notices catalog reloads; this only compares
+        catalog = peek_catalog()
+        now = time.monotonic()
+        test = None
+
+        with self._wake:
+            while pool:
+                entry = pool[0]
+                if entry.catalog is not catalog or now - entry.created > self.max_age:
+                    pool.popleft()
+                    continue
+
+                entry.uses += 1
+                if entry.uses >= self.max_uses:
+                    pool.popleft()
+                else:
+                    # Reusable tests rotate so consecutive candidates differ
+                    pool.rotate(-1)
+                test = entry.test
+                break
+
+            self._wake.notify()
+
+        POOL_REQUESTS.labels("hit" if test is not None else "miss").inc()
+        return test
+
+    def size(self):
+        with self._wake:
+            return sum(len(pool) for pool in self._pools.values())
+
+    # -------- Producer Side --------
+    def start(self, configs=WARM_CONFIGS):
+        if self.depth <= 0 or self._running:
+            return
+
+        with self._wake:
+            for key in configs:
+                self._pools.setdefault(tuple(key), deque())
+
+        self._running = True
+        self._thread = threading.Thread(target=self._fill_loop, name="test-pool", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._wake:
+            self._running = False
+            self._wake.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _next_short(self, now):
+        """A configuration below depth and not backing off, preferring the emptiest."""
+        short = [
+            (len(pool), key) for key, pool in self._pools.items()
+            if len(pool) < self.depth and self._backoff.get(key, (0, 0.0))[1] <= now
+        ]
+        return min(short, key=lambda item: item[0])[1] if short else None
+
+    def _idle_wait(self, now):
+        """Seconds to sleep with nothing to fill: until the next retry or expiry check."""
+        waits = [retry_at - now for _, retry_at in self._backoff.values()]
+        if self.max_age:
+            waits.append(self.max_age / 2)
+        return max(0.0, min(waits)) if waits else None
+
+    def _fill_loop(self):
+        while True:
+            with self._wake:
+                if not self._running:
+                    return
+                key = self._next_short(time.monotonic())
+                if key is None:
+                    self._wake.wait(timeout=self._idle_wait(time.monotonic()))
+                    if not self._running:
+                        return
+
+            # The catalog may stat or re-parse its files: never under the
+            # lock take() waits on
+            catalog = get_catalog()
+            if key is None:
+                with self._wake:
+                    self._expire(catalog)
+                continue
+
+            # Generated outside the lock so take() never waits on selection
+            difficulty_mode, time_limit = key
+            try:
+                test = self.generate(difficulty_mode=difficulty_mode, time_limit=time_limit)
+            except Exception:
+                # Requests for this configuration generate inline until a retry succeeds
+                POOL_FAILURES.labels(difficulty_mode, str(time_limit)).inc()
+                with self._wake:
+                    failures = self._backoff.get(key, (0, 0.0))[0] + 1
+                    delay = min(self.retry_max, self.retry * 2 ** (failures - 1))
+                    self._backoff[key] = (failures, time.monotonic() + delay)
+                continue
+
+            with self._wake:
+                self._backoff.pop(key, None)
+                pool = self._pools.get(key)
+                if pool is not None and len(pool) < self.depth:
+                    pool.append(_Entry(catalog, test))
+
+    def _expire(self, catalog):
+        now = time.monotonic()
+        for pool in self._pools.values():
+            while pool and (pool[0].catalog is not catalog or now - pool[0].created > self.max_age):
+                pool.popleft()
+
+
+test_pool = TestPool()
+
+register_gauge("skillgate_test_pool_ready", "Pre-generated tests ready to serve.", test_pool.size)
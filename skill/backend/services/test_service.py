@@ -1,10 +1,18 @@
+from core.records import as_dict, public_view
 from core.selector import select_questions
-from utils.loader import load_full_dataset
-from fastapi import APIRouter
-from utils.attempt_store import attempts_db
-from core.evaluation_service import evaluate_attempts, compute_student_features
+from utils.loader import get_catalog
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import Response
+from utils.attempt_store import attempt_store
+from services.adaptive_service import adaptive_engine, state_json
+from services.adaptive_service import state as adaptive_state
 from services.ai_service import predict_level
 from services.report_service import generate_paragraph
+from services.score_service import score_board
+from utils.executor import run_in
+from utils.metrics import ANSWERS_STORED
+from utils.serializer import dumps, join_array
+import asyncio
 import random
 
 
@@ -22,81 +30,112 @@ DEFAULT_BLUEPRINT = {
 
 def sanitize_question(question):
 
-    safe_data = {
-        "id": question["id"],
-        "track": question.get("track"),
-        "topic": question.get("topic"),
-        "subtopic": question.get("subtopic"),
-        "difficulty": question.get("difficulty"),
-        "question_type": question.get("question_type"),
-        "question": question.get("question"),
-        "options": question.get("options", []),
-        "user_explanation_required": question.get("user_explanation_required", False),
-    }
-
-    # ✅ Include code for CODE_TRACE
-    if question.get("question_type") == "CODE_TRACE":
-        safe_data["code"] = question.get("code")
+    # Catalog records keep display text cold; decode it once here
+    return public_view(as_dict(question))
 
-    return safe_data
 
-def generate_test(difficulty_mode="Mixed", time_limit=1500):
+def _select_test(difficulty_mode, time_limit):
 
-    dataset = load_full_dataset()
-    random.shuffle(dataset)
+    catalog = get_catalog()
     selection = select_questions(
-        dataset=dataset,
+        dataset=catalog,
         blueprint=DEFAULT_BLUEPRINT,
         time_limit=time_limit,
         difficulty_mode=difficulty_mode
     )
 
-    # Get full question objects
-    selected_questions = [
-        q for q in dataset if q["id"] in selection["question_ids"]
-    ]
+    # Get full question objects (shuffled so types are interleaved)
+    selected_questions = [catalog.by_id[qid] for qid in selection["question_ids"]]
+    random.shuffle(selected_questions)
+
+    test_meta = {
+        "total_questions": selection["total_questions"],
+        "total_time_sec": selection["total_time_sec"],
+        "difficulty_mode": selection["difficulty_mode"],
+        "coverage_relaxed": selection["coverage_relaxed"],
+        "uncovered_topics": selection["uncovered_topics"]
+    }
+    return test_meta, selected_questions
+
+
+def generate_test(difficulty_mode="Mixed", time_limit=1500):
+
+    test_meta, selected_questions = _select_test(difficulty_mode, time_limit)
 
     # 🔒 Sanitize before returning
     safe_questions = [sanitize_question(q) for q in selected_questions]
 
     return {
-        "test_meta": {
-            "total_questions": selection["total_questions"],
-            "total_time_sec": selection["total_time_sec"],
-            "difficulty_mode": selection["difficulty_mode"]
-        },
+        "test_meta": test_meta,
         "questions": safe_questions
     }
-# Save each answer
-@router.post("/submit-answer")
-def submit_answer(payload: dict):
 
-    user_id = payload["user_id"]
 
-    if user_id not in attempts_db:
-        attempts_db[user_id] = []
+def generate_test_json(difficulty_mode="Mixed", time_limit=1500):
+    """generate_test as response bytes, built from each question's pre-serialized public JSON."""
+
+    test_meta, selected_questions = _select_test(difficulty_mode, time_limit)
 
-    attempts_db[user_id].append(payload)
+    return b"".join((
+        b'{"test_meta":', dumps(test_meta),
+        b',"questions":', join_array(q.public for q in selected_questions),
+        b"}",
+    ))
 
-    print("Saved:", payload)
-    print("Current attempts_db:", attempts_db)
+
+# Save each answer
+@router.post("/submit-answer")
+async def submit_answer(payload: dict):
+
+    # Off the loop: the memory store may read a spilled session back from
+    # disk; SQLite group commit resolves the returned future
+    try:
+        stored = await run_in("answers", attempt_store.append, payload, wait=False)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    await asyncio.wrap_future(stored)
+    ANSWERS_STORED.inc()
+    body = await run_in("answers", _record_answer, payload)
+    if body is not None:
+        return Response(body, media_type="application/json")
 
     return {"status": "saved"}
-@router.post("/finish-test")
-def finish_test(user_id: str):
 
-    attempts = attempts_db.get(user_id, [])
 
-    results = evaluate_attempts(attempts)
+def _record_answer(payload):
+    """
+    Grade a stored answer; for adaptive tests also update the ability
+    estimate and return the response body with the next item, else None.
+    """
+    result = score_board.record(payload)
+    if result is None or adaptive_engine.get(payload["user_id"]) is None:
+        return None
+
+    session = adaptive_engine.record(payload["user_id"], payload["question_id"], result["is_correct"])
+    return state_json(session, {"status": "saved"})
+
+
+@router.post("/finish-test")
+async def finish_test(user_id: str):
 
-    features = compute_student_features(results)
+    features = await run_in("cpu", score_board.features, user_id)
+    if not features:
+        raise HTTPException(status_code=404, detail="No answers recorded for this user")
 
-    level = predict_level(features)
+    level = await run_in("inference", predict_level, features)
 
     paragraph = generate_paragraph(features, level)
 
-    return {
+    response = {
         "level": level,
         "features": features,
         "paragraph": paragraph
-    }
\ No newline at end of file
+    }
+
+    session = adaptive_engine.finish(user_id)
+    if session is not None:
+        response["adaptive"] = adaptive_state(session)
+
+    attempt_store.finish(user_id)
+
+    return response
\ No newline at end of file
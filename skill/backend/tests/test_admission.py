@@ -0,0 +1,94 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+import main
+from utils.admission import Budget, Gate, Shed, admission_gates
+from utils.executor import CPU_WORKERS
+from utils.loader import get_catalog
+
+
+def test_gates_share_one_budget():
+    async def scenario():
+        budget = Budget(2)
+        a = Gate("/a", 2, 10, 1.0, budget=budget)
+        b = Gate("/b", 2, 10, 1.0, budget=budget)
+
+        await a.acquire()
+        await b.acquire()
+        assert budget.active == 2
+
+        # Both gates are under their own limit, but the budget is spent
+        waiter = asyncio.ensure_future(a.acquire())
+        await asyncio.sleep(0)
+        assert a.waiting == 1 and not waiter.done()
+
+        b.release()
+        await asyncio.wait_for(waiter, 1.0)
+        assert (a.active, b.active, budget.active) == (2, 0, 2)
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_and_timeout_shed():
+    async def scenario():
+        gate = Gate("/a", 1, 1, 0.05)
+        await gate.acquire()
+
+        queued = asyncio.ensure_future(gate.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(Shed) as full:
+            await gate.acquire()
+        assert full.value.reason == "queue_full" and full.value.retry_after >= 1
+
+        with pytest.raises(Shed) as late:
+            await queued
+        assert late.value.reason == "timeout"
+        assert gate.waiting == 0 and gate.budget.waiters == type(gate.budget.waiters)()
+
+    asyncio.run(scenario())
+
+
+def test_submit_answer_not_delayed_by_saturated_bursts(monkeypatch):
+    """
+    Saturate /generate-test well past the burst budget with slow
+    generations; answers submitted meanwhile must not wait behind them.
+    """
+    generation = 0.3
+
+    def slow_generate(**kwargs):
+        time.sleep(generation)
+        return b'{"questions":[]}'
+
+    monkeypatch.setattr(main, "generate_test_json", slow_generate)
+    monkeypatch.setattr(main.test_pool, "take", lambda *args: None)
+    question_id = get_catalog().questions[0].id
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+            async def answer(i):
+                start = time.perf_counter()
+                response = await client.post("/submit-answer", json={
+                    "user_id": f"admission-{i}", "question_id": question_id, "answer": "A", "time": 10,
+                })
+                return response.status_code, time.perf_counter() - start
+
+            bursts = [
+                asyncio.ensure_future(client.post("/generate-test", json={}))
+                for _ in range(4 * CPU_WORKERS + 4)
+            ]
+            await asyncio.sleep(0.05)
+            assert admission_gates["/generate-test"].active <= CPU_WORKERS
+
+            answers = await asyncio.gather(*[answer(i) for i in range(20)])
+            statuses = [r.status_code for r in await asyncio.gather(*bursts)]
+        return answers, statuses
+
+    answers, statuses = asyncio.run(scenario())
+
+    assert all(status == 200 for status, _ in answers)
+    assert max(seconds for _, seconds in answers) < generation / 2
+    assert set(statuses) <= {200, 503} and 200 in statuses
@@ -0,0 +1,85 @@
+import json
+import sqlite3
+
+import pytest
+
+from utils.attempt_store import SQLiteAttemptStore
+
+
+class TracingConnection(sqlite3.Connection):
+    """Logs each statement's verb and whether a transaction is still open after it."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.log = []
+
+    def execute(self, sql, *args):
+        cursor = super().execute(sql, *args)
+        self.log.append((sql.split()[0], self.in_transaction))
+        return cursor
+
+
+def _row(user_id, question_id):
+    payload = {"user_id": user_id, "question_id": question_id, "answer": "A"}
+    return user_id, None, question_id, json.dumps(payload)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteAttemptStore(str(tmp_path / "attempts.db"))
+    yield store
+    store.close()
+
+
+def test_batch_is_written_with_a_single_commit(store):
+    conn = store._connect(isolation_level=None, factory=TracingConnection)
+    conn.log.clear()
+    # question_id NOT NULL fails the middle row only
+    rows = [_row("u1", "q1"), _row("u1", None), _row("u2", "q1")]
+
+    failed = store._write_batch(conn, rows)
+
+    assert list(failed) == [1]
+    verbs = [verb for verb, _ in conn.log]
+    assert verbs.count("BEGIN") == 1 and verbs.count("COMMIT") == 1
+    assert verbs[-1] == "COMMIT"
+    # Nothing is committed before the final COMMIT
+    assert all(open_ for _, open_ in conn.log[:-1])
+    conn.close()
+
+    assert [a["question_id"] for a in store.latest("u1")] == ["q1"]
+    assert [a["question_id"] for a in store.latest("u2")] == ["q1"]
+
+
+def test_append_rejects_only_the_bad_payload(store):
+    store.append({"user_id": "u1", "question_id": "q1", "answer": "A"})
+    with pytest.raises(ValueError):
+        store.append({"user_id": "u1", "question_id": None})
+    assert len(store.latest("u1")) == 1
+
+
+def test_spilled_session_is_read_back_outside_the_store_lock(tmp_path, monkeypatch):
+    from utils.attempt_store import MemoryAttemptStore
+
+    store = MemoryAttemptStore(budget_mb=0, spill_dir=str(tmp_path), idle_ttl=3600)
+    try:
+        store.append({"user_id": "u1", "question_id": "q1", "answer": "A"})
+        store.append({"user_id": "u2", "question_id": "q1", "answer": "A"})
+        store.sweep()
+        assert store.spilled_count() == 1
+
+        pop = store._spill.pop
+
+        def pop_unlocked(user_id):
+            # Another store caller would block here if the lock were held
+            assert store._lock.acquire(blocking=False)
+            store._lock.release()
+            return pop(user_id)
+
+        monkeypatch.setattr(store._spill, "pop", pop_unlocked)
+        store.append({"user_id": "u1", "question_id": "q2", "answer": "B"})
+
+        assert [a["question_id"] for a in store.latest("u1")] == ["q1", "q2"]
+        assert store.spilled_count() == 0
+    finally:
+        store.close()
@@ -0,0 +1,53 @@
+import asyncio
+
+import httpx
+
+import main
+from utils.loader import get_catalog
+
+
+def _post(path, **kwargs):
+    async def request():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+            return await client.post(path, **kwargs)
+
+    return asyncio.run(request())
+
+
+def test_finish_without_answers_is_not_found():
+    response = _post("/finish-test", params={"user_id": "finish-nobody"})
+    assert response.status_code == 404
+
+    response = _post("/submit-attempt", json={"user_id": "finish-nobody"})
+    assert response.status_code == 404
+
+
+def test_finish_after_an_answer_reports_a_level():
+    question_id = get_catalog().questions[0].id
+    answer = {"user_id": "finish-one", "question_id": question_id, "answer": "A", "time": 10}
+    assert _post("/submit-answer", json=answer).status_code == 200
+
+    response = _post("/finish-test", params={"user_id": "finish-one"})
+    assert response.status_code == 200
+    assert response.json()["features"]["accuracy"] is not None
+
+
+def test_adaptive_answer_serves_the_next_item_without_a_catalog_lookup(monkeypatch):
+    import services.adaptive_service as adaptive_service
+
+    started = _post("/adaptive/start", json={"user_id": "adaptive-one"}).json()
+    question = started["question"]
+    assert question is not None
+
+    def no_catalog(*args):
+        raise AssertionError("catalog lookup while answering")
+
+    monkeypatch.setattr(adaptive_service, "get_catalog", no_catalog)
+    answer = {"user_id": "adaptive-one", "question_id": question["id"], "answer": "A", "time": 10}
+    response = _post("/submit-answer", json=answer)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "saved" and body["answered"] == 1
+    assert body["question"]["id"] != question["id"]
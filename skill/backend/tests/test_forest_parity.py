@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+pd = pytest.importorskip("pandas")
+
+from core.forest_engine import CompiledForest
+from services.ai_service import load_engine, load_sklearn_models
+
+
+SEED = 1234
+N_VECTORS = 400
+
+
+def _vectors(forest, n=N_VECTORS, seed=SEED):
+    """Random vectors around each feature's split range, half snapped onto a threshold."""
+    rng = np.random.default_rng(seed)
+    # Leaves point to themselves
+    split = forest.children[0::2] != np.arange(len(forest.feature))
+    columns = []
+    for i in range(len(forest.feature_names)):
+        thresholds = forest.threshold[split & (forest.feature == i)]
+        if not len(thresholds):
+            thresholds = np.array([0.0, 1.0])
+        lo, hi = thresholds.min(), thresholds.max()
+        margin = (hi - lo) * 0.1 + 1e-3
+        column = rng.uniform(lo - margin, hi + margin, n)
+        # Values exactly on a split exercise the float32 cast and the `<=`
+        snap = rng.random(n) < 0.5
+        column[snap] = rng.choice(thresholds, snap.sum())
+        columns.append(column)
+    return np.column_stack(columns).astype(np.float32)
+
+
+def _sklearn_proba(model, forest, X):
+    return model.predict_proba(pd.DataFrame(X, columns=forest.feature_names))
+
+
+def test_compiled_forest_matches_sklearn():
+    forest = load_engine()
+    model, encoder = load_sklearn_models()
+    X = _vectors(forest)
+
+    expected = _sklearn_proba(model, forest, X)
+    np.testing.assert_allclose(forest.predict_proba(X), expected, rtol=0, atol=1e-12)
+
+    labels = encoder.inverse_transform(model.predict(pd.DataFrame(X, columns=forest.feature_names)))
+    assert list(forest.predict(X)) == list(labels)
+
+
+def test_single_prediction_matches_batch():
+    forest = load_engine()
+    X = _vectors(forest, n=100, seed=SEED + 1)
+    batch = forest.predict_proba(X)
+    for row, proba in zip(X, batch):
+        np.testing.assert_array_equal(forest.predict_proba_one(row), proba)
+
+
+def test_from_sklearn_matches_a_freshly_fitted_forest():
+    from sklearn.ensemble import RandomForestClassifier
+
+    rng = np.random.default_rng(SEED)
+    X = rng.random((500, 5))
+    y = (X[:, 0] + 0.5 * X[:, 1] > 0.8).astype(int) + (X[:, 2] > 0.7)
+    model = RandomForestClassifier(n_estimators=25, max_depth=8, random_state=SEED).fit(X, y)
+
+    forest = CompiledForest.from_sklearn(model)
+    probe = _vectors(forest, n=300)
+    np.testing.assert_allclose(forest.predict_proba(probe), model.predict_proba(probe), rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(forest.predict(probe), model.predict(probe))
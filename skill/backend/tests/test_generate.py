@@ -0,0 +1,38 @@
+import asyncio
+
+import httpx
+import pytest
+
+import main
+from core.selector import InvalidTestRequest, validate_request
+
+
+def _generate(body):
+    async def request():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+            return await client.post("/generate-test", json=body)
+
+    return asyncio.run(request())
+
+
+@pytest.mark.parametrize("body", [
+    {"difficulty_mode": ["x"]},
+    {"difficulty_mode": "Impossible"},
+    {"time_limit": "1500"},
+    {"time_limit": [1500]},
+    {"time_limit": True},
+    {"time_limit": -1},
+])
+def test_invalid_requests_are_rejected_with_422(body):
+    response = _generate(body)
+    assert response.status_code == 422
+    assert response.json()["detail"]["error"] == "invalid_request"
+
+
+def test_known_modes_are_accepted():
+    for mode in ("Mixed", "Easy", "Medium", "Hard"):
+        validate_request(mode, 1500)
+    with pytest.raises(InvalidTestRequest):
+        validate_request("mixed", 1500.0)
+    assert _generate({"difficulty_mode": "Mixed", "time_limit": 1500}).status_code == 200
@@ -0,0 +1,36 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from core.irt import DEFAULT_DISCRIMINATION, DIFFICULTY_PRIOR, calibrate
+
+
+def _simulate(n_items=40, n_candidates=3000, per_candidate=15, seed=0):
+    rng = np.random.default_rng(seed)
+    questions = [SimpleNamespace(id=f"q{i}", difficulty="Medium") for i in range(n_items)]
+    a = rng.uniform(0.4, 2.5, n_items)
+    b = rng.normal(0.0, 1.0, n_items)
+
+    candidates = []
+    for _ in range(n_candidates):
+        theta = rng.normal()
+        items = rng.choice(n_items, per_candidate, replace=False)
+        p = 1.0 / (1.0 + np.exp(-a[items] * (theta - b[items])))
+        candidates.append([(f"q{i}", bool(rng.random() < pi)) for i, pi in zip(items, p)])
+    return questions, candidates, a, b
+
+
+def test_calibration_recovers_both_parameters():
+    questions, candidates, a_true, b_true = _simulate()
+    params = calibrate(questions, candidates)
+
+    a = np.array([params[q.id][0] for q in questions])
+    b = np.array([params[q.id][1] for q in questions])
+    assert np.corrcoef(a, a_true)[0, 1] > 0.8
+    assert np.corrcoef(b, b_true)[0, 1] > 0.9
+
+
+def test_calibration_without_responses_is_the_prior():
+    questions = [SimpleNamespace(id=d, difficulty=d) for d in DIFFICULTY_PRIOR]
+    params = calibrate(questions)
+    assert params == {d: (DEFAULT_DISCRIMINATION, b) for d, b in DIFFICULTY_PRIOR.items()}
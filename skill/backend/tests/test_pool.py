@@ -0,0 +1,60 @@
+import threading
+import time
+
+from services.test_pool import TestPool
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_failed_generation_backs_off_and_keeps_the_config():
+    calls = []
+
+    def generate(**kwargs):
+        calls.append(time.monotonic())
+        if len(calls) <= 2:
+            raise RuntimeError("transient")
+        return b"{}"
+
+    pool = TestPool(depth=1, max_age=600, generate=generate, retry=0.05)
+    pool.start([("Mixed", 1500)])
+    try:
+        assert _wait_for(lambda: pool.size() == 1)
+        assert calls[2] - calls[1] >= calls[1] - calls[0] >= 0.05
+        assert pool.take("Mixed", 1500) == b"{}"
+    finally:
+        pool.stop()
+
+
+def test_take_does_not_wait_for_a_catalog_reload(monkeypatch):
+    import services.test_pool as test_pool_module
+
+    reloading = threading.Event()
+    release = threading.Event()
+
+    def slow_catalog():
+        reloading.set()
+        release.wait(5)
+        return object()
+
+    pool = TestPool(depth=1, max_age=600, generate=lambda **kwargs: b"{}")
+    pool.start([("Mixed", 1500)])
+    try:
+        assert _wait_for(lambda: pool.size() == 1)
+        monkeypatch.setattr(test_pool_module, "get_catalog", slow_catalog)
+        pool.take("Mixed", 1500)
+        assert reloading.wait(5)
+
+        # The producer is inside get_catalog(); lookups must not block on it
+        start = time.monotonic()
+        pool.take("Mixed", 1500)
+        assert time.monotonic() - start < 0.5
+    finally:
+        release.set()
+        pool.stop()
@@ -0,0 +1,36 @@
+from services.item_stats_service import item_stats
+from services.score_service import ScoreBoard
+from utils.attempt_store import SQLiteAttemptStore
+from utils.loader import get_catalog
+
+
+def _answers(item):
+    stats = item_stats._questions.get(item)
+    return stats.n if stats is not None else 0
+
+
+def test_re_answer_after_rebuild_replaces_the_counted_row(tmp_path):
+    store = SQLiteAttemptStore(str(tmp_path / "attempts.db"))
+    try:
+        questions = get_catalog().questions[:8]
+        board = ScoreBoard(store=store)
+
+        def answer(q, value):
+            payload = {"user_id": "u1", "attempt_id": "a1", "question_id": q.id, "answer": value}
+            store.append(payload)
+            return board.record(payload)
+
+        for q in questions:
+            answer(q, None)
+        target = questions[-1]
+        counted = _answers(target.id)
+
+        # A restart: the store keeps the answers, the board starts empty
+        board = ScoreBoard(store=store)
+        result = answer(target, "changed")
+
+        assert result["rest_score"] is not None
+        assert _answers(target.id) == counted
+        assert board.features("u1")["accuracy"] is not None
+    finally:
+        store.close()
@@ -0,0 +1,32 @@
+"""
+Helpers shared by the offline batch tools (regrade, export_cohort):
+process pool worker setup, JSONL input and chunking.
+"""
+
+
+def init_worker():
+    """Pool initializer: load the catalog once and keep that snapshot for the run."""
+    from utils import loader
+
+    loader.get_catalog()
+    loader.RELOAD_CHECK_INTERVAL = float("inf")
+
+
+def iter_lines(path):
+    """Non-blank lines of a JSONL file, unparsed."""
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield line
+
+
+def chunks(items, size):
+    """Lists of up to `size` consecutive items."""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
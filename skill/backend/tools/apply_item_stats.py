@@ -0,0 +1,106 @@
+"""
+Apply suggested max_time_sec / weight values from an item statistics
+snapshot (written by the server, see services/item_stats_service.py)
+back to the question bank.
+
+Without --write the changes are only listed. With --write the data files
+have those numbers edited in place; the running server picks them up
+through the catalog hot reload and selection uses the new values from
+then on.
+Rebuild data/catalog.bin afterwards if the binary catalog is in use.
+
+Run from skill/backend:
+    python -m tools.apply_item_stats
+    python -m tools.apply_item_stats --min-samples 100 --only max_time_sec --write
+"""
+import argparse
+import json
+import os
+import re
+import sys
+
+from core.item_stats import MIN_SAMPLES, ItemStats, suggest
+from services.item_stats_service import ITEM_STATS_PATH, SNAPSHOT_VERSION
+from utils import loader
+
+
+FIELDS = ("max_time_sec", "weight")
+
+
+def load_snapshot(path):
+    with open(path) as f:
+        state = json.load(f)
+    if state.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"{path}: unsupported snapshot version {state.get('version')}")
+    return {qid: ItemStats.from_state(s) for qid, s in state["questions"].items()}
+
+
+def _patch_field(text, question_id, field, value):
+    """
+    Set one numeric field inside a question's block of the raw file text.
+    The bank files are hand formatted, so only the number is replaced and
+    the rest of the file stays byte for byte as it was.
+    """
+    match = re.search(r'"id"\s*:\s*' + re.escape(json.dumps(question_id)), text)
+    if match is None:
+        return None
+
+    following = re.compile(r'"id"\s*:').search(text, match.end())
+    end = following.start() if following else len(text)
+
+    number = re.compile(r'("' + field + r'"\s*:\s*)-?[0-9.]+').search(text, match.end(), end)
+    if number is None:
+        return None
+    return text[:number.start()] + number.group(1) + str(value) + text[number.end():]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply item statistics suggestions to the bank.")
+    parser.add_argument("--snapshot", default=ITEM_STATS_PATH)
+    parser.add_argument("--min-samples", type=int, default=MIN_SAMPLES)
+    parser.add_argument("--only", choices=FIELDS, action="append")
+    parser.add_argument("--write", action="store_true")
+    args = parser.parse_args(argv)
+
+    stats = load_snapshot(args.snapshot)
+    fields = args.only or FIELDS
+    changed = 0
+
+    for filename in loader.DATA_FILES:
+        path = os.path.join(loader.DATA_DIR, filename)
+        with open(path) as f:
+            text = f.read()
+        original = text
+
+        for q in json.loads(text):
+            s = stats.get(q["id"])
+            suggested = suggest(s, args.min_samples) if s is not None else None
+            if suggested is None:
+                continue
+
+            evaluation = q.get("evaluation", {})
+            for field in fields:
+                current = evaluation.get(field)
+                if current == suggested[field]:
+                    continue
+                patched = _patch_field(text, q["id"], field, suggested[field])
+                if patched is None:
+                    print(f"{q['id']}: no {field} to update, skipped", file=sys.stderr)
+                    continue
+                print(f"{q['id']}: {field} {current} -> {suggested[field]} ({s.n} answers)")
+                text = patched
+                changed += 1
+
+        if args.write and text != original:
+            tmp = path + ".tmp"
+            with open(tmp, "w") as f:
+                f.write(text)
+            os.replace(tmp, path)
+
+    action = "applied" if args.write else "suggested (dry run, pass --write to apply)"
+    print(f"[item-stats] {changed} changes {action}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
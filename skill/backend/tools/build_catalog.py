@@ -0,0 +1,40 @@
+"""
+Compile the question bank (data/dsa_*.json) into the binary catalog file
+that the server memory-maps at startup.
+
+The file records the data files' hash, so the server falls back to the
+JSON (CATALOG_FORMAT=auto) or refuses to start (CATALOG_FORMAT=binary)
+when it is out of date. Rebuild after editing the bank.
+
+Run from skill/backend:
+    python -m tools.build_catalog
+    python -m tools.build_catalog --output /srv/skillgate/catalog.bin
+"""
+import argparse
+import os
+import sys
+import time
+
+from utils import loader
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the binary question catalog.")
+    parser.add_argument("--output", default=loader.CATALOG_BIN_PATH)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    header = loader.build_catalog_file(args.output)
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"[catalog] {header['count']} questions -> {args.output} "
+        f"({os.path.getsize(args.output):,} bytes, {elapsed:.2f}s, "
+        f"source {header['source_hash'][:12]})",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
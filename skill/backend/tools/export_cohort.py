@@ -0,0 +1,363 @@
+"""
+Cohort report export: every candidate's evaluate_attempt report,
+streamed to CSV and/or Parquet, with cohort aggregates from the same pass.
+
+Input is either a JSONL file of attempts ({"attempt_id", "user_id",
+"answers": [{question_id, user_answer}]}, as in `regrade --mode report`)
+or the attempt store. The store keeps no timestamps, so an assessment
+window is selected by attempt id: with --attempt-id only answers whose
+attempt_id matches the glob are reported. A store candidate whose
+(matching) answers span several attempts is reported under the attempt
+id most of them carry, ties going to the greatest id.
+
+Reports are graded in a process pool with a bounded window of chunks in
+flight (as in tools/regrade.py) and written out chunk by chunk, one CSV
+row or Parquet row per candidate with a column per catalog topic.
+Aggregates (score and readiness histograms, per-topic score
+distributions and strong/weak counts) are running totals, so memory
+stays flat however many candidates there are. Parquet needs pyarrow.
+
+Run from skill/backend:
+    python -m tools.export_cohort --input attempts.jsonl --csv cohort.csv
+    python -m tools.export_cohort --from-store --attempt-id "2024-06-*" \\
+        --csv cohort.csv --parquet cohort.parquet --summary cohort.summary.json
+"""
+import argparse
+import csv
+import fnmatch
+import json
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from core.item_stats import RunningMoments
+from tools._batch import chunks, init_worker, iter_lines
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional; only needed for --parquet
+    pa = pq = None
+
+
+READINESS_LEVELS = ["Industry Ready", "Almost Ready", "Needs Improvement", "Foundation Level"]
+# Equal-width percent bins: [0, 10), [10, 20), ..., [90, 100]
+PERCENT_BINS = 10
+# Parquet rows per row group; the writer holds at most this many
+PARQUET_ROW_GROUP = 10000
+
+BASE_COLUMNS = [
+    "attempt_id", "user_id", "overall_score_percent", "readiness_level",
+    "answered", "strong_topics", "weak_topics", "summary",
+]
+
+
+# -------- Worker Side --------
+def _topic(topic):
+    # Questions with "topic": null report as evaluate_attempt's default
+    return "General" if topic is None else topic
+
+
+def _report_row(record):
+    from core.evaluation_service import evaluate_attempt
+
+    report = evaluate_attempt(record)
+    return {
+        "attempt_id": report["attempt_id"],
+        "user_id": report["user_id"],
+        "overall_score_percent": report["overall_score_percent"],
+        "readiness_level": report["readiness_level"],
+        "answered": len(report["detailed_results"]),
+        "strong_topics": [_topic(t) for t in report["strong_topics"]],
+        "weak_topics": [_topic(t) for t in report["weak_topics"]],
+        "summary": report["summary"],
+        "topics": {_topic(t): p for t, p in report["topic_wise_performance_percent"].items()},
+    }
+
+
+def _report_chunk(lines):
+    # Compact rows instead of full reports keep the pickling back small
+    return [_report_row(json.loads(line) if isinstance(line, str) else line) for line in lines]
+
+
+# -------- Input Sources --------
+def _iter_store(db_path, attempt_glob=None):
+    from utils.attempt_store import SQLiteAttemptStore
+
+    store = SQLiteAttemptStore(db_path)
+    try:
+        for user_id, answers in store.iter_latest():
+            if attempt_glob is not None:
+                answers = [a for a in answers if fnmatch.fnmatchcase(a.get("attempt_id") or "", attempt_glob)]
+                if not answers:
+                    continue
+            yield {
+                "user_id": user_id,
+                "attempt_id": _attempt_id(answers),
+                "answers": [
+                    {"question_id": a["question_id"], "user_answer": a.get("answer")}
+                    for a in answers
+                ],
+            }
+    finally:
+        store.close()
+
+
+def _attempt_id(answers):
+    """
+    The attempt most of the answers belong to, ties going to the greatest
+    id (ids are usually date-prefixed, so the latest), or None.
+    """
+    counts = Counter(a["attempt_id"] for a in answers if a.get("attempt_id"))
+    return max(counts, key=lambda attempt_id: (counts[attempt_id], attempt_id)) if counts else None
+
+
+def _filter_attempts(records, attempt_glob):
+    for line in records:
+        record = json.loads(line)
+        if fnmatch.fnmatchcase(record.get("attempt_id") or "", attempt_glob):
+            yield record
+
+
+# -------- Cohort Aggregates --------
+def _percent_bin(percent):
+    return min(PERCENT_BINS - 1, max(0, int(percent * PERCENT_BINS / 100)))
+
+
+class _TopicTotals:
+    __slots__ = ("score", "hist", "strong", "weak")
+
+    def __init__(self):
+        self.score = RunningMoments()
+        self.hist = [0] * PERCENT_BINS
+        self.strong = 0
+        self.weak = 0
+
+    def summary(self):
+        return {
+            "candidates": self.score.n,
+            "mean_percent": round(self.score.mean, 2),
+            "std_percent": round(self.score.std, 2),
+            "histogram": list(self.hist),
+            "strong": self.strong,
+            "weak": self.weak,
+        }
+
+
+class CohortAggregate:
+    """Running cohort totals, folded in one report row at a time."""
+
+    def __init__(self):
+        self.candidates = 0
+        self.ungraded = 0
+        self.score = RunningMoments()
+        self.score_hist = [0] * PERCENT_BINS
+        self.readiness = dict.fromkeys(READINESS_LEVELS, 0)
+        self.topics = {}
+
+    def add(self, row):
+        self.candidates += 1
+        if not row["answered"]:
+            self.ungraded += 1
+            return
+
+        percent = row["overall_score_percent"]
+        self.score.add(percent)
+        self.score_hist[_percent_bin(percent)] += 1
+        self.readiness[row["readiness_level"]] = self.readiness.get(row["readiness_level"], 0) + 1
+
+        for topic, topic_percent in row["topics"].items():
+            totals = self.topics.get(topic)
+            if totals is None:
+                totals = self.topics[topic] = _TopicTotals()
+            totals.score.add(topic_percent)
+            totals.hist[_percent_bin(topic_percent)] += 1
+        for topic in row["strong_topics"]:
+            self.topics[topic].strong += 1
+        for topic in row["weak_topics"]:
+            self.topics[topic].weak += 1
+
+    def summary(self):
+        return {
+            "candidates": self.candidates,
+            "ungraded": self.ungraded,
+            "histogram_bins": [f"{i * 100 // PERCENT_BINS}-{(i + 1) * 100 // PERCENT_BINS}" for i in range(PERCENT_BINS)],
+            "overall": {
+                "mean_percent": round(self.score.mean, 2),
+                "std_percent": round(self.score.std, 2),
+                "histogram": list(self.score_hist),
+            },
+            "readiness": dict(self.readiness),
+            "topics": {topic: t.summary() for topic, t in sorted(self.topics.items())},
+        }
+
+
+# -------- Writers --------
+class CsvReportWriter:
+
+    def __init__(self, path, topics):
+        self.topics = topics
+        self._file = open(path, "w", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(BASE_COLUMNS + [f"topic:{t}" for t in topics])
+
+    def write(self, rows):
+        self._writer.writerows(
+            [
+                row["attempt_id"], row["user_id"], row["overall_score_percent"], row["readiness_level"],
+                row["answered"], "; ".join(row["strong_topics"]), "; ".join(row["weak_topics"]),
+                row["summary"],
+            ] + [row["topics"].get(t, "") for t in self.topics]
+            for row in rows
+        )
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetReportWriter:
+    """Buffers rows column-wise and writes one row group per PARQUET_ROW_GROUP rows."""
+
+    def __init__(self, path, topics, row_group=PARQUET_ROW_GROUP):
+        self.topics = topics
+        self.row_group = row_group
+
+        fields = [
+            ("attempt_id", pa.string()),
+            ("user_id", pa.string()),
+            ("overall_score_percent", pa.float64()),
+            ("readiness_level", pa.string()),
+            ("answered", pa.int32()),
+            ("strong_topics", pa.list_(pa.string())),
+            ("weak_topics", pa.list_(pa.string())),
+            ("summary", pa.string()),
+        ]
+        fields += [(f"topic:{t}", pa.float64()) for t in topics]
+        self.schema = pa.schema(fields)
+        self._writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+        self._columns = {name: [] for name in self.schema.names}
+        self._buffered = 0
+
+    def write(self, rows):
+        columns = self._columns
+        for row in rows:
+            for name in BASE_COLUMNS:
+                columns[name].append(row[name])
+            for t in self.topics:
+                columns[f"topic:{t}"].append(row["topics"].get(t))
+        self._buffered += len(rows)
+        if self._buffered >= self.row_group:
+            self._flush()
+
+    def _flush(self):
+        if not self._buffered:
+            return
+        self._writer.write_table(pa.table(self._columns, schema=self.schema))
+        self._columns = {name: [] for name in self.schema.names}
+        self._buffered = 0
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+
+# -------- Driver --------
+def export_cohort(records, writers, workers=None, chunk_size=500, progress_every=2.0, log=sys.stderr):
+    """
+    Grade `records` (JSON lines or dicts) across a process pool, hand each
+    chunk of report rows to every writer in input order, and return the
+    CohortAggregate built along the way.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 2
+
+    cohort = CohortAggregate()
+    started = last_report = time.perf_counter()
+
+    def report(final=False):
+        elapsed = time.perf_counter() - started
+        rate = cohort.candidates / elapsed if elapsed else 0.0
+        label = "done" if final else "progress"
+        print(f"[export] {label}: {cohort.candidates} candidates in {elapsed:.1f}s ({rate:,.0f}/s)", file=log)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+        pending = deque()
+
+        def drain_one():
+            nonlocal last_report
+            rows = pending.popleft().result()
+            for writer in writers:
+                writer.write(rows)
+            for row in rows:
+                cohort.add(row)
+            if progress_every and time.perf_counter() - last_report >= progress_every:
+                last_report = time.perf_counter()
+                report()
+
+        for chunk in chunks(records, chunk_size):
+            pending.append(pool.submit(_report_chunk, chunk))
+            if len(pending) >= max_in_flight:
+                drain_one()
+
+        while pending:
+            drain_one()
+
+    report(final=True)
+    return cohort
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export per-candidate reports and cohort aggregates.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="JSONL file of attempts")
+    source.add_argument("--from-store", action="store_true", help="read latest answers from the SQLite attempt store")
+    parser.add_argument("--store-db", default=None, help="SQLite attempt store path (defaults to ATTEMPT_DB_PATH)")
+    parser.add_argument("--attempt-id", default=None, help="only attempts whose attempt_id matches this glob")
+    parser.add_argument("--csv", default=None, help="CSV output path")
+    parser.add_argument("--parquet", default=None, help="Parquet output path (requires pyarrow)")
+    parser.add_argument("--summary", default="-", help="cohort aggregates JSON path, '-' for stdout")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    if args.parquet and pa is None:
+        parser.error("--parquet needs pyarrow (pip install pyarrow)")
+
+    if args.input:
+        records = iter_lines(args.input)
+        if args.attempt_id:
+            records = _filter_attempts(records, args.attempt_id)
+    else:
+        from utils.attempt_store import ATTEMPT_DB_PATH
+        records = _iter_store(args.store_db or ATTEMPT_DB_PATH, args.attempt_id)
+
+    from utils.loader import get_catalog
+
+    # One column per catalog topic, fixed before the first row is written
+    topics = sorted({_topic(t) for t in get_catalog().by_topic})
+
+    writers = []
+    try:
+        if args.csv:
+            writers.append(CsvReportWriter(args.csv, topics))
+        if args.parquet:
+            writers.append(ParquetReportWriter(args.parquet, topics))
+        cohort = export_cohort(records, writers, workers=args.workers, chunk_size=args.chunk_size)
+    finally:
+        for writer in writers:
+            writer.close()
+
+    summary = json.dumps(cohort.summary(), indent=2)
+    if args.summary == "-":
+        print(summary)
+    else:
+        with open(args.summary, "w") as f:
+            f.write(summary + "\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
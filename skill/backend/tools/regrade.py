@@ -0,0 +1,158 @@
+"""
+Bulk regrade of stored attempts against the current answer keys.
+
+Input is either a JSONL file (one attempt per line) or the attempt
+store. Lines are graded in a process pool and written out as JSONL in
+input order. Only a bounded window of chunks is in flight, so memory
+stays flat however large the input is.
+
+Modes:
+  features  evaluate_attempts + compute_student_features per line.
+            A line is {"user_id", "attempt_id"?, "answers": [{question_id,
+            answer, time}]} or a single submit-answer payload.
+  report    evaluate_attempt per line: {"attempt_id", "user_id",
+            "answers": [{question_id, user_answer}]}.
+
+Run from skill/backend:
+    python -m tools.regrade --input attempts.jsonl --output regraded.jsonl
+    python -m tools.regrade --from-store --store-db attempts.db --mode report
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from tools._batch import chunks, init_worker, iter_lines
+
+
+# -------- Worker Side --------
+_MODE = None
+
+
+def _init_worker(mode):
+    global _MODE
+    _MODE = mode
+    init_worker()
+
+
+def _grade_record(record):
+    from core.evaluation_service import (
+        compute_student_features,
+        evaluate_attempt,
+        evaluate_attempts,
+    )
+
+    if _MODE == "report":
+        return evaluate_attempt(record)
+
+    answers = record["answers"] if "answers" in record else [record]
+    results = evaluate_attempts(answers)
+    return {
+        "user_id": record.get("user_id"),
+        "attempt_id": record.get("attempt_id"),
+        "results": results,
+        "features": compute_student_features(results),
+    }
+
+
+def _grade_chunk(lines):
+    out = []
+    for line in lines:
+        record = json.loads(line) if isinstance(line, str) else line
+        out.append(json.dumps(_grade_record(record)))
+    return out
+
+
+# -------- Input Sources --------
+def _iter_store(db_path, mode):
+    from utils.attempt_store import SQLiteAttemptStore
+
+    store = SQLiteAttemptStore(db_path)
+    try:
+        for user_id, answers in store.iter_latest():
+            if mode == "report":
+                answers = [
+                    {"question_id": a["question_id"], "user_answer": a.get("answer")}
+                    for a in answers
+                ]
+            yield {"user_id": user_id, "answers": answers}
+    finally:
+        store.close()
+
+
+# -------- Driver --------
+def regrade(records, out, mode="features", workers=None, chunk_size=500,
+            progress_every=2.0, log=sys.stderr):
+    """
+    Grade `records` (JSON lines or dicts) across a process pool and write
+    one JSON line per record to `out`. Returns the number of records.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 2
+
+    done = 0
+    started = last_report = time.perf_counter()
+
+    def report(final=False):
+        elapsed = time.perf_counter() - started
+        rate = done / elapsed if elapsed else 0.0
+        label = "done" if final else "progress"
+        print(f"[regrade] {label}: {done} records in {elapsed:.1f}s ({rate:,.0f}/s)", file=log)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(mode,)) as pool:
+        pending = deque()
+
+        def drain_one():
+            nonlocal done, last_report
+            for line in pending.popleft().result():
+                out.write(line + "\n")
+                done += 1
+            if progress_every and time.perf_counter() - last_report >= progress_every:
+                last_report = time.perf_counter()
+                report()
+
+        for chunk in chunks(records, chunk_size):
+            pending.append(pool.submit(_grade_chunk, chunk))
+            if len(pending) >= max_in_flight:
+                drain_one()
+
+        while pending:
+            drain_one()
+
+    report(final=True)
+    return done
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Regrade stored attempts against the current answer keys.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="JSONL file of attempts")
+    source.add_argument("--from-store", action="store_true", help="read latest answers from the SQLite attempt store")
+    parser.add_argument("--store-db", default=None, help="SQLite attempt store path (defaults to ATTEMPT_DB_PATH)")
+    parser.add_argument("--output", default="-", help="JSONL output path, '-' for stdout")
+    parser.add_argument("--mode", choices=["features", "report"], default="features")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    if args.input:
+        records = iter_lines(args.input)
+    else:
+        from utils.attempt_store import ATTEMPT_DB_PATH
+        records = _iter_store(args.store_db or ATTEMPT_DB_PATH, args.mode)
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        regrade(records, out, mode=args.mode, workers=args.workers, chunk_size=args.chunk_size)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
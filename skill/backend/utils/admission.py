@@ -0,0 +1,236 @@
+import asyncio
+import math
+import os
+import random
+import time
+from collections import deque
+
+from utils.executor import CPU_WORKERS
+from utils.metrics import Counter, Histogram, register_gauge
+from utils.serializer import dumps
+
+
+ADMISSION_ENABLED = os.environ.get("ADMISSION_ENABLED", "1") != "0"
+# Per-endpoint overrides, "path=concurrency:queue:wait_sec" separated by
+# commas, e.g. "/generate-test=4:512:3,/finish-test=8:1024:10"
+ADMISSION_LIMITS = os.environ.get("ADMISSION_LIMITS", "")
+# Requests all burst endpoints together may have in flight. Each holds at
+# most one "cpu" worker at a time, so this keeps the executor from queueing;
+# /submit-answer grades on its own "answers" executor either way
+ADMISSION_BURST_BUDGET = int(os.environ.get("ADMISSION_BURST_BUDGET", CPU_WORKERS))
+# Retry-After is the estimated queue drain time, stretched by up to this
+# share at random so shed clients do not all come back in the same second
+ADMISSION_RETRY_JITTER = float(os.environ.get("ADMISSION_RETRY_JITTER", "0.5"))
+
+# path -> (concurrency, queue, max wait seconds); concurrency None means
+# the path may use the whole shared budget
+DEFAULT_LIMITS = {
+    "/generate-test": (None, 256, 2.0),
+    "/finish-test": (None, 1024, 10.0),
+    "/submit-attempt": (None, 256, 5.0),
+    "/adaptive/start": (None, 256, 2.0),
+    "/batch-score": (1, 4, 1.0),
+}
+# Never shed: answers of a test in progress wait for as long as it takes
+PRIORITY_PATHS = ("/submit-answer",)
+
+ADMISSION_SHED = Counter(
+    "skillgate_admission_shed_total", "Requests rejected with 503 by admission control.", ["path", "reason"]
+)
+ADMISSION_WAIT = Histogram(
+    "skillgate_admission_wait_seconds", "Time requests waited for an admission slot.", ["path"]
+)
+
+
+class Shed(Exception):
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+# -------- Concurrency Gates --------
+class Gate:
+    """
+    One endpoint's admission limits: at most `concurrency` requests in
+    flight and `queue` waiting. A request that finds the queue full, or
+    waits longer than `max_wait`, is shed. Gates sharing a `Budget` also
+    draw every slot from it; a gate without one gets its own. A priority
+    gate never sheds (no queue bound, no wait limit, no budget) and is
+    only counted.
+
+    Gates live on the event loop and are not thread safe.
+    """
+
+    def __init__(self, path, concurrency, queue, max_wait, budget=None, priority=False):
+        self.path = path
+        self.concurrency = concurrency
+        self.queue = queue
+        self.max_wait = max_wait
+        self.priority = priority
+        self.budget = budget if budget is not None or priority else Budget(concurrency)
+
+        self.active = 0
+        self.waiting = 0
+        # Exponentially weighted mean time a request holds its slot
+        self._service_time = 0.05
+
+    def retry_after(self):
+        """Seconds until the current queue should have drained, at least 1."""
+        slots = min(self.concurrency, self.budget.concurrency)
+        drain = (self.waiting + 1) * self._service_time / max(1, slots)
+        drain *= 1.0 + random.random() * ADMISSION_RETRY_JITTER
+        return max(1, math.ceil(drain))
+
+    async def acquire(self):
+        if self.priority:
+            self.active += 1
+            return
+        # Waiters of this gate go first; other gates' waiters are only
+        # queued while their own limit is full
+        if not self.waiting and self.active < self.concurrency and self.budget.has_room():
+            self._take()
+            return
+        if self.waiting >= self.queue:
+            raise Shed("queue_full", self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        queue = self.budget.waiters
+        queue.append((waiter, self))
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(waiter, self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over as the wait ended
+                if isinstance(exc, asyncio.TimeoutError):
+                    return
+                self.release()
+                raise
+            try:
+                queue.remove((waiter, self))
+                self.waiting -= 1
+            except ValueError:
+                pass
+            if isinstance(exc, asyncio.TimeoutError):
+                raise Shed("timeout", self.retry_after()) from None
+            raise
+
+    def _take(self):
+        self.active += 1
+        self.budget.active += 1
+
+    def release(self, held=None):
+        if held is not None:
+            self._service_time += 0.2 * (held - self._service_time)
+
+        self.active -= 1
+        if not self.priority:
+            self.budget.active -= 1
+            self.budget.dispatch()
+
+
+class Budget:
+    """Slots shared by several gates, handed to their waiters in arrival order."""
+
+    def __init__(self, concurrency):
+        self.concurrency = concurrency
+        self.active = 0
+        self.waiters = deque()
+
+    def has_room(self):
+        return self.active < self.concurrency
+
+    def dispatch(self):
+        """Wake the oldest waiters whose gate has room, while the budget has."""
+        for entry in list(self.waiters):
+            if not self.has_room():
+                return
+            waiter, gate = entry
+            if not waiter.done() and gate.active < gate.concurrency:
+                self.waiters.remove(entry)
+                gate.waiting -= 1
+                gate._take()
+                waiter.set_result(None)
+
+
+def _parse_limits(spec):
+    limits = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        path, _, values = entry.partition("=")
+        concurrency, queue, max_wait = values.split(":")
+        limits[path.strip()] = (int(concurrency), int(queue), float(max_wait))
+    return limits
+
+
+def build_gates(limits=None, budget=ADMISSION_BURST_BUDGET):
+    """Gates for `limits` (default: DEFAULT_LIMITS and ADMISSION_LIMITS) sharing one budget."""
+    limits = {**DEFAULT_LIMITS, **_parse_limits(ADMISSION_LIMITS)} if limits is None else limits
+    shared = Budget(budget)
+    gates = {
+        path: Gate(path, budget if concurrency is None else concurrency, queue, max_wait, budget=shared)
+        for path, (concurrency, queue, max_wait) in limits.items()
+    }
+    for path in PRIORITY_PATHS:
+        gates[path] = Gate(path, 0, 0, None, priority=True)
+    return gates
+
+
+admission_gates = build_gates()
+
+register_gauge(
+    "skillgate_admission_queue_depth", "Requests waiting for an admission slot.",
+    lambda: {(path,): g.waiting for path, g in admission_gates.items()}, ["path"],
+)
+register_gauge(
+    "skillgate_admission_in_flight", "Requests holding an admission slot.",
+    lambda: {(path,): g.active for path, g in admission_gates.items()}, ["path"],
+)
+
+
+# -------- ASGI Middleware --------
+class AdmissionMiddleware:
+    """
+    Per-endpoint admission control: requests to a gated path wait for a
+    slot in a bounded queue, or get an immediate 503 with Retry-After
+    instead of piling up in the executors until clients time out.
+    """
+
+    def __init__(self, app, gates=None):
+        self.app = app
+        self.gates = gates if gates is not None else admission_gates
+
+    async def __call__(self, scope, receive, send):
+        gate = self.gates.get(scope["path"]) if scope["type"] == "http" and ADMISSION_ENABLED else None
+        if gate is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        try:
+            await gate.acquire()
+        except Shed as shed:
+            ADMISSION_SHED.labels(gate.path, shed.reason).inc()
+            await _send_shed(send, shed)
+            return
+
+        admitted = time.perf_counter()
+        ADMISSION_WAIT.labels(gate.path).observe(admitted - start)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.release(time.perf_counter() - admitted)
+
+
+async def _send_shed(send, shed):
+    body = dumps({"detail": "Server busy, retry later", "reason": shed.reason, "retry_after": shed.retry_after})
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(shed.retry_after).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
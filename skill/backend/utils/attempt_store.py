@@ -1,4 +1,677 @@
 # backend/utils/attempt_store.py
 
-# Temporary storage (user session)
-attempts_db = {}
\ No newline at end of file
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from utils.metrics import Counter, register_gauge
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+
+# "memory" (default) or "sqlite"
+ATTEMPT_STORE_BACKEND = os.environ.get("ATTEMPT_STORE", "memory")
+ATTEMPT_DB_PATH = os.environ.get("ATTEMPT_DB_PATH", os.path.join(BASE_DIR, "attempts.db"))
+
+# In-memory backend: sessions idle this long (seconds) without finishing expire
+SESSION_IDLE_TTL = float(os.environ.get("SESSION_IDLE_TTL", "3600"))
+# ...finished sessions stay in memory this long for late reads
+SESSION_FINISHED_TTL = float(os.environ.get("SESSION_FINISHED_TTL", "300"))
+# Distinct questions kept per session; the oldest answer goes beyond this
+SESSION_MAX_ANSWERS = int(os.environ.get("SESSION_MAX_ANSWERS", "256"))
+# Approximate memory for sessions before the least recently used are evicted
+SESSION_MEMORY_BUDGET_MB = float(os.environ.get("SESSION_MEMORY_BUDGET_MB", "256"))
+# Evicted sessions are spilled to a scratch file here and read back on
+# demand; empty drops them instead
+ATTEMPT_SPILL_DIR = os.environ.get("ATTEMPT_SPILL_DIR", tempfile.gettempdir())
+# Seconds between TTL sweeps on the background sweeper thread
+SESSION_SWEEP_INTERVAL = float(os.environ.get("SESSION_SWEEP_INTERVAL", "30"))
+# Spilled sessions are deleted from the spill file after this many seconds
+SESSION_SPILL_TTL = float(os.environ.get("SESSION_SPILL_TTL", "86400"))
+
+ACTIVE = "active"
+FINISHED = "finished"
+
+# Rough per-answer cost (payload dict, keys, map entry) on top of the answer text
+_ANSWER_OVERHEAD = 500
+
+SESSION_EVICTIONS = Counter(
+    "skillgate_session_evictions_total", "Sessions moved out of memory, by reason.", ["reason"]
+)
+
+
+def validate_answer(payload):
+    """Raise ValueError unless payload has string user_id and question_id."""
+    if not isinstance(payload, dict):
+        raise ValueError("Answer payload must be an object")
+    for field in ("user_id", "question_id"):
+        value = payload.get(field)
+        if not isinstance(value, str) or not value:
+            raise ValueError(f"Answer payload needs a non-empty string {field}")
+
+
+class _Session:
+    __slots__ = ("user_id", "state", "last_seen", "answers", "size")
+
+    def __init__(self, user_id, state=ACTIVE, answers=()):
+        self.user_id = user_id
+        self.state = state
+        self.last_seen = time.monotonic()
+        self.answers = OrderedDict((a["question_id"], a) for a in answers)
+        self.size = sum(_answer_size(a) for a in self.answers.values())
+
+
+def _answer_size(payload):
+    return _ANSWER_OVERHEAD + len(str(payload.get("answer", "")))
+
+
+class _SpillFile:
+    """
+    Sessions evicted from memory, one row per user, in a scratch SQLite
+    file private to this process. Safe to call from any thread; close()
+    deletes it.
+    """
+
+    def __init__(self, directory):
+        fd, self.path = tempfile.mkstemp(prefix="skillgate-sessions-", suffix=".db", dir=directory)
+        os.close(fd)
+
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.conn.executescript("""
+            CREATE TABLE sessions (
+                user_id TEXT PRIMARY KEY, state TEXT NOT NULL, answers TEXT NOT NULL, spilled_at REAL NOT NULL
+            );
+            CREATE INDEX idx_sessions_spilled ON sessions (spilled_at);
+        """)
+
+    def put_many(self, sessions):
+        now = time.time()
+        rows = [
+            (s.user_id, s.state, json.dumps(list(s.answers.values())), now) for s in sessions
+        ]
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO sessions (user_id, state, answers, spilled_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+    def get(self, user_id):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT state, answers FROM sessions WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def delete(self, user_ids):
+        with self._lock, self.conn:
+            self.conn.executemany("DELETE FROM sessions WHERE user_id = ?", [(u,) for u in user_ids])
+
+    def pop(self, user_id):
+        found = self.get(user_id)
+        if found is not None:
+            self.delete([user_id])
+        return found
+
+    def prune(self, before):
+        """Delete sessions spilled before `before` (epoch seconds); returns how many."""
+        with self._lock, self.conn:
+            return self.conn.execute("DELETE FROM sessions WHERE spilled_at < ?", (before,)).rowcount
+
+    def users(self):
+        with self._lock:
+            return [user_id for (user_id,) in self.conn.execute("SELECT user_id FROM sessions")]
+
+    def count(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.unlink(self.path + suffix)
+            except FileNotFoundError:
+                pass
+
+
+# -------- In-Memory Backend --------
+class MemoryAttemptStore:
+    """
+    Process-local store of candidate sessions.
+
+    A session starts with its first answer (or `start`) and holds the
+    latest answer per question, so repeat submissions replace rather than
+    append. `finish` marks it finished. Sessions idle past `idle_ttl`,
+    finished ones past `finished_ttl`, and the least recently used ones
+    once the memory budget is exceeded are evicted: spilled to disk when
+    `spill_dir` is set, otherwise dropped. Reads fall back to the spill
+    file, and a spilled session that gets a new answer moves back into
+    memory. Eviction listeners let per-user caches go with the session.
+
+    Eviction runs on a background sweeper thread, woken every
+    `sweep_interval` and whenever an append finds the budget exceeded, so
+    append() itself never writes to disk. Spill writes happen outside the
+    store lock; sessions on their way to disk stay readable meanwhile.
+    A returning user's spilled session is read back before the store lock
+    is taken, so the disk read only holds up that user's own call; like
+    any first answer it can touch disk, so callers on the event loop run
+    append() on an executor. Spilled sessions are deleted after `spill_ttl`.
+    """
+
+    def __init__(self, idle_ttl=SESSION_IDLE_TTL, finished_ttl=SESSION_FINISHED_TTL,
+                 max_answers=SESSION_MAX_ANSWERS, budget_mb=SESSION_MEMORY_BUDGET_MB,
+                 spill_dir=ATTEMPT_SPILL_DIR, sweep_interval=SESSION_SWEEP_INTERVAL,
+                 spill_ttl=SESSION_SPILL_TTL):
+        self.idle_ttl = idle_ttl
+        self.finished_ttl = finished_ttl
+        self.max_answers = max_answers
+        self.budget = int(budget_mb * 1024 * 1024)
+        self.sweep_interval = sweep_interval
+        self.spill_ttl = spill_ttl
+
+        self._sessions = OrderedDict()
+        self._bytes = 0
+        self._answers = 0
+        self.spill_dir = spill_dir
+        self._spill = None
+        # Evicted sessions not yet written to the spill file
+        self._spilling = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+
+        self._sweep_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._sweeper = None
+
+    # -------- Lifecycle --------
+    def start(self, user_id):
+        """Open (or reopen) the user's session."""
+        self._restore(user_id)
+        with self._lock:
+            self._session(user_id).state = ACTIVE
+
+    def finish(self, user_id):
+        """Mark the user's session finished; it leaves memory after finished_ttl."""
+        with self._lock:
+            session = self._sessions.get(user_id)
+            if session is not None:
+                session.state = FINISHED
+                session.last_seen = time.monotonic()
+                self._sessions.move_to_end(user_id)
+
+    def on_evict(self, callback):
+        """
+        Call callback(user_id, reason) whenever a session leaves memory;
+        reason is "idle", "finished" or "budget" (spilled, may come back).
+        """
+        self._listeners.append(callback)
+
+    def _restore(self, user_id):
+        """Read a spilled session back into memory. Disk I/O: never call with the lock held."""
+        with self._lock:
+            if user_id in self._sessions or user_id in self._spilling:
+                return
+        spill = self._spill
+        if spill is None:
+            return
+        try:
+            spilled = spill.pop(user_id)
+        except sqlite3.ProgrammingError:
+            # Closed by a concurrent close()
+            return
+        if spilled is None:
+            return
+
+        with self._lock:
+            session = self._sessions.get(user_id)
+            if session is None:
+                session = self._sessions[user_id] = _Session(user_id, ACTIVE, spilled[1])
+                self._bytes += session.size
+                self._answers += len(session.answers)
+                return
+            # Answered again while this read ran: keep the newer answers
+            for answer in reversed(spilled[1]):
+                if answer["question_id"] not in session.answers:
+                    session.answers[answer["question_id"]] = answer
+                    session.answers.move_to_end(answer["question_id"], last=False)
+                    session.size += _answer_size(answer)
+                    self._bytes += _answer_size(answer)
+                    self._answers += 1
+
+    def _session(self, user_id):
+        """The user's in-memory session, revived or created. Lock held; no disk I/O."""
+        session = self._sessions.get(user_id)
+        if session is None:
+            session = self._spilling.pop(user_id, None)
+            if session is not None:
+                # Caught before it reached disk; the sweeper drops its row
+                session.state = ACTIVE
+                session.last_seen = time.monotonic()
+            else:
+                session = _Session(user_id)
+            self._sessions[user_id] = session
+            self._bytes += session.size
+            self._answers += len(session.answers)
+        else:
+            self._sessions.move_to_end(user_id)
+            session.last_seen = time.monotonic()
+        return session
+
+    # -------- Writes --------
+    def append(self, payload, wait=True):
+        validate_answer(payload)
+        user_id = payload["user_id"]
+        question_id = payload["question_id"]
+
+        self._restore(user_id)
+        with self._lock:
+            session = self._session(user_id)
+            if session.state == FINISHED:
+                session.state = ACTIVE
+
+            previous = session.answers.pop(question_id, None)
+            if previous is not None:
+                session.size -= _answer_size(previous)
+                self._bytes -= _answer_size(previous)
+                self._answers -= 1
+
+            session.answers[question_id] = payload
+            session.size += _answer_size(payload)
+            self._bytes += _answer_size(payload)
+            self._answers += 1
+
+            if len(session.answers) > self.max_answers:
+                _, dropped = session.answers.popitem(last=False)
+                session.size -= _answer_size(dropped)
+                self._bytes -= _answer_size(dropped)
+                self._answers -= 1
+
+            over_budget = self._bytes > self.budget
+
+        if self._sweeper is None:
+            self._start_sweeper()
+        if over_budget:
+            self._wake.set()
+
+        # Same contract as the SQLite backend: a Future resolved once stored
+        future = Future()
+        future.set_result(None)
+        return future
+
+    # -------- Eviction --------
+    def _evict(self, session, reason):
+        """Take one session out of memory, queued for the spill file. Lock held."""
+        del self._sessions[session.user_id]
+        self._bytes -= session.size
+        self._answers -= len(session.answers)
+        if self.spill_dir:
+            self._spilling[session.user_id] = session
+        SESSION_EVICTIONS.labels(reason).inc()
+        return session, reason
+
+    def _evict_over_budget(self):
+        evicted = []
+        # The session touched last is last in LRU order and goes last
+        while self._bytes > self.budget and len(self._sessions) > 1:
+            session = next(iter(self._sessions.values()))
+            evicted.append(self._evict(session, "budget"))
+        return evicted
+
+    def _expire(self):
+        now = time.monotonic()
+        evicted = []
+
+        # LRU order is last_seen order, so stop at the first fresh session
+        for session in list(self._sessions.values()):
+            idle = now - session.last_seen
+            if session.state == FINISHED and idle > self.finished_ttl:
+                evicted.append(self._evict(session, "finished"))
+            elif idle > self.idle_ttl:
+                evicted.append(self._evict(session, "idle"))
+            elif idle <= min(self.finished_ttl, self.idle_ttl):
+                break
+        return evicted
+
+    def sweep(self):
+        """
+        Evict expired and over-budget sessions, write them to the spill
+        file and prune spilled sessions past spill_ttl. The sweeper thread
+        calls this; returns the number of sessions evicted.
+        """
+        with self._sweep_lock:
+            with self._lock:
+                evicted = self._evict_over_budget() + self._expire()
+                spilling = [s for s, _ in evicted if self._spilling.get(s.user_id) is s]
+
+            if spilling:
+                if self._spill is None:
+                    self._spill = _SpillFile(self.spill_dir)
+                    atexit.register(self.close)
+                self._spill.put_many(spilling)
+
+                with self._lock:
+                    revived = []
+                    for session in spilling:
+                        if self._spilling.get(session.user_id) is session:
+                            del self._spilling[session.user_id]
+                        elif session.user_id in self._sessions:
+                            revived.append(session.user_id)
+                # Came back into memory while being written
+                if revived:
+                    self._spill.delete(revived)
+
+            if self._spill is not None and self.spill_ttl > 0:
+                self._spill.prune(time.time() - self.spill_ttl)
+
+        self._notify([(s.user_id, reason) for s, reason in evicted])
+        return len(evicted)
+
+    def _start_sweeper(self):
+        with self._sweep_lock:
+            if self._sweeper is None:
+                self._sweeper = threading.Thread(target=self._sweep_loop, name="session-sweeper", daemon=True)
+                self._sweeper.start()
+
+    def _sweep_loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.sweep_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            try:
+                self.sweep()
+            except Exception:
+                # Keep sweeping; a failed spill write is retried on a later pass
+                pass
+
+    def _notify(self, evicted):
+        for user_id, reason in evicted:
+            for callback in self._listeners:
+                callback(user_id, reason)
+
+    # -------- Reads --------
+    def latest(self, user_id):
+        """Latest answer per question for one user."""
+        with self._lock:
+            session = self._sessions.get(user_id) or self._spilling.get(user_id)
+            if session is not None:
+                return list(session.answers.values())
+        spilled = self._spill.get(user_id) if self._spill is not None else None
+        return spilled[1] if spilled is not None else []
+
+    def history(self, user_id):
+        # Only the latest answer per question is kept
+        return self.latest(user_id)
+
+    def users(self):
+        with self._lock:
+            users = list(self._sessions) + list(self._spilling)
+        if self._spill is not None:
+            users += self._spill.users()
+        return list(dict.fromkeys(users))
+
+    def iter_latest(self):
+        """(user_id, latest answers) for every user, in memory or spilled."""
+        for user_id in self.users():
+            answers = self.latest(user_id)
+            if answers:
+                yield user_id, answers
+
+    def answer_count(self):
+        """Answers held in memory."""
+        return self._answers
+
+    def memory_bytes(self):
+        return self._bytes
+
+    def session_count(self):
+        return len(self._sessions)
+
+    def spilled_count(self):
+        return self._spill.count() if self._spill is not None else 0
+
+    def close(self):
+        self._stop.set()
+        self._wake.set()
+        if self._sweeper is not None and self._sweeper is not threading.current_thread():
+            self._sweeper.join()
+        with self._sweep_lock:
+            if self._spill is not None:
+                self._spill.close()
+                self._spill = None
+
+
+# -------- SQLite (WAL) Backend --------
+class SQLiteAttemptStore:
+    """
+    Durable append-only answer log.
+
+    Appends are handed to a single writer thread which drains whatever is
+    queued and commits it in one transaction (group commit), so concurrent
+    requests share fsyncs. Alongside the log, `latest_answers` keeps the
+    newest answer per (user, question), which makes finish-test a single
+    indexed read for that user.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS answers (
+        seq         INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id     TEXT NOT NULL,
+        attempt_id  TEXT,
+        question_id TEXT NOT NULL,
+        payload     TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_answers_user ON answers (user_id, seq);
+    CREATE TABLE IF NOT EXISTS latest_answers (
+        user_id     TEXT NOT NULL,
+        question_id TEXT NOT NULL,
+        seq         INTEGER NOT NULL,
+        payload     TEXT NOT NULL,
+        PRIMARY KEY (user_id, question_id)
+    ) WITHOUT ROWID;
+    """
+
+    def __init__(self, path=ATTEMPT_DB_PATH, max_batch=1000):
+        self.path = path
+        self.max_batch = max_batch
+        self._local = threading.local()
+        self._queue = queue.Queue()
+        self._listeners = []
+
+        conn = self._connect()
+        conn.executescript(self.SCHEMA)
+        conn.close()
+
+        self._writer = threading.Thread(target=self._write_loop, name="attempt-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self, **kwargs):
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30, **kwargs)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    # -------- Lifecycle --------
+    def start(self, user_id):
+        pass
+
+    def finish(self, user_id):
+        # Everything is on disk; per-user caches can go as soon as the test ends
+        for callback in self._listeners:
+            callback(user_id, "finished")
+
+    def on_evict(self, callback):
+        """Call callback(user_id, "finished") when a user's test finishes."""
+        self._listeners.append(callback)
+
+    # -------- Writes --------
+    def append(self, payload, wait=True):
+        # Rejected here, before a bad payload can share a transaction with others
+        validate_answer(payload)
+        row = (payload["user_id"], payload.get("attempt_id"), payload["question_id"], json.dumps(payload))
+
+        future = Future()
+        self._queue.put((row, future))
+        if wait:
+            future.result()
+        return future
+
+    def _write_loop(self):
+        # Autocommit mode: the loop opens and commits each batch's
+        # transaction itself, so the per-row savepoints nest inside it
+        conn = self._connect(isolation_level=None)
+
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+
+            try:
+                failed = self._write_batch(conn, [row for row, _ in batch])
+            except Exception as exc:
+                for _, future in batch:
+                    future.set_exception(exc)
+            else:
+                for i, (_, future) in enumerate(batch):
+                    if i in failed:
+                        future.set_exception(failed[i])
+                    else:
+                        future.set_result(None)
+
+        conn.close()
+
+    def _write_batch(self, conn, rows):
+        """
+        Insert `rows` in one transaction with a single commit. A row that
+        fails is rolled back to its savepoint alone; returns {index: error}.
+        """
+        failed = {}
+        conn.execute("BEGIN")
+        try:
+            for i, row in enumerate(rows):
+                conn.execute("SAVEPOINT answer")
+                try:
+                    self._insert(conn, row)
+                except sqlite3.Error as exc:
+                    conn.execute("ROLLBACK TO answer")
+                    failed[i] = exc
+                conn.execute("RELEASE answer")
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        return failed
+
+    @staticmethod
+    def _insert(conn, row):
+        user_id, attempt_id, question_id, raw = row
+
+        seq = conn.execute(
+            "INSERT INTO answers (user_id, attempt_id, question_id, payload) VALUES (?, ?, ?, ?)",
+            (user_id, attempt_id, question_id, raw),
+        ).lastrowid
+        conn.execute(
+            "INSERT INTO latest_answers (user_id, question_id, seq, payload) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (user_id, question_id) DO UPDATE SET seq = excluded.seq, payload = excluded.payload",
+            (user_id, question_id, seq, raw),
+        )
+
+    # -------- Reads --------
+    def latest(self, user_id):
+        """Latest answer per question for one user."""
+        rows = self._reader().execute(
+            "SELECT payload FROM latest_answers WHERE user_id = ? ORDER BY seq", (user_id,)
+        )
+        return [json.loads(raw) for (raw,) in rows]
+
+    def history(self, user_id):
+        rows = self._reader().execute(
+            "SELECT payload FROM answers WHERE user_id = ? ORDER BY seq", (user_id,)
+        )
+        return [json.loads(raw) for (raw,) in rows]
+
+    def users(self):
+        rows = self._reader().execute("SELECT DISTINCT user_id FROM latest_answers")
+        return [user_id for (user_id,) in rows]
+
+    def iter_latest(self):
+        """
+        (user_id, latest answers) for every user, streamed from one cursor
+        in primary-key order so memory stays at one user at a time.
+        """
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT user_id, payload FROM latest_answers ORDER BY user_id, question_id"
+            )
+            current, answers = None, []
+            for user_id, raw in rows:
+                if user_id != current and answers:
+                    yield current, answers
+                    answers = []
+                current = user_id
+                answers.append(json.loads(raw))
+            if answers:
+                yield current, answers
+        finally:
+            conn.close()
+
+    def answer_count(self):
+        return self._reader().execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+
+    def close(self):
+        self._queue.put(None)
+        self._writer.join()
+
+
+def create_attempt_store(backend=ATTEMPT_STORE_BACKEND):
+    if backend == "sqlite":
+        return SQLiteAttemptStore()
+    if backend == "memory":
+        return MemoryAttemptStore()
+    raise ValueError(f"Unknown attempt store backend: {backend}")
+
+
+attempt_store = create_attempt_store()
+
+if isinstance(attempt_store, MemoryAttemptStore):
+    register_gauge(
+        "skillgate_sessions_in_memory", "Candidate sessions held in memory.", attempt_store.session_count
+    )
+    register_gauge(
+        "skillgate_session_memory_bytes", "Approximate bytes held by in-memory sessions.",
+        attempt_store.memory_bytes,
+    )
+    register_gauge(
+        "skillgate_sessions_spilled", "Candidate sessions spilled to disk.", attempt_store.spilled_count
+    )
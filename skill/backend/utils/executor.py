@@ -0,0 +1,56 @@
+import asyncio
+import contextvars
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+
+# Selection and grading touch in-process state (catalog, score board), so
+# "cpu" work always runs on threads. Inference is stateless and may use
+# processes instead.
+CPU_WORKERS = int(os.environ.get("CPU_WORKERS", os.cpu_count() or 4))
+INFERENCE_WORKERS = int(os.environ.get("INFERENCE_WORKERS", os.cpu_count() or 4))
+INFERENCE_EXECUTOR = os.environ.get("INFERENCE_EXECUTOR", "thread")  # "thread" | "process"
+# Grading of /submit-answer gets its own threads, so answers in progress
+# never queue behind test generation or finish-test bursts on "cpu"
+ANSWER_WORKERS = int(os.environ.get("ANSWER_WORKERS", "2"))
+
+_executors = {}
+
+
+def _create(name):
+    if name == "cpu":
+        return ThreadPoolExecutor(max_workers=CPU_WORKERS, thread_name_prefix="cpu")
+    if name == "answers":
+        return ThreadPoolExecutor(max_workers=ANSWER_WORKERS, thread_name_prefix="answers")
+    if name == "inference":
+        if INFERENCE_EXECUTOR == "process":
+            return ProcessPoolExecutor(max_workers=INFERENCE_WORKERS)
+        return ThreadPoolExecutor(max_workers=INFERENCE_WORKERS, thread_name_prefix="inference")
+    raise ValueError(f"Unknown executor: {name}")
+
+
+def get_executor(name):
+    executor = _executors.get(name)
+    if executor is None:
+        executor = _executors.setdefault(name, _create(name))
+    return executor
+
+
+async def run_in(name, fn, *args, **kwargs):
+    """Run fn(*args, **kwargs) on the named executor without blocking the loop."""
+    loop = asyncio.get_running_loop()
+    executor = get_executor(name)
+    call = partial(fn, *args, **kwargs)
+
+    # Threads see the request's context (stage traces); processes cannot
+    if isinstance(executor, ThreadPoolExecutor):
+        call = partial(contextvars.copy_context().run, call)
+
+    return await loop.run_in_executor(executor, call)
+
+
+def shutdown_executors(wait=True):
+    while _executors:
+        _, executor = _executors.popitem()
+        executor.shutdown(wait=wait)
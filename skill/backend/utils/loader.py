@@ -1,10 +1,33 @@
+import hashlib
 import json
 import os
+import threading
+import time
+
+from core.catalog import QuestionCatalog
+from core.catalog_file import MappedCatalog, read_header, write_catalog_file
+from utils.metrics import stage
 
 
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 DATA_DIR = os.path.join(BASE_DIR, "data")
 
+DATA_FILES = [
+    "dsa_mcq.json",
+    "dsa_msq.json",
+    "dsa_code_trace.json",
+    "dsa_short_answer.json",
+    "dsa_reasoning.json",
+]
+
+# Seconds between data-file stat checks in get_catalog()
+RELOAD_CHECK_INTERVAL = float(os.environ.get("CATALOG_RELOAD_INTERVAL", "2"))
+
+# Precompiled catalog built by `python -m tools.build_catalog`. "auto" maps
+# it when it matches the data files and falls back to parsing the JSON.
+CATALOG_FORMAT = os.environ.get("CATALOG_FORMAT", "auto")  # "auto" | "binary" | "json"
+CATALOG_BIN_PATH = os.environ.get("CATALOG_BIN_PATH", os.path.join(DATA_DIR, "catalog.bin"))
+
 
 def load_json(filename):
     path = os.path.join(DATA_DIR, filename)
@@ -14,9 +37,175 @@ def load_json(filename):
 
 def load_full_dataset():
     dataset = []
-    dataset += load_json("dsa_mcq.json")
-    dataset += load_json("dsa_msq.json")
-    dataset += load_json("dsa_code_trace.json")
-    dataset += load_json("dsa_short_answer.json")
-    dataset += load_json("dsa_reasoning.json")
-    return dataset
\ No newline at end of file
+    for filename in DATA_FILES:
+        dataset += load_json(filename)
+    return dataset
+
+
+# -------- Shared Catalog (hot reload) --------
+_catalog = None
+_catalog_hash = None
+_file_signature = None
+_last_check = 0.0
+_reload_lock = threading.Lock()
+_pinned = None
+
+
+def _stat_signature():
+    signature = []
+    for filename in DATA_FILES:
+        st = os.stat(os.path.join(DATA_DIR, filename))
+        signature.append((filename, st.st_mtime_ns, st.st_size))
+    return tuple(signature)
+
+
+def _bin_signature():
+    try:
+        st = os.stat(CATALOG_BIN_PATH)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _hash_data_files():
+    digest = hashlib.sha256()
+    for filename in DATA_FILES:
+        with open(os.path.join(DATA_DIR, filename), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _read_data_files():
+    digest = hashlib.sha256()
+    dataset = []
+
+    for filename in DATA_FILES:
+        with open(os.path.join(DATA_DIR, filename), "rb") as f:
+            raw = f.read()
+        digest.update(raw)
+        dataset += json.loads(raw)
+
+    return digest.hexdigest(), dataset
+
+
+def _refresh_catalog(force=False):
+    global _catalog, _catalog_hash, _file_signature, _last_check
+
+    with _reload_lock:
+        _last_check = time.monotonic()
+        signature = (_stat_signature(), _bin_signature())
+
+        if not force and _catalog is not None and signature == _file_signature:
+            return _catalog
+
+        with stage("catalog_load"):
+            mapped_hash = _fresh_catalog_file(signature[0])
+
+            if mapped_hash is not None:
+                if force or mapped_hash != _catalog_hash:
+                    _catalog = MappedCatalog(CATALOG_BIN_PATH)
+                    _catalog_hash = mapped_hash
+            else:
+                content_hash, dataset = _read_data_files()
+
+                # Touched but unchanged files keep the current snapshot
+                if force or content_hash != _catalog_hash:
+                    # Single reference assignment: readers see the old or new catalog, never a mix
+                    _catalog = QuestionCatalog(dataset)
+                    _catalog_hash = content_hash
+
+        _file_signature = signature
+        return _catalog
+
+
+def _fresh_catalog_file(data_signature):
+    """
+    Source hash of the precompiled catalog file if it should be used, or
+    None to parse the JSON files. The file is current when it was built
+    from data files with the same stat signature or the same content.
+    """
+    if CATALOG_FORMAT == "json":
+        return None
+
+    try:
+        header, _ = read_header(CATALOG_BIN_PATH)
+    except (FileNotFoundError, ValueError):
+        # Missing, or written by an older format version
+        header = None
+
+    if header is not None:
+        source_hash = header.get("source_hash")
+
+        if header.get("source_signature") == [list(s) for s in data_signature]:
+            return source_hash
+        if source_hash is not None and source_hash == _hash_data_files():
+            return source_hash
+
+    if CATALOG_FORMAT == "binary":
+        raise RuntimeError(
+            f"{CATALOG_BIN_PATH} is missing or out of date; run python -m tools.build_catalog"
+        )
+    return None
+
+
+def build_catalog_file(path=None):
+    """Compile the data files into a catalog file; returns its header."""
+    signature = _stat_signature()
+    content_hash, dataset = _read_data_files()
+
+    return write_catalog_file(
+        path or CATALOG_BIN_PATH,
+        dataset,
+        source_hash=content_hash,
+        source_signature=[list(s) for s in signature],
+    )
+
+
+def get_catalog():
+    """
+    Process-wide question catalog snapshot.
+
+    Data files are re-stat'ed at most every RELOAD_CHECK_INTERVAL seconds
+    and only re-parsed when their mtime/size changed and the content hash
+    differs. Callers should fetch the catalog once per request and use
+    that snapshot throughout.
+    """
+    if _pinned is not None:
+        return _pinned
+
+    catalog = _catalog
+
+    if catalog is not None and time.monotonic() - _last_check < RELOAD_CHECK_INTERVAL:
+        return catalog
+
+    return _refresh_catalog()
+
+
+def peek_catalog():
+    """
+    The snapshot get_catalog() last returned, without checking the data
+    files (no I/O, safe on the event loop); None before the first load.
+    """
+    return _pinned if _pinned is not None else _catalog
+
+
+def reload_catalog():
+    return _refresh_catalog(force=True)
+
+
+def catalog_version():
+    return _catalog_hash
+
+
+def pin_catalog(catalog):
+    """
+    Serve `catalog` (a QuestionCatalog or question list) from get_catalog()
+    instead of the data files, e.g. for benchmarks on a synthetic bank.
+    Pass None to go back to the data files.
+    """
+    global _pinned
+
+    if catalog is not None and not isinstance(catalog, QuestionCatalog):
+        catalog = QuestionCatalog(catalog)
+    _pinned = catalog
+    return catalog
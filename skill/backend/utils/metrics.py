@@ -0,0 +1,310 @@
+import contextvars
+import heapq
+import json
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+
+
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") != "0"
+
+# Opt-in request sampling: share of requests traced per stage, and how many
+# of the slowest traced requests to keep.
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_SLOWEST_N = int(os.environ.get("PROFILE_SLOWEST_N", "20"))
+PROFILE_DUMP_PATH = os.environ.get("PROFILE_DUMP_PATH")
+
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+# -------- Metric Types --------
+class _Metric:
+
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _label_str(self, values, extra=()):
+        pairs = list(zip(self.labelnames, values)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self._children.items()):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+    def _render_child(self, values, child):
+        return [f"{self.name}{self._label_str(values)} {child.value}"]
+
+
+class Gauge(_Metric):
+    """
+    Gauge read from a callback at scrape time. With labelnames, `read`
+    returns {label values tuple: value}.
+    """
+    kind = "gauge"
+
+    def __init__(self, name, help_text, read, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self.read = read
+
+    def render(self):
+        try:
+            value = self.read()
+        except Exception:
+            return []
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        if not self.labelnames:
+            lines.append(f"{self.name} {value}")
+            return lines
+        for values, child in sorted(value.items()):
+            lines.append(f"{self.name}{self._label_str(values)} {child}")
+        return lines
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count", "_lock")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(name, help_text, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def _render_child(self, values, child):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f"{self.name}_bucket{self._label_str(values, [('le', le)])} {cumulative}")
+        lines.append(f"{self.name}_sum{self._label_str(values)} {child.sum}")
+        lines.append(f"{self.name}_count{self._label_str(values)} {child.count}")
+        return lines
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REGISTRY = []
+
+STAGE_SECONDS = Histogram(
+    "skillgate_stage_seconds", "Time spent per processing stage.", ["stage"]
+)
+REQUEST_SECONDS = Histogram(
+    "skillgate_request_seconds", "HTTP request latency.", ["path"]
+)
+REQUESTS_TOTAL = Counter(
+    "skillgate_requests_total", "HTTP requests served.", ["path", "status"]
+)
+ANSWERS_STORED = Counter(
+    "skillgate_answers_stored_total", "Answers accepted by /submit-answer."
+)
+
+
+def register_gauge(name, help_text, read, labelnames=()):
+    return Gauge(name, help_text, read, labelnames)
+
+
+def render_metrics():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# -------- Stage Timers --------
+_trace = contextvars.ContextVar("skillgate_trace", default=None)
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopTimer()
+
+
+class _StageTimer:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        STAGE_SECONDS.labels(self.name).observe(elapsed)
+
+        trace = _trace.get()
+        if trace is not None:
+            trace[self.name] = trace.get(self.name, 0.0) + elapsed
+        return False
+
+
+def stage(name):
+    """`with stage("grading"): ...` records the block's latency."""
+    if not METRICS_ENABLED:
+        return _NOOP
+    return _StageTimer(name)
+
+
+# -------- Slow Request Sampling --------
+_slowest = []
+_slowest_lock = threading.Lock()
+_sequence = 0
+
+
+def _keep_if_slow(path, elapsed, stages):
+    global _sequence
+
+    entry = {
+        "path": path,
+        "seconds": round(elapsed, 6),
+        "stages": {k: round(v, 6) for k, v in stages.items()},
+        "at": time.time(),
+    }
+
+    with _slowest_lock:
+        _sequence += 1
+        item = (elapsed, _sequence, entry)
+        if len(_slowest) < PROFILE_SLOWEST_N:
+            heapq.heappush(_slowest, item)
+        elif elapsed > _slowest[0][0]:
+            heapq.heapreplace(_slowest, item)
+
+
+def slowest_requests():
+    with _slowest_lock:
+        return [entry for _, _, entry in sorted(_slowest, reverse=True)]
+
+
+def dump_slowest(path=PROFILE_DUMP_PATH):
+    if not path:
+        return
+    with open(path, "w") as f:
+        json.dump(slowest_requests(), f, indent=2)
+
+
+# -------- ASGI Middleware --------
+def _route_label(scope):
+    """
+    The matched route's template (e.g. /item-stats/{question_id}), so
+    label series stay bounded; unmatched paths all count as "other".
+    """
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or "other"
+
+
+
+class MetricsMiddleware:
+    """
+    Counts and times every HTTP request by route template; samples some
+    for stage traces, which keep the concrete path.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        status = {"code": 500}
+        trace = None
+        token = None
+
+        if PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE:
+            trace = {}
+            token = _trace.set(trace)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            label = _route_label(scope)
+            REQUEST_SECONDS.labels(label).observe(elapsed)
+            REQUESTS_TOTAL.labels(label, str(status["code"])).inc()
+
+            if token is not None:
+                _trace.reset(token)
+                _keep_if_slow(path, elapsed, trace)
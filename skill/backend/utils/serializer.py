@@ -0,0 +1,41 @@
+import json
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder gives the same JSON
+    orjson = None
+
+
+_encode = json.JSONEncoder(
+    ensure_ascii=False, allow_nan=False, separators=(",", ":")
+).encode
+
+if orjson is not None:
+    # Numpy scalars/arrays can reach responses from the grading engine
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj):
+        """Compact UTF-8 JSON bytes."""
+        try:
+            return orjson.dumps(obj, option=_ORJSON_OPTIONS)
+        except TypeError:
+            # Types orjson rejects (e.g. ints past 64 bits) still encode
+            return _encode(obj).encode("utf-8")
+else:
+    def dumps(obj):
+        """Compact UTF-8 JSON bytes."""
+        return _encode(obj).encode("utf-8")
+
+
+def join_array(items):
+    """JSON array from already-encoded element bytes."""
+    return b"[" + b",".join(items) + b"]"
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with `dumps` (orjson when installed)."""
+
+    def render(self, content):
+        return dumps(content)
@@ -0,0 +1,122 @@
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Run independent warmup phases on threads (unpickling, parsing and mmap
+# setup release the GIL often enough to overlap)
+STARTUP_PARALLEL = os.environ.get("STARTUP_PARALLEL", "1") != "0"
+# Hold the lifespan until warmup is done instead of serving straight away
+STARTUP_BLOCKING = os.environ.get("STARTUP_BLOCKING", "0") != "0"
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def rss_bytes():
+    """Current resident set size (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+# -------- Warmup Phases --------
+class Startup:
+    """
+    Named warmup phases run once, in the background or inline.
+
+    `phases` is a list of (name, fn) run concurrently when parallel, and
+    `after` a list run in order once they are all done. Each phase's wall
+    time and RSS change are recorded; with parallel phases the RSS
+    figures overlap and are approximate. `done` is set when every phase
+    has finished, successfully or not; `ok` tells whether all succeeded.
+    """
+
+    def __init__(self, phases, after=(), parallel=STARTUP_PARALLEL):
+        self.phases = list(phases)
+        self.after = list(after)
+        self.parallel = parallel
+
+        self.done = threading.Event()
+        self.started = None
+        self.finished = None
+        self._report = []
+        self._lock = threading.Lock()
+
+    def _run_phase(self, name, fn):
+        rss = rss_bytes()
+        start = time.perf_counter()
+        error = None
+
+        try:
+            fn()
+        except Exception as exc:
+            # Lazy loaders retry on first use; readiness reports the failure
+            error = f"{type(exc).__name__}: {exc}"
+
+        entry = {
+            "phase": name,
+            "seconds": round(time.perf_counter() - start, 4),
+            "rss_delta_mb": round((rss_bytes() - rss) / (1024 * 1024), 1),
+        }
+        if error is not None:
+            entry["error"] = error
+
+        with self._lock:
+            self._report.append(entry)
+
+    def run(self):
+        self.started = time.perf_counter()
+
+        if self.parallel and len(self.phases) > 1:
+            with ThreadPoolExecutor(max_workers=len(self.phases), thread_name_prefix="startup") as pool:
+                for name, fn in self.phases:
+                    pool.submit(self._run_phase, name, fn)
+        else:
+            for name, fn in self.phases:
+                self._run_phase(name, fn)
+
+        for name, fn in self.after:
+            self._run_phase(name, fn)
+
+        self.finished = time.perf_counter()
+        self.done.set()
+        print(self.summary(), file=sys.stderr)
+
+    def start(self):
+        """Run in a background thread; returns the thread."""
+        thread = threading.Thread(target=self.run, name="startup", daemon=True)
+        thread.start()
+        return thread
+
+    def ok(self):
+        with self._lock:
+            return self.done.is_set() and not any("error" in p for p in self._report)
+
+    def report(self):
+        with self._lock:
+            phases = list(self._report)
+
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return {
+            "ready": self.ok(),
+            "failed": [p["phase"] for p in phases if "error" in p],
+            "seconds": round(end - self.started, 4) if self.started is not None else 0.0,
+            "rss_mb": round(rss_bytes() / (1024 * 1024), 1),
+            "phases": phases,
+        }
+
+    def summary(self):
+        report = self.report()
+        phases = ", ".join(
+            f"{p['phase']} {p['seconds']:.2f}s {p['rss_delta_mb']:+.1f}MB"
+            + (" FAILED" if "error" in p else "")
+            for p in report["phases"]
+        )
+        return f"[startup] done in {report['seconds']:.2f}s, rss {report['rss_mb']:.1f}MB ({phases})"